@@ -0,0 +1,20 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _clear_report_cache():
+    # Data versions restart with each test database transaction, so cached
+    # reports must not leak from one test into the next
+    from core.cache import get_report_cache
+    get_report_cache().clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _clear_student_caches():
+    # Student and campus ids are reused across tests, so in-process copies must not leak either
+    from students.campuses import get_campus_cache
+    from students.name_index import get_name_index
+    get_name_index().clear()
+    get_campus_cache().clear()
+    yield
@@ -0,0 +1,222 @@
+"""
+Report result cache.
+
+Results are stored under keys that embed the data versions they were computed
+at (core.versioning), so writes never delete entries: bumping a version makes
+every dependent key unreachable, and stale entries age out by LRU eviction
+(local memory) or TTL (Redis).
+
+Configured with settings.REPORT_CACHE:
+
+    'BACKEND': 'locmem' (in-process LRU, default) | 'redis' | 'dummy'
+    'MAX_ENTRIES': LRU size bound for 'locmem'
+    'REDIS_URL', 'TTL': connection and entry lifetime for 'redis'
+    'SINGLE_FLIGHT': 'local' | 'lock' | 'off' - coalescing of identical
+        concurrent misses (core.singleflight); 'lock' needs the redis backend
+
+Values are stored as JSON text, normalised with DRF's encoder so a cached
+response renders exactly like a fresh one.
+"""
+import json
+import logging
+import threading
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from .singleflight import LocalSingleFlight, LockSingleFlight, NoSingleFlight
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'locmem',
+    'MAX_ENTRIES': 1024,
+    'REDIS_URL': 'redis://localhost:6379/1',
+    'TTL': 60 * 60,
+    'KEY_PREFIX': 'report',
+    'SINGLE_FLIGHT': 'local',
+    'SINGLE_FLIGHT_TIMEOUT': 10.0,
+}
+
+
+class LRUBackend:
+    """Size-bounded in-process cache; least recently used entries are evicted first"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """
+    Shared cache for multi-process deployments. Entries expire after TTL.
+    Redis errors are logged and treated as misses so reports keep working
+    without the cache.
+    """
+
+    def __init__(self, url, ttl, client=None):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.ttl = ttl
+
+    def get(self, key):
+        try:
+            value = self.client.get(key)
+        except Exception:
+            logger.warning('Report cache read failed', exc_info=True)
+            return None
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, key, value):
+        try:
+            self.client.set(key, value, ex=self.ttl)
+        except Exception:
+            logger.warning('Report cache write failed', exc_info=True)
+
+    def clear(self):
+        # Entries are never deleted individually; versioned keys and TTL retire them
+        pass
+
+
+class DummyBackend:
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def clear(self):
+        pass
+
+
+class ReportCache:
+    def __init__(self, backend, key_prefix, flight=None):
+        self.backend = backend
+        self.key_prefix = key_prefix
+        self.flight = flight or NoSingleFlight()
+        self.hits = Counter()
+        self.misses = Counter()
+        self.coalesced = Counter()
+
+    def make_key(self, name, school_id, params, versions):
+        version_part = ','.join(f"{key}={version}" for key, version in versions)
+        return f"{self.key_prefix}:{name}:{school_id}:{params}:{version_part}"
+
+    def get(self, name, key):
+        value = self.backend.get(key)
+        if value is None:
+            self.misses[name] += 1
+            return None
+        self.hits[name] += 1
+        return json.loads(value)
+
+    def set(self, key, data):
+        self.backend.set(key, json.dumps(data, cls=JSONEncoder))
+
+    def peek(self, key):
+        """Cached data without touching the hit/miss counters"""
+        value = self.backend.get(key)
+        return None if value is None else json.loads(value)
+
+    def compute(self, name, key, compute):
+        """
+        Run compute() -> Response for a missed key, caching a 200 result.
+        Identical concurrent misses share one computation.
+        """
+        def compute_and_store():
+            response = compute()
+            if response.status_code == 200:
+                self.set(key, response.data)
+            return response
+
+        response, coalesced = self.flight.run(key, compute_and_store, lambda: self.peek(key))
+        if coalesced:
+            self.coalesced[name] += 1
+        return response
+
+    def clear(self):
+        self.backend.clear()
+        self.hits.clear()
+        self.misses.clear()
+        self.coalesced.clear()
+
+    def stats(self):
+        """Hit/miss counters for this process, overall and per report"""
+        names = sorted(set(self.hits) | set(self.misses))
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return {
+            'backend': type(self.backend).__name__,
+            'single_flight': type(self.flight).__name__,
+            'hits': hits,
+            'misses': misses,
+            'coalesced': sum(self.coalesced.values()),
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+            'reports': {
+                name: {'hits': self.hits[name], 'misses': self.misses[name], 'coalesced': self.coalesced[name]}
+                for name in names
+            },
+        }
+
+
+def build_report_cache():
+    config = {**DEFAULTS, **getattr(settings, 'REPORT_CACHE', {})}
+    name = config['BACKEND']
+    if name == 'redis':
+        backend = RedisBackend(config['REDIS_URL'], config['TTL'])
+    elif name == 'locmem':
+        backend = LRUBackend(config['MAX_ENTRIES'])
+    elif name == 'dummy':
+        backend = DummyBackend()
+    else:
+        raise ValueError(f"Unknown REPORT_CACHE backend '{name}'")
+
+    mode = config['SINGLE_FLIGHT']
+    if mode == 'local':
+        flight = LocalSingleFlight(config['SINGLE_FLIGHT_TIMEOUT'])
+    elif mode == 'lock':
+        if not isinstance(backend, RedisBackend):
+            raise ValueError("REPORT_CACHE SINGLE_FLIGHT 'lock' requires the redis backend")
+        flight = LockSingleFlight(backend.client, wait_timeout=config['SINGLE_FLIGHT_TIMEOUT'])
+    elif mode == 'off':
+        flight = NoSingleFlight()
+    else:
+        raise ValueError(f"Unknown REPORT_CACHE single-flight mode '{mode}'")
+    return ReportCache(backend, config['KEY_PREFIX'], flight)
+
+
+_report_cache = None
+_report_cache_lock = threading.Lock()
+
+
+def get_report_cache():
+    global _report_cache
+    if _report_cache is None:
+        with _report_cache_lock:
+            if _report_cache is None:
+                _report_cache = build_report_cache()
+    return _report_cache
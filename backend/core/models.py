@@ -99,3 +99,18 @@ class School(models.Model):
             return True
         from django.utils import timezone
         return self.subscription_end_date >= timezone.now().date()
+
+
+class DataVersion(models.Model):
+    """
+    Monotonic change counter for one scope of data: a school
+    ("school:<id>") or a student ("student:<id>").
+    Bumped in the same transaction as every payment, student and
+    reconciliation write (see core.versioning); report endpoints derive their
+    ETags from it so unchanged data can be answered with 304.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key}@{self.version}"
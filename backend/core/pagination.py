@@ -0,0 +1,228 @@
+"""
+Shared pagination classes.
+
+Page-number pagination runs COUNT(*) plus an OFFSET scan on every page, both of
+which grow with history. Keyset (cursor) pagination instead seeks past the last
+row of the previous page on the list's ordering (e.g. `(date, id)`), so a deep
+page costs the same as the first one. It is opt-in per request so existing
+page-number clients keep working:
+
+    ?pagination=cursor[&page_size=50][&count=estimate|exact]
+
+and the `next` / `previous` links carry an opaque `cursor` parameter.
+"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_count(queryset):
+    """
+    Planner row estimate for a queryset on PostgreSQL (no table scan);
+    falls back to an exact COUNT(*) on other databases.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over the queryset's ordering, made unique by `id`.
+    NULLs sort as the largest value (PostgreSQL's native btree order), so
+    nullable orderings such as `-voided_at` can still use their index.
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    page_size = 50
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None, page_size=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = page_size or self.page_size
+
+        self.ordering = ordering = self.get_ordering(queryset)
+        self.ordering_key = [f"{'-' if desc else ''}{field.name}" for field, desc in ordering]
+
+        values, reverse = self.decode_cursor(request)
+        traversal = [(field, desc != reverse) for field, desc in ordering]
+        queryset = queryset.order_by(*[
+            F(field.attname).desc(nulls_first=True) if desc else F(field.attname).asc(nulls_last=True)
+            for field, desc in traversal
+        ])
+
+        self.count = None
+        count_mode = request.query_params.get(self.count_query_param)
+        if count_mode == 'exact':
+            self.count = queryset.count()
+        elif count_mode == 'estimate':
+            self.count = estimate_count(queryset)
+
+        if values is not None:
+            queryset = queryset.filter(self.seek(traversal, values))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else values is not None
+        self.first_row = rows[0] if rows else None
+        self.last_row = rows[-1] if rows else None
+        return rows
+
+    def get_ordering(self, queryset):
+        """[(model field, descending)] from the queryset ordering, ending with id"""
+        model = queryset.model
+        names = list(queryset.query.order_by) or list(model._meta.ordering)
+        ordering = []
+        for name in names:
+            if not isinstance(name, str):
+                raise ValidationError({'ordering': 'This ordering is not supported with cursor pagination'})
+            desc = name.startswith('-')
+            try:
+                field = model._meta.pk if name.lstrip('-') == 'pk' else model._meta.get_field(name.lstrip('-'))
+            except FieldDoesNotExist:
+                raise ValidationError({'ordering': f'{name} is not supported with cursor pagination'})
+            if not field.concrete or field.many_to_many:
+                raise ValidationError({'ordering': f'{name} is not supported with cursor pagination'})
+            ordering.append((field, desc))
+            if field.primary_key:
+                break
+        else:
+            # Make the ordering unique so every row has exactly one position
+            ordering.append((model._meta.pk, ordering[-1][1] if ordering else True))
+        return ordering
+
+    def seek(self, traversal, values):
+        """Rows strictly after `values` in traversal order (NULL = largest)"""
+        def strictly_after(field, desc, value):
+            if value is None:
+                # Nothing sorts after NULL ascending; every non-NULL does descending
+                return Q(**{f'{field.attname}__isnull': False}) if desc else Q(pk__in=[])
+            after = Q(**{f"{field.attname}__{'lt' if desc else 'gt'}": value})
+            if field.null and not desc:
+                after |= Q(**{f'{field.attname}__isnull': True})
+            return after
+
+        def equal(field, value):
+            if value is None:
+                return Q(**{f'{field.attname}__isnull': True})
+            return Q(**{field.attname: value})
+
+        condition = None
+        for (field, desc), value in reversed(list(zip(traversal, values))):
+            after = strictly_after(field, desc, value)
+            condition = after if condition is None else after | (equal(field, value) & condition)
+
+        # Redundant range on the leading column lets the index seek straight to the cursor
+        field, desc = traversal[0]
+        value = values[0]
+        if value is not None and (desc or not field.null):
+            condition &= Q(**{f"{field.attname}__{'lte' if desc else 'gte'}": value})
+        return condition
+
+    def encode_cursor(self, row, reverse):
+        if isinstance(row, dict):
+            # values() rows, keyed by attname
+            values = [row[field.attname] for field, _ in self.ordering]
+        else:
+            values = [getattr(row, field.attname) for field, _ in self.ordering]
+        payload = json.dumps({'o': self.ordering_key, 'v': values, 'r': reverse}, cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            if payload['o'] != self.ordering_key or len(payload['v']) != len(self.ordering_key):
+                raise ValueError
+            values = [
+                None if value is None else field.to_python(value)
+                for (field, _), value in zip(self.ordering, payload['v'])
+            ]
+            return values, bool(payload['r'])
+        except (KeyError, TypeError, ValueError, binascii.Error, DjangoValidationError):
+            raise ValidationError({self.cursor_query_param: self.invalid_cursor_message})
+
+    def get_next_link(self):
+        if not self.has_next or self.last_row is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.last_row, False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_row is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.first_row, True))
+
+    def get_paginated_response(self, data):
+        body = OrderedDict()
+        if self.count is not None:
+            body['count'] = self.count
+        body['next'] = self.get_next_link()
+        body['previous'] = self.get_previous_link()
+        body['results'] = data
+        return Response(body)
+
+
+class HybridPagination(PageNumberPagination):
+    """
+    Page-number pagination that switches to keyset pagination when the request
+    asks for it with `?pagination=cursor` (or carries a `cursor`).
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    mode_query_param = 'pagination'
+    keyset_class = KeysetPagination
+
+    def use_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if not self.use_keyset(request):
+            return super().paginate_queryset(queryset, request, view)
+        self.keyset = self.keyset_class()
+        return self.keyset.paginate_queryset(queryset, request, view, page_size=self.get_page_size(request))
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class OptInPagination(HybridPagination):
+    """
+    Unpaginated unless the client sends `page_size` (page numbers) or
+    `pagination=cursor` (keyset), for endpoints that historically returned
+    plain lists.
+    """
+    page_size = None
@@ -40,6 +40,17 @@ class PaymentWritePermission(BasePermission):
             return False
             
         if role == 'Cashier':
-            name = request.user.get_full_name() or request.user.username
-            return obj.status == 'pending' and obj.cashier_name == name
+            return obj.status == 'pending' and obj.is_taken_by(request.user)
         return False
+
+class DrawerSessionPermission(BasePermission):
+    """Cashiers open and close their own drawers; admins manage any drawer"""
+    def has_permission(self, request, view):
+        if request.method in SAFE_METHODS:
+            return True
+        return get_role(request.user) in {'Admin', 'Cashier'}
+
+    def has_object_permission(self, request, view, obj):
+        if request.method in SAFE_METHODS:
+            return True
+        return get_role(request.user) == 'Admin' or obj.cashier_id == request.user.id
@@ -128,6 +128,28 @@ REST_FRAMEWORK = {
     ],
 }
 
+# How long (seconds) a payment Idempotency-Key is remembered and replayed
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
+# Report result cache (core.cache): 'locmem' (in-process LRU) or 'redis' for
+# multi-process deployments. Entries are keyed by data version, never deleted.
+REPORT_CACHE = {
+    'BACKEND': os.environ.get('REPORT_CACHE_BACKEND', 'locmem'),
+    'MAX_ENTRIES': int(os.environ.get('REPORT_CACHE_MAX_ENTRIES', 1024)),
+    'REDIS_URL': os.environ.get('REDIS_URL', 'redis://localhost:6379/1'),
+    'TTL': 60 * 60,
+    # Coalesce identical concurrent misses: 'local' (per process) or 'lock' (Redis, across workers)
+    'SINGLE_FLIGHT': os.environ.get('REPORT_CACHE_SINGLE_FLIGHT', 'local'),
+}
+
+# In-process student name index (students.name_index) answering typeahead
+# without queries. Off by default: other processes see a write only after MAX_AGE.
+STUDENT_NAME_INDEX = {
+    'ENABLED': os.environ.get('STUDENT_NAME_INDEX_ENABLED', '0') == '1',
+    'MAX_BYTES': int(os.environ.get('STUDENT_NAME_INDEX_MAX_BYTES', 64 * 1024 * 1024)),
+    'MAX_AGE': 5 * 60,
+}
+
 # Swagger / drf-yasg settings (optional)
 SWAGGER_SETTINGS = {
     'USE_SESSION_AUTH': True,
@@ -0,0 +1,118 @@
+"""
+Single-flight coalescing for report computations.
+
+When many identical report requests (same school, report, parameters and
+data versions - i.e. the same report cache key) miss the cache at once, one
+request computes the result and the others wait for it instead of running
+the same aggregate in parallel.
+
+- LocalSingleFlight coalesces requests in one process (threaded workers).
+- LockSingleFlight coalesces across processes through a Redis lock: the
+  holder computes and fills the shared report cache, the others poll the
+  cache for its result.
+
+Waiters give up after `wait_timeout` seconds, or as soon as the computing
+request fails, and compute the report themselves, so coalescing can delay a
+request but never fail it.
+"""
+import threading
+import time
+import uuid
+
+from rest_framework.response import Response
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+
+
+class LocalSingleFlight:
+    def __init__(self, wait_timeout=10.0):
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def run(self, key, compute, fetch):
+        """
+        compute() -> Response; waiters get a copy of the leader's 200 response.
+        Returns (response, coalesced).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if call.done.wait(self.wait_timeout) and call.response is not None:
+                return Response(call.response.data), True
+            return compute(), False
+
+        try:
+            # A leader that just finished may have filled the cache after our miss
+            data = fetch()
+            if data is not None:
+                return Response(data), True
+            response = compute()
+            if response.status_code == 200:
+                call.response = response
+            return response, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+
+class LockSingleFlight:
+    # Release the lock only if we still hold it (it may have expired and been retaken)
+    RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, client, lock_ttl=30.0, wait_timeout=10.0, poll_interval=0.05):
+        self.client = client
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+
+    def run(self, key, compute, fetch):
+        """
+        compute() -> Response, filling the shared cache; fetch() -> cached data or None.
+        Returns (response, coalesced).
+        """
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        try:
+            leader = self.client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except Exception:
+            return compute(), False
+
+        if leader:
+            try:
+                data = fetch()
+                if data is not None:
+                    return Response(data), True
+                return compute(), False
+            finally:
+                try:
+                    self.client.eval(self.RELEASE_SCRIPT, 1, lock_key, token)
+                except Exception:
+                    pass  # the lock expires on its own
+
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            data = fetch()
+            if data is not None:
+                return Response(data), True
+            try:
+                if not self.client.exists(lock_key):
+                    break  # leader finished without caching (error or non-200)
+            except Exception:
+                break
+        return compute(), False
+
+
+class NoSingleFlight:
+    def run(self, key, compute, fetch):
+        return compute(), False
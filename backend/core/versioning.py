@@ -0,0 +1,110 @@
+"""
+Per-school and per-student data versions for conditional GETs.
+
+Every write that can change a report bumps the version of its school and of
+the students it touches, inside the writing transaction. A report's strong
+ETag is a hash of the request (path and query parameters) and the versions it
+depends on, so a poll whose data has not changed costs one version lookup and
+a 304 instead of re-running the aggregates.
+"""
+import hashlib
+from functools import wraps
+
+from django.db import transaction
+from django.db.models import F
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import DataVersion
+
+
+def school_key(school_id):
+    return f"school:{school_id if school_id is not None else 'none'}"
+
+
+def student_key(student_id):
+    return f"student:{student_id}"
+
+
+def bump_versions(school_ids=(), student_ids=()):
+    """Increment the versions of the given schools and students; call inside the write's transaction"""
+    keys = sorted({school_key(s) for s in school_ids} | {student_key(s) for s in student_ids if s is not None})
+    if not keys:
+        return
+    with transaction.atomic():
+        # Two statements however many keys: create missing rows, then bump them all
+        DataVersion.objects.bulk_create([DataVersion(key=key) for key in keys], ignore_conflicts=True)
+        DataVersion.objects.filter(key__in=keys).update(version=F('version') + 1)
+
+
+def current_versions(keys):
+    found = dict(DataVersion.objects.filter(key__in=keys).values_list('key', 'version'))
+    return [found.get(key, 0) for key in keys]
+
+
+def normalized_query(request):
+    """Query parameters as a stable string, independent of their order in the URL"""
+    return repr(sorted((name, value) for name in request.query_params for value in request.query_params.getlist(name)))
+
+
+def version_etag(request, versions):
+    """Strong ETag for this request path/query at the given [(key, version)]"""
+    parts = [request.path, normalized_query(request)] + [f"{key}={version}" for key, version in versions]
+    return '"%s"' % hashlib.sha256('|'.join(parts).encode()).hexdigest()[:32]
+
+
+def _etag_matches(request, etag):
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    # If-None-Match uses weak comparison
+    return '*' in candidates or any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+
+def _caller_school_id(request):
+    profile = getattr(request.user, 'profile', None) if request.user.is_authenticated else None
+    return profile.school_id if profile else None
+
+
+def conditional_on_versions(keys_for, cache_as=None):
+    """
+    Decorate an APIView handler with ETag / If-None-Match support and, when
+    `cache_as` names the report, the version-keyed result cache (core.cache).
+    `keys_for(request, *args, **kwargs)` returns the version keys the response
+    depends on, or None when it cannot be versioned (no ETag, no caching).
+    The versions are read before the handler runs, so a write that lands
+    while it runs yields a stale ETag or cache entry that is never served,
+    never a stale 304 or hit.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            keys = keys_for(request, *args, **kwargs)
+            if not keys:
+                return handler(self, request, *args, **kwargs)
+            versions = list(zip(keys, current_versions(keys)))
+            etag = version_etag(request, versions)
+            if _etag_matches(request, etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+            cache = cache_key = None
+            if cache_as:
+                from .cache import get_report_cache
+                cache = get_report_cache()
+                cache_key = cache.make_key(cache_as, _caller_school_id(request), normalized_query(request), versions)
+                data = cache.get(cache_as, cache_key)
+                if data is not None:
+                    return Response(data, headers={'ETag': etag, 'Cache-Control': 'private, no-cache'})
+
+            if cache is not None:
+                response = cache.compute(cache_as, cache_key, lambda: handler(self, request, *args, **kwargs))
+            else:
+                response = handler(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                response['ETag'] = etag
+                response['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -1,7 +1,9 @@
 from rest_framework import generics
 from .models import Notification
 from .serializers import NotificationSerializer
+from core.pagination import OptInPagination
 
 class NotificationListView(generics.ListAPIView):
     queryset = Notification.objects.all().order_by('-sent_at')
     serializer_class = NotificationSerializer
+    pagination_class = OptInPagination
@@ -0,0 +1,196 @@
+"""
+Bulk payment operations.
+
+Ingestion (offline-queue flushes): a whole queue is validated row by row,
+then students, cashiers and existing receipt numbers are resolved with one
+query each, receipt numbers are reserved per academic year in one round trip,
+and all valid rows are inserted with a single bulk_create inside one
+transaction.
+
+Day-end transitions: voiding a list of payments and posting every pending
+payment matching a filter are each one set-based UPDATE, guarded by the same
+state machine as the single-payment endpoints (pending -> posted,
+pending/posted -> voided).
+
+These paths bypass Payment.save(), so each updates the daily collection
+rollup (payments.rollups), the drawer session totals (payments.drawers) and
+the data versions (core.versioning) itself inside its transaction.
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Q
+
+from core.versioning import bump_versions
+from students.models import Student
+from .models import Payment
+from .rollups import record_created, record_status_change
+from .drawers import open_session_ids, record_drawer_created, record_drawer_status_change
+from .sequences import reserve_receipt_numbers
+from .serializers import BulkPaymentItemSerializer
+
+MAX_BULK_PAYMENTS = 500
+
+
+def _cashier_name(user):
+    return user.get_full_name() or user.username
+
+
+def ingest_payments(rows, school, request_user=None):
+    """
+    Validate and insert a batch of payments for a school.
+    Returns one result dict per input row, in input order.
+    """
+    results = [None] * len(rows)
+    valid = []
+
+    def fail(index, errors):
+        results[index] = {'index': index, 'ok': False, 'errors': errors}
+
+    for index, row in enumerate(rows):
+        serializer = BulkPaymentItemSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            fail(index, serializer.errors)
+
+    # Resolve students by id or student number in one query
+    student_ids = {attrs['student'] for _, attrs in valid if attrs.get('student')}
+    student_numbers = {attrs['student_number'] for _, attrs in valid if not attrs.get('student') and attrs.get('student_number')}
+    students_by_id, students_by_number = {}, {}
+    if student_ids or student_numbers:
+        students = Student.objects.filter(school=school).filter(
+            Q(id__in=student_ids) | Q(student_number__in=student_numbers)
+        ).only('id', 'student_number')
+        for student in students:
+            students_by_id[student.id] = student
+            students_by_number[student.student_number] = student
+
+    # Resolve explicit cashiers of the school in one query
+    cashier_ids = {attrs['cashier_id'] for _, attrs in valid if attrs.get('cashier_id')}
+    cashiers = User.objects.filter(profile__school=school).in_bulk(cashier_ids) if cashier_ids else {}
+    if request_user is not None and request_user.is_authenticated:
+        default_cashier, default_cashier_name = request_user, _cashier_name(request_user)
+    else:
+        default_cashier, default_cashier_name = None, 'Unknown'
+
+    # Client-supplied receipt numbers must not clash with stored or batch receipts
+    supplied = {attrs['receipt_number'] for _, attrs in valid if attrs.get('receipt_number')}
+    taken = set()
+    if supplied:
+        taken = set(
+            Payment.objects.filter(school=school, receipt_number__in=supplied)
+            .values_list('term', 'academic_year', 'receipt_number')
+        )
+
+    pending = []
+    for index, attrs in valid:
+        if attrs.get('student'):
+            student = students_by_id.get(attrs['student'])
+        else:
+            student = students_by_number.get(attrs['student_number'])
+        if student is None:
+            fail(index, {'student': ['Student not found']})
+            continue
+
+        receipt = attrs.get('receipt_number') or None
+        if receipt:
+            key = (attrs['term'], attrs['academic_year'], receipt)
+            if key in taken:
+                fail(index, {'receipt_number': ['Duplicate receipt number.']})
+                continue
+            taken.add(key)
+
+        cashier = cashiers.get(attrs.get('cashier_id'))
+        if attrs.get('cashier_id') and cashier is None:
+            fail(index, {'cashier_id': ['Cashier not found']})
+            continue
+
+        pending.append((index, Payment(
+            school=school,
+            student=student,
+            amount=attrs['amount'],
+            payment_method=attrs['payment_method'],
+            fee_type=attrs['fee_type'],
+            status=attrs['status'],
+            term=attrs['term'],
+            academic_year=attrs['academic_year'],
+            receipt_number=receipt,
+            cashier=cashier or default_cashier,
+            cashier_name=_cashier_name(cashier) if cashier else default_cashier_name,
+            reference_id=attrs.get('reference_id') or None,
+            bank_name=attrs.get('bank_name') or None,
+            merchant_provider=attrs.get('merchant_provider') or None,
+        )))
+
+    if pending:
+        with transaction.atomic():
+            # Reserve one block of receipt numbers per academic year
+            needs_receipt = {}
+            for _, payment in pending:
+                if not payment.receipt_number:
+                    needs_receipt.setdefault(payment.academic_year, []).append(payment)
+            for year, payments in needs_receipt.items():
+                for payment, receipt in zip(payments, reserve_receipt_numbers(school, year, len(payments))):
+                    payment.receipt_number = receipt
+
+            # New payments join their cashier's open drawer session
+            sessions = open_session_ids(school.id if school else None, {p.cashier_id for _, p in pending if p.cashier_id})
+            for _, payment in pending:
+                payment.drawer_session_id = sessions.get(payment.cashier_id)
+
+            created = Payment.objects.bulk_create([payment for _, payment in pending])
+            record_created(created)
+            record_drawer_created(created)
+            bump_versions([school.id if school else None], {payment.student_id for payment in created})
+
+        for index, payment in pending:
+            results[index] = {'index': index, 'ok': True, 'id': payment.id, 'receipt_number': payment.receipt_number}
+
+    return results
+
+
+def _bump_payment_versions(payment_ids):
+    scopes = set(Payment.objects.filter(id__in=payment_ids).values_list('school_id', 'student_id').distinct())
+    bump_versions({school_id for school_id, _ in scopes}, {student_id for _, student_id in scopes})
+
+
+def void_payments(queryset, ids, void_reason, user):
+    """
+    Void the payments in `queryset` with the given ids, all or nothing.
+    Returns (voided count, {id: error}); nothing is written if any id fails.
+    """
+    with transaction.atomic():
+        # Lock the rows so a concurrent void or edit cannot slip in between
+        statuses = dict(queryset.select_for_update().filter(id__in=ids).values_list('id', 'status'))
+        errors = {}
+        for payment_id in ids:
+            if payment_id not in statuses:
+                errors[payment_id] = 'Payment not found'
+            elif statuses[payment_id] == 'voided':
+                errors[payment_id] = 'Payment is already voided'
+        if errors:
+            return 0, errors
+
+        record_status_change(ids, 'voided')
+        record_drawer_status_change(ids, 'voided')
+        _bump_payment_versions(ids)
+        voided = queryset.filter(id__in=ids).exclude(status='voided').update(
+            status='voided',
+            void_reason=void_reason,
+            voided_at=timezone.now(),
+            voided_by=_cashier_name(user),
+        )
+    return voided, {}
+
+
+def post_payments(queryset):
+    """Post every pending payment in `queryset`; returns the number posted"""
+    with transaction.atomic():
+        ids = list(queryset.filter(status='pending').select_for_update().values_list('id', flat=True))
+        if not ids:
+            return 0
+        record_status_change(ids, 'posted')
+        record_drawer_status_change(ids, 'posted')
+        _bump_payment_versions(ids)
+        return Payment.objects.filter(id__in=ids).update(status='posted')
@@ -0,0 +1,156 @@
+"""
+Cashier drawer sessions.
+
+A cashier opens a session when taking over a drawer; new payments they take
+join it (Payment.save() and the bulk ingest both look up the open session,
+locking it so a concurrent close waits for the payment's transaction).
+The session's expected total is the sum of its posted payments, maintained as
+a delta on every write that changes a payment's session, status or amount:
+one UPDATE per touched session, in the payment's transaction. Reading a
+drawer's position is a primary-key lookup, however many payments it holds.
+Once a session is closed or handed over its totals are frozen to match its
+Reconciliation; later changes to its payments no longer move them.
+
+Closing or handing over a session records the cash count as a
+Reconciliation against the running expected total; a handover also opens
+the next cashier's session at the same campus.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import DrawerSession, Payment
+
+# Only posted payments count towards what should be in the drawer
+COUNTED_STATUS = 'posted'
+
+
+class DrawerError(Exception):
+    """A drawer transition that is not allowed in the session's current state"""
+
+
+def open_session_ids(school_id, cashier_ids):
+    """
+    {cashier id: open session id} for the given cashiers, in one query. The
+    sessions stay locked until the caller's transaction ends, so call inside
+    the transaction that attaches payments to them.
+    """
+    return dict(
+        DrawerSession.objects.select_for_update()
+        .filter(school_id=school_id, cashier_id__in=cashier_ids, status='open')
+        .order_by('id').values_list('cashier_id', 'id')
+    )
+
+
+def stored_drawer_state(payment_id):
+    """(session id, status, amount) of a payment as currently stored, or None"""
+    return Payment.objects.filter(pk=payment_id).values_list('drawer_session_id', 'status', 'amount').first()
+
+
+def apply_session_deltas(deltas):
+    """Add {session id: (count delta, amount delta)} to the running totals of the sessions still open"""
+    for session_id, (count, amount) in deltas.items():
+        if session_id is None or (not count and not amount):
+            continue
+        DrawerSession.objects.filter(pk=session_id, status='open').update(
+            payment_count=F('payment_count') + count,
+            expected_total=F('expected_total') + amount,
+        )
+
+
+def record_drawer_change(old_state, new_state):
+    """Move one payment's contribution between sessions; states are (session id, status, amount) or None"""
+    if old_state == new_state:
+        return
+    deltas = defaultdict(lambda: [0, Decimal('0')])
+    if old_state is not None and old_state[1] == COUNTED_STATUS:
+        deltas[old_state[0]][0] -= 1
+        deltas[old_state[0]][1] -= Decimal(str(old_state[2]))
+    if new_state is not None and new_state[1] == COUNTED_STATUS:
+        deltas[new_state[0]][0] += 1
+        deltas[new_state[0]][1] += Decimal(str(new_state[2]))
+    apply_session_deltas(deltas)
+
+
+def record_drawer_created(payments):
+    """Add freshly inserted payments (e.g. after bulk_create) to their sessions"""
+    deltas = defaultdict(lambda: [0, Decimal('0')])
+    for payment in payments:
+        if payment.status == COUNTED_STATUS:
+            deltas[payment.drawer_session_id][0] += 1
+            deltas[payment.drawer_session_id][1] += Decimal(str(payment.amount))
+    apply_session_deltas(deltas)
+
+
+def record_drawer_status_change(payment_ids, new_status):
+    """
+    Adjust sessions for payments about to be switched to `new_status` by a
+    set-based UPDATE. Call inside the transaction that runs the UPDATE.
+    """
+    rows = (
+        Payment.objects.filter(id__in=payment_ids, drawer_session__isnull=False)
+        .exclude(status=new_status)
+        .order_by().values('drawer_session_id', 'status')
+        .annotate(total=Sum('amount'), n=Count('id'))
+    )
+    deltas = defaultdict(lambda: [0, Decimal('0')])
+    for row in rows:
+        sign = 1 if new_status == COUNTED_STATUS else (-1 if row['status'] == COUNTED_STATUS else 0)
+        deltas[row['drawer_session_id']][0] += sign * row['n']
+        deltas[row['drawer_session_id']][1] += sign * (row['total'] or Decimal('0'))
+    apply_session_deltas(deltas)
+
+
+def open_session(school, cashier, campus=None, previous_session=None):
+    """Open a drawer session; raises DrawerError if the cashier already has one open"""
+    try:
+        with transaction.atomic():
+            return DrawerSession.objects.create(
+                school=school, cashier=cashier, campus=campus, previous_session=previous_session
+            )
+    except IntegrityError:
+        raise DrawerError(f'{cashier.get_full_name() or cashier.username} already has an open drawer')
+
+
+def close_session(session, counted_amount, notes='', status='closed'):
+    """
+    Close an open session with the cashier's cash count and record it as a
+    Reconciliation against the session's expected total.
+    """
+    from reports.models import Reconciliation
+    from reports.reconciliation import reconciliation_status
+
+    with transaction.atomic():
+        # Lock the row so no payment delta lands between reading and closing
+        session = DrawerSession.objects.select_for_update().get(pk=session.pk)
+        if session.status != 'open':
+            raise DrawerError('This drawer session is already closed')
+        session.status = status
+        session.closed_at = timezone.now()
+        session.counted_amount = counted_amount
+        session.save(update_fields=['status', 'closed_at', 'counted_amount'])
+
+        variance = counted_amount - session.expected_total
+        reconciliation = Reconciliation.objects.create(
+            school=session.school,
+            cashier=session.cashier,
+            date=timezone.localdate(session.closed_at),
+            drawer_session=session,
+            expected_total=session.expected_total,
+            actual_amount=counted_amount,
+            variance=variance,
+            status=reconciliation_status(variance),
+            notes=notes,
+        )
+    return session, reconciliation
+
+
+def hand_over_session(session, to_cashier, counted_amount, notes=''):
+    """Close `session` as handed over and open `to_cashier`'s next session at the same campus"""
+    with transaction.atomic():
+        session, reconciliation = close_session(session, counted_amount, notes, status='handed_over')
+        next_session = open_session(session.school, to_cashier, session.campus, previous_session=session)
+    return session, next_session, reconciliation
@@ -0,0 +1,93 @@
+"""
+Streaming payment export.
+
+Rows are read with `values_list(...).iterator(chunk_size=...)` and written
+straight to the response as CSV or newline-delimited JSON, one chunk at a
+time, so memory stays flat however many payments match and no model
+instances or serializers are built.
+"""
+import csv
+import io
+import json
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (output column, queryset lookup)
+EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('receipt_number', 'receipt_number'),
+    ('date', 'date'),
+    ('student', 'student_id'),
+    ('student_number', 'student__student_number'),
+    ('amount', 'amount'),
+    ('payment_method', 'payment_method'),
+    ('fee_type', 'fee_type'),
+    ('status', 'status'),
+    ('term', 'term'),
+    ('academic_year', 'academic_year'),
+    ('cashier', 'cashier_id'),
+    ('cashier_name', 'cashier_name'),
+    ('reference_id', 'reference_id'),
+    ('bank_name', 'bank_name'),
+    ('merchant_provider', 'merchant_provider'),
+    ('void_reason', 'void_reason'),
+    ('voided_at', 'voided_at'),
+    ('voided_by', 'voided_by'),
+)
+HEADER = [name for name, _ in EXPORT_COLUMNS]
+VOIDED_AT = HEADER.index('voided_at')
+
+
+class CSVExportRenderer(BaseRenderer):
+    """Lets `?format=csv` through content negotiation; the view streams the body itself"""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, cls=DjangoJSONEncoder).encode() if data is not None else b''
+
+
+class NDJSONExportRenderer(CSVExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+def _chunks(queryset):
+    rows = queryset.values_list(*[lookup for _, lookup in EXPORT_COLUMNS]).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    while True:
+        chunk = list(islice(rows, EXPORT_CHUNK_SIZE))
+        if not chunk:
+            return
+        yield chunk
+
+
+def stream_csv(queryset):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADER)
+    yield buffer.getvalue()
+    for chunk in _chunks(queryset):
+        buffer.seek(0)
+        buffer.truncate()
+        for row in chunk:
+            if row[VOIDED_AT] is not None:
+                row = row[:VOIDED_AT] + (row[VOIDED_AT].isoformat(),) + row[VOIDED_AT + 1:]
+            writer.writerow(row)
+        yield buffer.getvalue()
+
+
+def stream_ndjson(queryset):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for chunk in _chunks(queryset):
+        yield ''.join(encoder.encode(dict(zip(HEADER, row))) + '\n' for row in chunk)
+
+
+STREAMERS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+}
@@ -0,0 +1,87 @@
+"""
+Server-side filtering for the payments list.
+
+status, date, cashier, term/academic_year and student are equalities or
+ranges that one of the composite indexes declared on Payment.Meta can seek on
+(led by `school`, since querysets are already scoped to the user's school, or
+by `student`). cashier_name, fee_type and payment_method are not indexed: they
+are residual predicates applied to the rows of the school/date index scan.
+"""
+from datetime import date
+
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+
+def _parse_date(name, value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({name: 'Enter a valid date (YYYY-MM-DD)'})
+
+
+def _parse_int(name, value):
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: 'Enter a whole number'})
+
+
+def _parse_choice(name, value, choices):
+    values = [v for v in value.split(',') if v]
+    invalid = [v for v in values if v not in choices]
+    if invalid:
+        raise ValidationError({name: f"Invalid value(s): {', '.join(invalid)}"})
+    if not values:
+        raise ValidationError({name: 'Enter at least one value'})
+    return values
+
+
+def _choice_filter(field, values):
+    return {field: values[0]} if len(values) == 1 else {f'{field}__in': values}
+
+
+class PaymentFilterBackend(filters.BaseFilterBackend):
+    """
+    Filters: status (comma list), date, date_from, date_to, cashier (user id),
+    cashier_name, term (comma list), academic_year, fee_type, payment_method, student.
+    """
+    PARAMS = (
+        'status', 'date', 'date_from', 'date_to', 'cashier', 'cashier_name',
+        'term', 'academic_year', 'fee_type', 'payment_method', 'student',
+    )
+    STATUSES = {'pending', 'posted', 'voided'}
+    TERMS = {'1', '2', '3'}
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        filters_ = {}
+
+        if params.get('status'):
+            filters_.update(_choice_filter('status', _parse_choice('status', params['status'], self.STATUSES)))
+        if params.get('date'):
+            filters_['date'] = _parse_date('date', params['date'])
+        if params.get('date_from'):
+            filters_['date__gte'] = _parse_date('date_from', params['date_from'])
+        if params.get('date_to'):
+            filters_['date__lte'] = _parse_date('date_to', params['date_to'])
+        if params.get('cashier'):
+            filters_['cashier_id'] = _parse_int('cashier', params['cashier'])
+        if params.get('cashier_name'):
+            filters_['cashier_name'] = params['cashier_name']
+        if params.get('term'):
+            filters_.update(_choice_filter('term', _parse_choice('term', params['term'], self.TERMS)))
+        if params.get('academic_year'):
+            filters_['academic_year'] = _parse_int('academic_year', params['academic_year'])
+        if params.get('fee_type'):
+            filters_['fee_type'] = params['fee_type']
+        if params.get('payment_method'):
+            filters_['payment_method'] = params['payment_method']
+        if params.get('student'):
+            filters_['student_id'] = _parse_int('student', params['student'])
+
+        return queryset.filter(**filters_) if filters_ else queryset
+
+    @classmethod
+    def is_filtered(cls, request):
+        return any(request.query_params.get(name) for name in cls.PARAMS)
@@ -0,0 +1,97 @@
+"""
+Idempotency-Key support for payment writes.
+
+Clients send a unique `Idempotency-Key` header per logical payment. The first
+successful response is stored in the same transaction as the write it
+describes; retries with the same key inside IDEMPOTENCY_KEY_TTL get that
+response back without running the serializer or touching payments again.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyRecord
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+def idempotency_ttl():
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 24 * 60 * 60))
+
+
+def request_hash(request):
+    """Fingerprint of the request so a key cannot be reused for a different payload"""
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method} {request.path}\n{body}".encode()).hexdigest()
+
+
+def _live_record(user, key):
+    cutoff = timezone.now() - idempotency_ttl()
+    return IdempotencyRecord.objects.filter(user=user, key=key, created_at__gte=cutoff).first()
+
+
+def _replay(record, fingerprint):
+    if record.request_hash != fingerprint:
+        return Response(
+            {'detail': 'Idempotency-Key has already been used for a different request'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    return Response(record.response_body, status=record.status_code, headers={REPLAYED_HEADER: 'true'})
+
+
+def idempotent(request, handler):
+    """
+    Run `handler()` at most once per (user, Idempotency-Key).
+    Requests without the header are passed straight through.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not key or not request.user or not request.user.is_authenticated:
+        return handler()
+    if len(key) > MAX_KEY_LENGTH:
+        return Response(
+            {'detail': f'Idempotency-Key must be at most {MAX_KEY_LENGTH} characters'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    fingerprint = request_hash(request)
+    record = _live_record(request.user, key)
+    if record:
+        return _replay(record, fingerprint)
+
+    try:
+        with transaction.atomic():
+            response = handler()
+            if status.is_success(response.status_code):
+                # Evict this user's expired keys (including a stale copy of this one)
+                IdempotencyRecord.objects.filter(
+                    user=request.user, created_at__lt=timezone.now() - idempotency_ttl()
+                ).delete()
+                IdempotencyRecord.objects.create(
+                    user=request.user,
+                    key=key,
+                    request_hash=fingerprint,
+                    status_code=response.status_code,
+                    response_body=response.data,
+                )
+    except IntegrityError:
+        # A concurrent request with the same key committed first; ours was rolled back
+        record = _live_record(request.user, key)
+        if record is None:
+            raise
+        return _replay(record, fingerprint)
+    return response
+
+
+def purge_expired_records():
+    """Delete every expired idempotency record. Returns the number removed."""
+    cutoff = timezone.now() - idempotency_ttl()
+    deleted, _ = IdempotencyRecord.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
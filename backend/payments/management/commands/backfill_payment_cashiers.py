@@ -0,0 +1,90 @@
+"""
+Backfill Payment.cashier from the legacy cashier_name column.
+
+Walks payments with no cashier in primary-key order, one chunk per
+transaction, and matches cashier_name against each user's full name (or
+username). Re-running it picks up where it stopped, since filled rows drop out
+of the scan; --start-id resumes from the last id printed by an interrupted run.
+Names shared by several users are resolved within the payment's school, and
+left empty if still ambiguous. Each chunk moves its payments' daily
+collection buckets to the new cashiers and bumps the data versions of the
+schools it touched, in the chunk's transaction.
+"""
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.versioning import bump_versions
+from payments.models import Payment
+from payments.rollups import record_cashier_change
+
+
+class Command(BaseCommand):
+    help = 'Populate Payment.cashier from cashier_name in resumable chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Payments per transaction')
+        parser.add_argument('--start-id', type=int, default=0, help='Only process payments with id above this')
+        parser.add_argument('--dry-run', action='store_true', help='Report matches without writing')
+
+    def build_name_index(self):
+        """name -> [(user_id, school_id)] for every user"""
+        index = defaultdict(list)
+        users = User.objects.select_related('profile').only(
+            'id', 'username', 'first_name', 'last_name', 'profile__school_id'
+        )
+        for user in users:
+            profile = getattr(user, 'profile', None)
+            index[user.get_full_name() or user.username].append((user.id, profile.school_id if profile else None))
+        return index
+
+    def resolve(self, index, name, school_id):
+        candidates = index.get(name, [])
+        if len(candidates) > 1:
+            candidates = [c for c in candidates if c[1] == school_id]
+        return candidates[0][0] if len(candidates) == 1 else None
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_id = options['start_id']
+        dry_run = options['dry_run']
+        index = self.build_name_index()
+        matched = unmatched = 0
+
+        while True:
+            chunk = list(
+                Payment.objects.filter(cashier__isnull=True, id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'school_id', 'cashier_name')[:chunk_size]
+            )
+            if not chunk:
+                break
+
+            # One UPDATE per cashier in the chunk
+            groups = defaultdict(list)
+            schools = set()
+            for payment_id, school_id, name in chunk:
+                user_id = self.resolve(index, name, school_id)
+                if user_id is None:
+                    unmatched += 1
+                else:
+                    groups[user_id].append(payment_id)
+                    schools.add(school_id)
+                    matched += 1
+
+            if not dry_run and groups:
+                with transaction.atomic():
+                    for user_id, ids in groups.items():
+                        # Lock the rows so the rollup moves exactly what the UPDATE changes
+                        locked = Payment.objects.select_for_update().filter(id__in=ids, cashier__isnull=True)
+                        payments = Payment.objects.filter(id__in=list(locked.values_list('id', flat=True)))
+                        record_cashier_change(payments, user_id)
+                        payments.update(cashier_id=user_id)
+                    bump_versions(schools)
+
+            last_id = chunk[-1][0]
+            self.stdout.write(f"Processed up to payment id {last_id} ({matched} matched, {unmatched} unmatched)")
+
+        verb = 'Would backfill' if dry_run else 'Backfilled'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {matched} payment(s); {unmatched} without a matching user"))
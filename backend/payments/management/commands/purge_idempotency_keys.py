@@ -0,0 +1,14 @@
+"""
+Remove payment Idempotency-Key records older than IDEMPOTENCY_KEY_TTL.
+Safe to run at any time; schedule it daily to keep the table small.
+"""
+from django.core.management.base import BaseCommand
+from payments.idempotency import purge_expired_records
+
+
+class Command(BaseCommand):
+    help = 'Delete expired payment idempotency records'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_records()
+        self.stdout.write(self.style.SUCCESS(f"Removed {deleted} expired idempotency record(s)"))
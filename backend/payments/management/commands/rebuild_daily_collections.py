@@ -0,0 +1,53 @@
+"""
+Verify the daily collection rollup against the payments table and repair drift.
+
+    python manage.py rebuild_daily_collections --verify
+    python manage.py rebuild_daily_collections --school 3 --date-from 2026-01-01
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from payments.rollups import collection_drift, rebuild_collections
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}' (expected YYYY-MM-DD)")
+
+
+class Command(BaseCommand):
+    help = 'Rebuild drifted DailyCollection buckets from payments (or only report drift with --verify)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true', help='Report drift and exit non-zero without writing')
+        parser.add_argument('--school', type=int, help='Only this school id')
+        parser.add_argument('--date-from', help='Only payment dates on or after YYYY-MM-DD')
+        parser.add_argument('--date-to', help='Only payment dates on or before YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        scope = {
+            'school_id': options['school'],
+            'date_from': _date(options['date_from']) if options['date_from'] else None,
+            'date_to': _date(options['date_to']) if options['date_to'] else None,
+        }
+
+        if options['verify']:
+            drift = collection_drift(**scope)
+        else:
+            drift = rebuild_collections(**scope)
+
+        for key, ((want_count, want_total), (have_count, have_total)) in sorted(drift.items(), key=str):
+            school_id, day, cashier_id, term, year, method, fee_type, status = key
+            self.stdout.write(
+                f"school={school_id} date={day} cashier={cashier_id} term={term}/{year} {method} {fee_type} {status}: "
+                f"stored {have_count} / {have_total}, expected {want_count} / {want_total}"
+            )
+
+        if options['verify']:
+            if drift:
+                raise CommandError(f"{len(drift)} drifted bucket(s)")
+            self.stdout.write(self.style.SUCCESS('Daily collections match payments'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(drift)} bucket(s)"))
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.26 on 2026-10-18 08:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('payments', '0010_remove_payment_unique_receipt_per_term_year_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceiptSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('academic_year', models.IntegerField()),
+                ('last_value', models.PositiveIntegerField(default=0, help_text='Last receipt sequence number issued')),
+                ('school', models.ForeignKey(help_text='School this receipt sequence belongs to', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='receipt_sequences', to='core.school')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='receiptsequence',
+            constraint=models.UniqueConstraint(fields=('school', 'academic_year'), name='unique_receipt_sequence_per_school_year'),
+        ),
+    ]
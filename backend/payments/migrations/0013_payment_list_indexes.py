@@ -0,0 +1,29 @@
+# Generated by Django 4.2.26 on 2026-10-18 08:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0012_idempotencyrecord'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['school', 'date', 'id'], name='payment_school_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['school', 'status', 'voided_at'], name='payment_school_status_void_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['school', 'term', 'academic_year', 'status', 'date'], name='payment_school_term_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['school', 'cashier_name', 'date'], name='payment_school_cashier_idx'),
+        ),
+    ]
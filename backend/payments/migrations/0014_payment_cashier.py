@@ -0,0 +1,29 @@
+# Generated by Django 4.2.26 on 2026-10-18 08:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('payments', '0013_payment_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='payment',
+            name='payment_school_cashier_idx',
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='cashier',
+            field=models.ForeignKey(blank=True, help_text='User who took this payment (cashier_name is kept for display)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cashier_payments', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['school', 'cashier', 'date'], name='payment_school_cashier_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.26 on 2026-10-18 09:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum
+
+KEY_FIELDS = ('school_id', 'date', 'cashier_id', 'term', 'academic_year', 'payment_method', 'fee_type', 'status')
+
+
+def build_daily_collections(apps, schema_editor):
+    Payment = apps.get_model('payments', 'Payment')
+    DailyCollection = apps.get_model('payments', 'DailyCollection')
+    rows = Payment.objects.order_by().values(*KEY_FIELDS).annotate(n=Count('id'), total=Sum('amount'))
+    batch = []
+    for row in rows.iterator():
+        batch.append(DailyCollection(
+            **{name: row[name] for name in KEY_FIELDS}, payment_count=row['n'], total_amount=row['total']
+        ))
+        if len(batch) >= 1000:
+            DailyCollection.objects.bulk_create(batch)
+            batch = []
+    DailyCollection.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0001_initial'),
+        ('payments', '0014_payment_cashier'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCollection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('term', models.CharField(max_length=10)),
+                ('academic_year', models.IntegerField()),
+                ('payment_method', models.CharField(max_length=50)),
+                ('fee_type', models.CharField(max_length=50)),
+                ('status', models.CharField(max_length=10)),
+                ('payment_count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cashier', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_collections', to=settings.AUTH_USER_MODEL)),
+                ('school', models.ForeignKey(help_text='School these payments belong to', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_collections', to='core.school')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['school', 'academic_year', 'term', 'status'], name='daily_collection_term_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailycollection',
+            constraint=models.UniqueConstraint(fields=('school', 'date', 'cashier', 'term', 'academic_year', 'payment_method', 'fee_type', 'status'), name='unique_daily_collection_bucket'),
+        ),
+        migrations.RunPython(build_daily_collections, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.26 on 2026-10-18 09:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0015_dailycollection'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['student', 'date', 'id'], name='payment_student_date_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.26 on 2026-10-18 09:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_dataversion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('students', '0002_alter_campus_options_alter_student_options_and_more'),
+        ('payments', '0016_payment_student_history_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DrawerSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('open', 'Open'), ('closed', 'Closed'), ('handed_over', 'Handed over')], default='open', max_length=12)),
+                ('opened_at', models.DateTimeField(auto_now_add=True)),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+                ('expected_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('payment_count', models.IntegerField(default=0)),
+                ('counted_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True)),
+                ('campus', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='drawer_sessions', to='students.campus')),
+                ('cashier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='drawer_sessions', to=settings.AUTH_USER_MODEL)),
+                ('previous_session', models.OneToOneField(blank=True, help_text='Session handed over into this one', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='next_session', to='payments.drawersession')),
+                ('school', models.ForeignKey(help_text='School this drawer belongs to', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='drawer_sessions', to='core.school')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='drawer_session',
+            field=models.ForeignKey(blank=True, help_text="Cashier's open drawer session when the payment was taken", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payments', to='payments.drawersession'),
+        ),
+        migrations.AddIndex(
+            model_name='drawersession',
+            index=models.Index(fields=['school', 'status', 'campus'], name='drawer_session_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='drawersession',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'open')), fields=('school', 'cashier'), name='one_open_drawer_per_cashier'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.26 on 2026-10-18 10:16
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def merge_school_less_counters(apps, schema_editor):
+    """Keep one school-less counter per year, at the highest value issued"""
+    ReceiptSequence = apps.get_model('payments', 'ReceiptSequence')
+    rows = ReceiptSequence.objects.filter(school__isnull=True)
+    for year, last_value in rows.values_list('academic_year').annotate(top=Max('last_value')).order_by():
+        counters = list(rows.filter(academic_year=year).order_by('id'))
+        if len(counters) > 1:
+            counters[0].last_value = last_value
+            counters[0].save(update_fields=['last_value'])
+            rows.filter(id__in=[counter.id for counter in counters[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0017_drawer_session'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_school_less_counters, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='receiptsequence',
+            constraint=models.UniqueConstraint(condition=models.Q(('school__isnull', True)), fields=('academic_year',), name='unique_receipt_sequence_per_year_without_school'),
+        ),
+    ]
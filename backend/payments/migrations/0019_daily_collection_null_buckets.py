@@ -0,0 +1,44 @@
+# Generated by Django 4.2.26 on 2026-10-18 10:19
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+KEY_FIELDS = ('school_id', 'date', 'cashier_id', 'term', 'academic_year', 'payment_method', 'fee_type', 'status')
+
+
+def merge_duplicate_buckets(apps, schema_editor):
+    """Sum buckets that only differed by NULL school/cashier into one row per key"""
+    DailyCollection = apps.get_model('payments', 'DailyCollection')
+    nullable = DailyCollection.objects.filter(Q(school__isnull=True) | Q(cashier__isnull=True))
+    duplicated = nullable.values(*KEY_FIELDS).annotate(n=Count('id')).filter(n__gt=1).order_by()
+    for key in duplicated:
+        key.pop('n')
+        buckets = list(nullable.filter(**key).order_by('id'))
+        keep = buckets[0]
+        keep.payment_count = sum(bucket.payment_count for bucket in buckets)
+        keep.total_amount = sum(bucket.total_amount for bucket in buckets)
+        keep.save(update_fields=['payment_count', 'total_amount'])
+        DailyCollection.objects.filter(id__in=[bucket.id for bucket in buckets[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0018_receipt_sequence_null_school'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_buckets, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailycollection',
+            constraint=models.UniqueConstraint(condition=models.Q(('cashier__isnull', True), ('school__isnull', False)), fields=('school', 'date', 'term', 'academic_year', 'payment_method', 'fee_type', 'status'), name='unique_daily_collection_bucket_no_cashier'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailycollection',
+            constraint=models.UniqueConstraint(condition=models.Q(('cashier__isnull', False), ('school__isnull', True)), fields=('date', 'cashier', 'term', 'academic_year', 'payment_method', 'fee_type', 'status'), name='unique_daily_collection_bucket_no_school'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailycollection',
+            constraint=models.UniqueConstraint(condition=models.Q(('cashier__isnull', True), ('school__isnull', True)), fields=('date', 'term', 'academic_year', 'payment_method', 'fee_type', 'status'), name='unique_daily_collection_bucket_no_school_cashier'),
+        ),
+    ]
@@ -1,7 +1,27 @@
-from django.db import models
+from django.db import models, transaction
 from students.models import Student
 from django.contrib.auth.models import User
-from django.db.models import UniqueConstraint
+from django.db.models import Q, UniqueConstraint
+
+# Payment columns that pick its DailyCollection bucket
+ROLLUP_KEY_FIELDS = ('school_id', 'date', 'cashier_id', 'term', 'academic_year', 'payment_method', 'fee_type', 'status')
+
+
+def rollup_state(payment):
+    """(bucket key, amount) as loaded on a payment, or None if any of it is deferred"""
+    values = payment.__dict__
+    if 'amount' not in values or any(name not in values for name in ROLLUP_KEY_FIELDS):
+        return None
+    return tuple(values[name] for name in ROLLUP_KEY_FIELDS), values['amount']
+
+
+def drawer_state(payment):
+    """(drawer session id, status, amount) as loaded on a payment, or None if any of it is deferred"""
+    values = payment.__dict__
+    if any(name not in values for name in ('drawer_session_id', 'status', 'amount')):
+        return None
+    return values['drawer_session_id'], values['status'], values['amount']
+
 
 class Payment(models.Model):
     PAYMENT_STATUS = [
@@ -24,6 +44,22 @@ class Payment(models.Model):
     status = models.CharField(max_length=10, choices=PAYMENT_STATUS, default='pending')
     date = models.DateField(auto_now_add=True)
     cashier_name = models.CharField(max_length=100)
+    cashier = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name='cashier_payments',
+        null=True,
+        blank=True,
+        help_text="User who took this payment (cashier_name is kept for display)"
+    )
+    drawer_session = models.ForeignKey(
+        'DrawerSession',
+        on_delete=models.SET_NULL,
+        related_name='payments',
+        null=True,
+        blank=True,
+        help_text="Cashier's open drawer session when the payment was taken"
+    )
     term = models.CharField(max_length=10, choices=[('1','Term 1'),('2','Term 2'),('3','Term 3')])
     academic_year = models.IntegerField()
     
@@ -47,6 +83,43 @@ class Payment(models.Model):
     def __str__(self):
         return f"{self.student.student_number} - {self.receipt_number}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored rollup bucket so save() can move the payment between buckets
+        instance._rollup_state = rollup_state(instance)
+        instance._drawer_state = drawer_state(instance)
+        instance._loaded_student_id = instance.__dict__.get('student_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        from core.versioning import bump_versions
+        from .rollups import stored_rollup_state, record_payment_change
+        from .drawers import open_session_ids, stored_drawer_state, record_drawer_change
+        with transaction.atomic():
+            old_state = old_drawer = None
+            if self.pk:
+                old_state = getattr(self, '_rollup_state', None) or stored_rollup_state(self.pk)
+                old_drawer = getattr(self, '_drawer_state', None) or stored_drawer_state(self.pk)
+            elif self.drawer_session_id is None and self.cashier_id is not None:
+                # New payments join the cashier's open drawer session
+                self.drawer_session_id = open_session_ids(self.school_id, [self.cashier_id]).get(self.cashier_id)
+            super().save(*args, **kwargs)
+            new_state = rollup_state(self)
+            new_drawer = drawer_state(self)
+            record_payment_change(old_state, new_state)
+            record_drawer_change(old_drawer, new_drawer)
+            bump_versions([self.school_id], {getattr(self, '_loaded_student_id', None), self.student_id})
+        self._rollup_state = new_state
+        self._drawer_state = new_drawer
+        self._loaded_student_id = self.student_id
+
+    def is_taken_by(self, user):
+        """Whether `user` is this payment's cashier (name match only for rows not yet backfilled)"""
+        if self.cashier_id is not None:
+            return self.cashier_id == user.id
+        return self.cashier_name == (user.get_full_name() or user.username)
+
     class Meta:
         constraints = [
             UniqueConstraint(
@@ -54,6 +127,186 @@ class Payment(models.Model):
                 name='unique_receipt_per_school_term_year'
             )
         ]
+        # Composite indexes backing the payments list filters/orderings (payments.filters)
+        indexes = [
+            # Default listing (-date, -id), date ranges, fee_type/payment_method within a range
+            models.Index(fields=['school', 'date', 'id'], name='payment_school_date_idx'),
+            # Void history: ?status=voided&ordering=-voided_at
+            models.Index(fields=['school', 'status', 'voided_at'], name='payment_school_status_void_idx'),
+            # Term summaries and ?term=&academic_year=&status= listings in date order
+            models.Index(fields=['school', 'term', 'academic_year', 'status', 'date'], name='payment_school_term_idx'),
+            # Per-cashier listing, daily cashier reports and reconciliation
+            models.Index(fields=['school', 'cashier', 'date'], name='payment_school_cashier_idx'),
+            # A student's payment history, newest first (report summary, balances)
+            models.Index(fields=['student', 'date', 'id'], name='payment_student_date_idx'),
+        ]
+
+class ReceiptSequence(models.Model):
+    """
+    Per-school, per-academic-year receipt counter.
+    Receipt numbers are issued by bumping `last_value` (see payments.sequences)
+    instead of scanning the payments table for the latest receipt.
+    """
+    school = models.ForeignKey(
+        'core.School',
+        on_delete=models.CASCADE,
+        related_name='receipt_sequences',
+        null=True,  # Mirrors Payment.school during the multi-tenant migration
+        help_text="School this receipt sequence belongs to"
+    )
+    academic_year = models.IntegerField()
+    last_value = models.PositiveIntegerField(default=0, help_text='Last receipt sequence number issued')
+
+    def __str__(self):
+        return f"{self.school_id} {self.academic_year}: {self.last_value}"
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=['school', 'academic_year'],
+                name='unique_receipt_sequence_per_school_year'
+            ),
+            # NULL schools compare as distinct above, so school-less counters need their own guard
+            UniqueConstraint(
+                fields=['academic_year'],
+                condition=Q(school__isnull=True),
+                name='unique_receipt_sequence_per_year_without_school'
+            ),
+        ]
+
+class IdempotencyRecord(models.Model):
+    """
+    Stored response for a payment write made with an `Idempotency-Key` header.
+    Retries with the same key replay this response instead of running the write
+    again (see payments.idempotency). Records expire after IDEMPOTENCY_KEY_TTL.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_records')
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64, help_text='SHA-256 of method, path and body of the original request')
+    status_code = models.PositiveSmallIntegerField()
+    response_body = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.user_id} {self.key}"
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=['user', 'key'],
+                name='unique_idempotency_key_per_user'
+            )
+        ]
+
+class DailyCollection(models.Model):
+    """
+    Running count and total of payments per (school, date, cashier, term,
+    academic_year, payment_method, fee_type, status) bucket.
+    Maintained in the same transaction as every payment write (see
+    payments.rollups) so the cashier, term and reconciliation reports read a
+    handful of buckets instead of scanning payments. Buckets left at zero are
+    kept; rebuild_daily_collections drops them and repairs any drift.
+    """
+    school = models.ForeignKey(
+        'core.School',
+        on_delete=models.CASCADE,
+        related_name='daily_collections',
+        null=True,  # Mirrors Payment.school during the multi-tenant migration
+        help_text="School these payments belong to"
+    )
+    date = models.DateField()
+    cashier = models.ForeignKey(User, on_delete=models.SET_NULL, related_name='daily_collections', null=True, blank=True)
+    term = models.CharField(max_length=10)
+    academic_year = models.IntegerField()
+    payment_method = models.CharField(max_length=50)
+    fee_type = models.CharField(max_length=50)
+    status = models.CharField(max_length=10)
+    payment_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.school_id} {self.date} {self.cashier_id} {self.payment_method} {self.status}: {self.total_amount}"
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=['school', 'date', 'cashier', 'term', 'academic_year', 'payment_method', 'fee_type', 'status'],
+                name='unique_daily_collection_bucket'
+            ),
+            # NULLs compare as distinct above; one bucket per key without a cashier and/or school too
+            UniqueConstraint(
+                fields=['school', 'date', 'term', 'academic_year', 'payment_method', 'fee_type', 'status'],
+                condition=Q(cashier__isnull=True, school__isnull=False),
+                name='unique_daily_collection_bucket_no_cashier'
+            ),
+            UniqueConstraint(
+                fields=['date', 'cashier', 'term', 'academic_year', 'payment_method', 'fee_type', 'status'],
+                condition=Q(school__isnull=True, cashier__isnull=False),
+                name='unique_daily_collection_bucket_no_school'
+            ),
+            UniqueConstraint(
+                fields=['date', 'term', 'academic_year', 'payment_method', 'fee_type', 'status'],
+                condition=Q(school__isnull=True, cashier__isnull=True),
+                name='unique_daily_collection_bucket_no_school_cashier'
+            ),
+        ]
+        indexes = [
+            # Term summaries
+            models.Index(fields=['school', 'academic_year', 'term', 'status'], name='daily_collection_term_idx'),
+        ]
+
+class DrawerSession(models.Model):
+    """
+    A cashier's shift at a cash drawer, from opening to close or handover.
+    `expected_total` / `payment_count` are the posted payments taken in the
+    session, kept current by every payment post, void, edit and delete
+    (see payments.drawers), so live drawer positions never scan payments.
+    """
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('closed', 'Closed'),
+        ('handed_over', 'Handed over'),
+    ]
+
+    school = models.ForeignKey(
+        'core.School',
+        on_delete=models.CASCADE,
+        related_name='drawer_sessions',
+        null=True,  # Mirrors Payment.school during the multi-tenant migration
+        help_text="School this drawer belongs to"
+    )
+    cashier = models.ForeignKey(User, on_delete=models.CASCADE, related_name='drawer_sessions')
+    campus = models.ForeignKey('students.Campus', on_delete=models.SET_NULL, related_name='drawer_sessions', null=True, blank=True)
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default='open')
+    opened_at = models.DateTimeField(auto_now_add=True)
+    closed_at = models.DateTimeField(blank=True, null=True)
+    previous_session = models.OneToOneField(
+        'self',
+        on_delete=models.SET_NULL,
+        related_name='next_session',
+        null=True,
+        blank=True,
+        help_text="Session handed over into this one"
+    )
+    expected_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    payment_count = models.IntegerField(default=0)
+    counted_amount = models.DecimalField(max_digits=14, decimal_places=2, blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.cashier_id} {self.opened_at:%Y-%m-%d %H:%M} {self.status}: {self.expected_total}"
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=['school', 'cashier'],
+                condition=models.Q(status='open'),
+                name='one_open_drawer_per_cashier'
+            )
+        ]
+        indexes = [
+            # Live drawer positions: ?status=open[&campus=]
+            models.Index(fields=['school', 'status', 'campus'], name='drawer_session_status_idx'),
+        ]
 
 class Profile(models.Model):
     class Role(models.TextChoices):
@@ -0,0 +1,200 @@
+"""
+Daily collection rollups.
+
+`DailyCollection` holds a running count and total per payment bucket
+(school, date, cashier, term, academic_year, payment_method, fee_type,
+status). Every payment write moves its amount between buckets in the same
+transaction: single saves through Payment.save(), deletes of any kind
+(including cascades) through the receivers in payments.signals, batch writes
+through the helpers in payments.bulk (and the backfill_payment_cashiers
+command, which assigns cashiers in bulk). Reports then aggregate buckets, so
+their cost follows the number of days and cashiers rather than payments.
+
+Writes that bypass these paths (raw SQL, QuerySet.update() elsewhere) leave
+the rollup stale; `manage.py rebuild_daily_collections`, or an admin through
+/api/v1/reports/collection-drift/, verifies it against the payments table and
+rewrites drifted buckets.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import DailyCollection, Payment, ROLLUP_KEY_FIELDS
+
+def bucket_filter(key):
+    """DailyCollection filter kwargs for a bucket key"""
+    return dict(zip(ROLLUP_KEY_FIELDS, key))
+
+
+def stored_rollup_state(payment_id):
+    """(bucket key, amount) of a payment as currently stored, or None"""
+    row = Payment.objects.filter(pk=payment_id).values_list(*ROLLUP_KEY_FIELDS, 'amount').first()
+    if row is None:
+        return None
+    return tuple(row[:-1]), row[-1]
+
+
+def _key_order(item):
+    # NULL school/cashier sort first; other values compare within their column
+    return [(value is not None, value) for value in item[0]]
+
+
+def apply_deltas(deltas):
+    """
+    Add {bucket key: (count delta, amount delta)} to the rollup.
+    One UPDATE per touched bucket, plus an INSERT for buckets seen for the first time.
+    Buckets are visited in key order, so concurrent batches lock them in the
+    same order and cannot deadlock.
+    """
+    with transaction.atomic():
+        for key, (count, amount) in sorted(deltas.items(), key=_key_order):
+            if not count and not amount:
+                continue
+            bucket = DailyCollection.objects.filter(**bucket_filter(key))
+            changes = {'payment_count': F('payment_count') + count, 'total_amount': F('total_amount') + amount}
+            if bucket.update(**changes):
+                continue
+            try:
+                with transaction.atomic():
+                    DailyCollection.objects.create(**bucket_filter(key), payment_count=count, total_amount=amount)
+            except IntegrityError:
+                # A concurrent write created the bucket first
+                bucket.update(**changes)
+
+
+def record_payment_change(old_state, new_state):
+    """Move one payment between buckets; states are (key, amount) or None"""
+    if old_state == new_state:
+        return
+    deltas = defaultdict(lambda: [0, Decimal('0')])
+    if old_state is not None:
+        key, amount = old_state
+        deltas[key][0] -= 1
+        deltas[key][1] -= Decimal(str(amount))
+    if new_state is not None:
+        key, amount = new_state
+        deltas[key][0] += 1
+        deltas[key][1] += Decimal(str(amount))
+    apply_deltas(deltas)
+
+
+def fold_cashier_buckets(cashier_id):
+    """
+    Move a cashier's buckets onto the matching cashier-less buckets, for when
+    the user is deleted and their payments' cashier is set to NULL.
+    """
+    cashier_index = ROLLUP_KEY_FIELDS.index('cashier_id')
+    with transaction.atomic():
+        buckets = DailyCollection.objects.filter(cashier_id=cashier_id)
+        deltas = defaultdict(lambda: [0, Decimal('0')])
+        for row in buckets.values(*ROLLUP_KEY_FIELDS, 'payment_count', 'total_amount'):
+            key = tuple(row[name] for name in ROLLUP_KEY_FIELDS)
+            moved = key[:cashier_index] + (None,) + key[cashier_index + 1:]
+            deltas[moved][0] += row['payment_count']
+            deltas[moved][1] += row['total_amount']
+        buckets.delete()
+        apply_deltas(deltas)
+
+
+def grouped_payments(queryset):
+    """{bucket key: (count, total)} for a payment queryset, in one GROUP BY"""
+    rows = queryset.order_by().values(*ROLLUP_KEY_FIELDS).annotate(n=Count('id'), total=Sum('amount'))
+    return {
+        tuple(row[name] for name in ROLLUP_KEY_FIELDS): (row['n'], row['total'] or Decimal('0'))
+        for row in rows
+    }
+
+
+def record_created(payments):
+    """Add freshly inserted payments (e.g. after bulk_create) to the rollup"""
+    deltas = defaultdict(lambda: [0, Decimal('0')])
+    for payment in payments:
+        key = tuple(getattr(payment, name) for name in ROLLUP_KEY_FIELDS)
+        deltas[key][0] += 1
+        deltas[key][1] += Decimal(str(payment.amount))
+    apply_deltas(deltas)
+
+
+def _record_move(payments, field, value):
+    """Move a payment queryset's buckets to the ones with `field` set to `value`"""
+    index = ROLLUP_KEY_FIELDS.index(field)
+    deltas = defaultdict(lambda: [0, Decimal('0')])
+    for key, (count, total) in grouped_payments(payments).items():
+        if key[index] == value:
+            continue
+        moved = key[:index] + (value,) + key[index + 1:]
+        deltas[key][0] -= count
+        deltas[key][1] -= total
+        deltas[moved][0] += count
+        deltas[moved][1] += total
+    apply_deltas(deltas)
+
+
+def record_status_change(payment_ids, new_status):
+    """
+    Move payments that are about to be switched to `new_status` by a set-based
+    UPDATE. Call inside the transaction that runs the UPDATE.
+    """
+    _record_move(Payment.objects.filter(id__in=payment_ids), 'status', new_status)
+
+
+def record_cashier_change(payments, cashier_id):
+    """
+    Move a payment queryset that is about to be assigned to `cashier_id` by a
+    set-based UPDATE. Call inside the transaction that runs the UPDATE.
+    """
+    _record_move(payments, 'cashier_id', cashier_id)
+
+
+def _scoped(queryset, school_id, date_from, date_to):
+    if school_id is not None:
+        queryset = queryset.filter(school_id=school_id)
+    if date_from:
+        queryset = queryset.filter(date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(date__lte=date_to)
+    return queryset
+
+
+def collection_drift(school_id=None, date_from=None, date_to=None):
+    """
+    Buckets whose stored count/total differ from the payments table.
+    Returns {bucket key: ((expected count, total), (stored count, total))}.
+    """
+    expected = grouped_payments(_scoped(Payment.objects.all(), school_id, date_from, date_to))
+    rows = (
+        _scoped(DailyCollection.objects.all(), school_id, date_from, date_to)
+        .order_by().values(*ROLLUP_KEY_FIELDS)
+        .annotate(n=Sum('payment_count'), total=Sum('total_amount'))
+    )
+    stored = {tuple(row[name] for name in ROLLUP_KEY_FIELDS): (row['n'], row['total']) for row in rows}
+
+    zero = (0, Decimal('0'))
+    drift = {}
+    for key in expected.keys() | stored.keys():
+        want, have = expected.get(key, zero), stored.get(key, zero)
+        if want != have:
+            drift[key] = (want, have)
+    return drift
+
+
+def rebuild_collections(school_id=None, date_from=None, date_to=None):
+    """
+    Rewrite drifted buckets from the payments table and drop empty ones,
+    bumping the data versions of the schools whose reports change.
+    Returns the drift that was repaired.
+    """
+    from core.versioning import bump_versions
+    school_index = ROLLUP_KEY_FIELDS.index('school_id')
+    with transaction.atomic():
+        drift = collection_drift(school_id, date_from, date_to)
+        for key, ((count, total), _) in drift.items():
+            DailyCollection.objects.filter(**bucket_filter(key)).delete()
+            if count:
+                DailyCollection.objects.create(**bucket_filter(key), payment_count=count, total_amount=total)
+        _scoped(DailyCollection.objects.filter(payment_count=0), school_id, date_from, date_to).delete()
+        if drift:
+            bump_versions({key[school_index] for key in drift})
+    return drift
@@ -0,0 +1,73 @@
+"""
+Receipt number allocation.
+
+Receipt numbers come from a per-(school, academic_year) counter row
+(`ReceiptSequence`). The counter is bumped with a single UPDATE, which holds
+the row lock on PostgreSQL and the database write lock on SQLite until the
+allocation commits, so concurrent cashiers never receive the same number and
+no payment rows are scanned on the hot path.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Payment, ReceiptSequence
+
+RECEIPT_PREFIX = 'REC'
+
+
+def format_receipt_number(year, value):
+    """Format a sequence value as REC-YYYY-NNNNN"""
+    return f"{RECEIPT_PREFIX}-{year}-{value:05d}"
+
+
+def _legacy_high_water_mark(school, year):
+    """
+    Highest REC-YYYY-NNNNN already issued for this school/year.
+    Only runs once per school/year, when its counter row is first created,
+    so numbering continues from receipts issued before the counter existed.
+    """
+    prefix = f"{RECEIPT_PREFIX}-{year}-"
+    receipts = Payment.objects.filter(
+        school=school, academic_year=year, receipt_number__startswith=prefix
+    ).values_list('receipt_number', flat=True)
+    highest = 0
+    for receipt in receipts.iterator():
+        try:
+            highest = max(highest, int(receipt[len(prefix):]))
+        except ValueError:
+            # Fallback if receipt number format is unexpected
+            continue
+    return highest
+
+
+def reserve_receipt_numbers(school, year, count=1):
+    """
+    Reserve `count` consecutive receipt numbers for a school/year in one round trip.
+    Returns the formatted receipt numbers in issue order.
+    """
+    if count < 1:
+        raise ValueError('count must be at least 1')
+
+    sequence = ReceiptSequence.objects.filter(school=school, academic_year=year)
+    with transaction.atomic():
+        if not sequence.update(last_value=F('last_value') + count):
+            # First receipt for this school/year - create the counter row
+            try:
+                with transaction.atomic():
+                    ReceiptSequence.objects.create(
+                        school=school,
+                        academic_year=year,
+                        last_value=_legacy_high_water_mark(school, year) + count,
+                    )
+            except IntegrityError:
+                # Another cashier created it first; take our block from their row
+                sequence.update(last_value=F('last_value') + count)
+        last_value = sequence.values_list('last_value', flat=True).get()
+
+    first_value = last_value - count + 1
+    return [format_receipt_number(year, value) for value in range(first_value, last_value + 1)]
+
+
+def next_receipt_number(school, year):
+    """Allocate a single receipt number for a school/year"""
+    return reserve_receipt_numbers(school, year, 1)[0]
@@ -1,39 +1,39 @@
+from decimal import Decimal
+
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from rest_framework import ISO_8601
 from django.contrib.auth.models import User
-from .models import Payment
-from datetime import date
+from .models import DrawerSession, Payment
+from .sequences import next_receipt_number
 
-def generate_receipt_number():
-    """Generate a sequential receipt number in format REC-YYYY-NNNNN"""
+def current_term_and_year():
+    """Default (term, academic_year) for a payment taken today"""
+    from datetime import date
     today = date.today()
-    year = today.year
-    # Get the latest payment for this year to determine the next sequence number
-    last_payment = Payment.objects.filter(academic_year=year).order_by('-id').first()
-    
-    if last_payment and last_payment.receipt_number.startswith(f"REC-{year}-"):
-        try:
-            # Extract sequence number from REC-YYYY-NNNNN
-            last_sequence = int(last_payment.receipt_number.split('-')[-1])
-            count = last_sequence + 1
-        except ValueError:
-            # Fallback if receipt number format is unexpected
-            count = Payment.objects.filter(academic_year=year).count() + 1
+    month = today.month
+    if 1 <= month <= 4:
+        term_val = '1'
+    elif 5 <= month <= 8:
+        term_val = '2'
     else:
-        count = 1
-        
-    return f"REC-{year}-{count:05d}"
+        term_val = '3'
+    return term_val, today.year
 
 class PaymentSerializer(serializers.ModelSerializer):
     cashier_id = serializers.IntegerField(write_only=True, required=False)
     term = serializers.CharField(required=False)
     academic_year = serializers.IntegerField(required=False)
-    receipt_number = serializers.CharField(required=False)  # Now optional - auto-generated
+    # Optional - allocated from the school's receipt sequence in create()
+    receipt_number = serializers.CharField(required=False, default=None)
 
     class Meta:
         model = Payment
         fields = '__all__'
         extra_kwargs = {
             'cashier_name': {'read_only': True},
+            'cashier': {'read_only': True},
+            'drawer_session': {'read_only': True},
             'date': {'read_only': True},
             'term': {'required': False},
             'academic_year': {'required': False},
@@ -47,22 +47,10 @@ class PaymentSerializer(serializers.ModelSerializer):
         
         # Auto-pick term/academic_year
         if not d.get('term') or not d.get('academic_year'):
-            from datetime import date
-            today = date.today()
-            month = today.month
-            if 1 <= month <= 4:
-                term_val = '1'
-            elif 5 <= month <= 8:
-                term_val = '2'
-            else:
-                term_val = '3'
+            term_val, year = current_term_and_year()
             d.setdefault('term', term_val)
-            d.setdefault('academic_year', today.year)
-            
-        # Auto-generate receipt number if missing
-        if not d.get('receipt_number'):
-            d['receipt_number'] = generate_receipt_number()
-            
+            d.setdefault('academic_year', year)
+
         return super().to_internal_value(d)
 
     def validate(self, attrs):
@@ -70,17 +58,9 @@ class PaymentSerializer(serializers.ModelSerializer):
         term = attrs.get('term')
         year = attrs.get('academic_year')
         if not term or not year:
-            from datetime import date
-            today = date.today()
-            month = today.month
-            if 1 <= month <= 4:
-                term_val = '1'
-            elif 5 <= month <= 8:
-                term_val = '2'
-            else:
-                term_val = '3'
+            term_val, year_val = current_term_and_year()
             attrs.setdefault('term', term_val)
-            attrs.setdefault('academic_year', today.year)
+            attrs.setdefault('academic_year', year_val)
         return attrs
 
     def create(self, validated_data):
@@ -88,39 +68,38 @@ class PaymentSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         # Auto-pick term/year if missing
         if not validated_data.get('term') or not validated_data.get('academic_year'):
-            from datetime import date
-            today = date.today()
-            month = today.month
-            if 1 <= month <= 4:
-                term_val = '1'
-            elif 5 <= month <= 8:
-                term_val = '2'
-            else:
-                term_val = '3'
+            term_val, year = current_term_and_year()
             validated_data.setdefault('term', term_val)
-            validated_data.setdefault('academic_year', today.year)
+            validated_data.setdefault('academic_year', year)
 
         if cashier_id:
             try:
                 user = User.objects.get(id=cashier_id)
+                validated_data['cashier'] = user
                 validated_data['cashier_name'] = user.get_full_name() or user.username
             except User.DoesNotExist:
                 validated_data['cashier_name'] = validated_data.get('cashier_name') or 'Unknown'
         elif request and getattr(request, 'user', None) and request.user.is_authenticated:
             user = request.user
+            validated_data['cashier'] = user
             validated_data['cashier_name'] = user.get_full_name() or user.username
         else:
             validated_data['cashier_name'] = validated_data.get('cashier_name') or 'Unknown'
 
         # Auto-generate receipt number if not provided
         if not validated_data.get('receipt_number'):
-            validated_data['receipt_number'] = generate_receipt_number()
+            validated_data['receipt_number'] = next_receipt_number(
+                validated_data.get('school'), validated_data['academic_year']
+            )
 
         return super().create(validated_data)
 
     def update(self, instance, validated_data):
         from core.permissions import get_role
         cashier_id = validated_data.pop('cashier_id', None)
+        # Receipt numbers are never re-allocated on update
+        if validated_data.get('receipt_number') is None:
+            validated_data.pop('receipt_number', None)
         request = self.context.get('request')
         role = get_role(request.user) if request and getattr(request, 'user', None) else None
         
@@ -136,8 +115,7 @@ class PaymentSerializer(serializers.ModelSerializer):
         
         # Only allow the original cashier or admin to edit a payment
         if request and getattr(request, 'user', None) and request.user.is_authenticated:
-            req_name = request.user.get_full_name() or request.user.username
-            if role != 'Admin' and (instance.cashier_name != req_name):
+            if role != 'Admin' and not instance.is_taken_by(request.user):
                 from rest_framework.exceptions import PermissionDenied
                 raise PermissionDenied("Cannot edit another cashier's payment")
         
@@ -176,11 +154,144 @@ class PaymentSerializer(serializers.ModelSerializer):
         if cashier_id:
             try:
                 user = User.objects.get(id=cashier_id)
+                validated_data['cashier'] = user
                 validated_data['cashier_name'] = user.get_full_name() or user.username
             except User.DoesNotExist:
                 pass
         elif request and getattr(request, 'user', None) and request.user.is_authenticated:
             user = request.user
+            validated_data['cashier'] = user
             validated_data['cashier_name'] = user.get_full_name() or user.username
 
         return super().update(instance, validated_data)
+
+
+class PaymentReadSerializer:
+    """
+    Read-only fast path for listing and retrieving payments.
+
+    Renders `values()` rows (or a model instance's `__dict__`) to exactly the
+    output of PaymentSerializer. The field map - output name, column and
+    converter - is compiled once from PaymentSerializer's own fields, so a row
+    is a single loop over plain values instead of a `to_representation`
+    dispatch per field. Fields whose output differs from the stored value get
+    a converter; anything this class does not recognise falls back to the
+    DRF field's own `to_representation`.
+    """
+    _field_map = None
+
+    @staticmethod
+    def _column(field):
+        if isinstance(field, serializers.RelatedField):
+            return Payment._meta.get_field(field.source).attname
+        return field.source
+
+    @staticmethod
+    def _converter(field):
+        """Callable for a non-null value, or None when the stored value is already the output"""
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+            return None
+        if isinstance(field, serializers.DecimalField):
+            coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+            if not coerce_to_string or field.localize or field.normalize_output or field.decimal_places is None:
+                return field.to_representation
+            exponent = Decimal(1).scaleb(-field.decimal_places)
+            return lambda value: '{:f}'.format(value.quantize(exponent))
+        if isinstance(field, serializers.DateTimeField):
+            return field.to_representation
+        if isinstance(field, serializers.DateField):
+            output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+            if output_format is not None and output_format.lower() == ISO_8601:
+                return lambda value: value.isoformat()
+            return field.to_representation
+        if isinstance(field, (serializers.ChoiceField, serializers.CharField, serializers.IntegerField)):
+            # Stored str/int values render unchanged
+            return None
+        return field.to_representation
+
+    @classmethod
+    def field_map(cls):
+        if cls._field_map is None:
+            cls._field_map = tuple(
+                (name, cls._column(field), cls._converter(field))
+                for name, field in PaymentSerializer().fields.items()
+                if not field.write_only
+            )
+        return cls._field_map
+
+    @classmethod
+    def columns(cls):
+        """Lookups to pass to `values()`"""
+        return [column for _, column, _ in cls.field_map()]
+
+    @classmethod
+    def to_representation(cls, row):
+        data = {}
+        for name, column, convert in cls.field_map():
+            value = row[column]
+            data[name] = value if value is None or convert is None else convert(value)
+        return data
+
+    @classmethod
+    def many(cls, rows):
+        return [cls.to_representation(row) for row in rows]
+
+
+class BulkPaymentItemSerializer(serializers.Serializer):
+    """
+    One queued payment in a bulk upload.
+    Validates the row shape only; students, cashiers and receipt numbers are
+    resolved for the whole batch at once in payments.bulk.
+    """
+    student = serializers.IntegerField(required=False, allow_null=True)
+    student_number = serializers.CharField(max_length=50, required=False, allow_blank=True, allow_null=True)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    payment_method = serializers.CharField(max_length=50)
+    fee_type = serializers.ChoiceField(choices=Payment._meta.get_field('fee_type').choices, default='Tuition')
+    status = serializers.ChoiceField(choices=['pending', 'posted'], default='pending')
+    term = serializers.ChoiceField(choices=Payment._meta.get_field('term').choices, required=False, allow_null=True)
+    academic_year = serializers.IntegerField(required=False, allow_null=True)
+    receipt_number = serializers.CharField(max_length=50, required=False, allow_blank=True, allow_null=True)
+    cashier_id = serializers.IntegerField(required=False, allow_null=True)
+    reference_id = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    bank_name = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    merchant_provider = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+
+    def validate(self, attrs):
+        if not attrs.get('student') and not attrs.get('student_number'):
+            raise serializers.ValidationError({'student': 'student or student_number is required'})
+        if not attrs.get('term') or not attrs.get('academic_year'):
+            term_val, year_val = current_term_and_year()
+            attrs['term'] = attrs.get('term') or term_val
+            attrs['academic_year'] = attrs.get('academic_year') or year_val
+        return attrs
+
+
+class DrawerSessionSerializer(serializers.ModelSerializer):
+    """A drawer session and its live position; totals are maintained by payments.drawers"""
+    cashier_name = serializers.SerializerMethodField()
+    campus_name = serializers.CharField(source='campus.name', read_only=True, default=None)
+
+    class Meta:
+        model = DrawerSession
+        fields = [
+            'id', 'cashier', 'cashier_name', 'campus', 'campus_name', 'status', 'opened_at', 'closed_at',
+            'previous_session', 'expected_total', 'payment_count', 'counted_amount',
+        ]
+        read_only_fields = [
+            'cashier', 'status', 'opened_at', 'closed_at', 'previous_session',
+            'expected_total', 'payment_count', 'counted_amount',
+        ]
+
+    def get_cashier_name(self, obj):
+        return obj.cashier.get_full_name() or obj.cashier.username
+
+
+class DrawerCountSerializer(serializers.Serializer):
+    """Cash counted in the drawer when closing or handing over a session"""
+    counted_amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+    notes = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+
+
+class DrawerHandoverSerializer(DrawerCountSerializer):
+    to_cashier_id = serializers.IntegerField()
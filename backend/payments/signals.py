@@ -0,0 +1,50 @@
+"""
+Keep the daily collection rollup, drawer session totals and data versions in
+step with payment deletes, however they happen: Payment.delete(), queryset
+deletes and cascades from Student, Campus or School all send these signals.
+Deleting a user re-buckets their payments under no cashier (Payment.cashier
+is SET_NULL), so their rollup buckets are folded into the cashier-less ones.
+"""
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from core.models import School
+from .models import Payment, drawer_state, rollup_state
+
+
+def _deleting(origin, model):
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(origin_model, model)
+
+
+@receiver(pre_delete, sender=Payment)
+def remember_payment_state(sender, instance, **kwargs):
+    from .drawers import stored_drawer_state
+    from .rollups import stored_rollup_state
+    # Cascades load full rows, so these are usually the states from_db() kept
+    instance._deleted_states = (
+        getattr(instance, '_rollup_state', None) or rollup_state(instance) or stored_rollup_state(instance.pk),
+        getattr(instance, '_drawer_state', None) or drawer_state(instance) or stored_drawer_state(instance.pk),
+    )
+
+
+@receiver(post_delete, sender=Payment)
+def record_payment_deleted(sender, instance, origin=None, **kwargs):
+    from core.versioning import bump_versions
+    from .drawers import record_drawer_change
+    from .rollups import record_payment_change
+    old_state, old_drawer = getattr(instance, '_deleted_states', (None, None))
+    if not _deleting(origin, School):
+        # A deleted school takes its buckets and sessions with it
+        record_payment_change(old_state, None)
+        record_drawer_change(old_drawer, None)
+    bump_versions([instance.school_id], [instance.student_id])
+    instance._rollup_state = instance._drawer_state = None
+
+
+@receiver(pre_delete, sender=User)
+def fold_cashier_buckets(sender, instance, **kwargs):
+    from .rollups import fold_cashier_buckets
+    fold_cashier_buckets(instance.pk)
@@ -0,0 +1,109 @@
+import pytest
+from datetime import date
+from rest_framework.test import APIClient
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from tests.factories import UserFactory, StudentFactory, PaymentFactory, SchoolFactory
+from payments.models import Payment, Profile
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def client(school):
+    client = APIClient()
+    cashier = UserFactory(username="bulk_cashier", first_name="Bulk", last_name="Cashier", profile__school=school)
+    client.force_authenticate(user=cashier)
+    return client
+
+
+def _item(**overrides):
+    item = {"amount": "25.00", "payment_method": "Cash", "fee_type": "Tuition", "term": "1", "academic_year": 2026}
+    item.update(overrides)
+    return item
+
+
+@pytest.mark.django_db
+def test_bulk_creates_all_payments_with_sequential_receipts(client, school):
+    students = [StudentFactory(school=school) for _ in range(3)]
+    payload = {"payments": [_item(student=students[0].id), _item(student_number=students[1].student_number), _item(student=students[2].id)]}
+    res = client.post("/api/v1/payments/bulk/", payload, format="json")
+    assert res.status_code == 201
+    data = res.json()
+    assert data["created"] == 3 and data["failed"] == 0
+    assert [r["receipt_number"] for r in data["results"]] == ["REC-2026-00001", "REC-2026-00002", "REC-2026-00003"]
+    payments = Payment.objects.filter(school=school)
+    assert payments.count() == 3
+    assert set(payments.values_list("cashier_name", flat=True)) == {"Bulk Cashier"}
+
+
+@pytest.mark.django_db
+def test_bulk_reports_per_item_errors_and_keeps_valid_rows(client, school):
+    student = StudentFactory(school=school)
+    other_school_student = StudentFactory(school=SchoolFactory())
+    PaymentFactory(school=school, student=student, term="1", academic_year=2026, receipt_number="DUP-1")
+    payload = [
+        _item(student=student.id),
+        _item(student_number="NOPE"),
+        _item(student=other_school_student.id),
+        _item(student=student.id, receipt_number="DUP-1"),
+        _item(student=student.id, amount="not-a-number"),
+        _item(),
+    ]
+    res = client.post("/api/v1/payments/bulk/", payload, format="json")
+    assert res.status_code == 207
+    results = res.json()["results"]
+    assert [r["ok"] for r in results] == [True, False, False, False, False, False]
+    assert "student" in results[1]["errors"] and "student" in results[2]["errors"]
+    assert "receipt_number" in results[3]["errors"]
+    assert "amount" in results[4]["errors"]
+    assert "student" in results[5]["errors"]
+    assert Payment.objects.filter(school=school).count() == 2
+
+
+@pytest.mark.django_db
+def test_bulk_cashiers_must_belong_to_the_school(client, school):
+    student = StudentFactory(school=school)
+    colleague = UserFactory(username="bulk_colleague", profile__school=school)
+    outsider = UserFactory(username="bulk_outsider", profile__school=SchoolFactory())
+    payload = [
+        _item(student=student.id, cashier_id=colleague.id),
+        _item(student=student.id, cashier_id=outsider.id),
+        _item(student=student.id, cashier_id=999999),
+    ]
+    res = client.post("/api/v1/payments/bulk/", payload, format="json")
+    assert res.status_code == 207
+    results = res.json()["results"]
+    assert [r["ok"] for r in results] == [True, False, False]
+    assert "cashier_id" in results[1]["errors"] and "cashier_id" in results[2]["errors"]
+    assert list(Payment.objects.filter(school=school).values_list("cashier_id", flat=True)) == [colleague.id]
+
+
+@pytest.mark.django_db
+def test_bulk_query_count_does_not_grow_with_batch_size(client, school):
+    students = [StudentFactory(school=school) for _ in range(41)]
+
+    def run(batch):
+        with CaptureQueriesContext(connection) as ctx:
+            res = client.post("/api/v1/payments/bulk/", [_item(student_number=s.student_number) for s in batch], format="json")
+        assert res.status_code == 201
+        return len(ctx.captured_queries)
+
+    run(students[:1])  # first batch of the year creates the receipt sequence row
+    assert run(students[1:6]) == run(students[6:41])
+
+
+@pytest.mark.django_db
+def test_bulk_rejects_empty_and_read_only_roles(school):
+    client = APIClient()
+    accountant = UserFactory(username="bulk_acct", profile__role=Profile.Role.ACCOUNTANT, profile__school=school)
+    client.force_authenticate(user=accountant)
+    student = StudentFactory(school=school)
+    assert client.post("/api/v1/payments/bulk/", [_item(student=student.id)], format="json").status_code == 403
+
+    cashier = UserFactory(username="bulk_cash2", profile__school=school)
+    client.force_authenticate(user=cashier)
+    assert client.post("/api/v1/payments/bulk/", {"payments": []}, format="json").status_code == 400
@@ -0,0 +1,109 @@
+import pytest
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, PaymentFactory, SchoolFactory
+from payments.models import Payment, Profile
+
+
+def _client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.django_db
+def test_bulk_void_sets_tracking_fields_in_one_update():
+    school = SchoolFactory()
+    admin = UserFactory(username="bv_admin", first_name="Ada", last_name="Admin",
+                        profile__role=Profile.Role.ADMIN, profile__school=school)
+    payments = [PaymentFactory(school=school, status=s) for s in ["pending", "posted", "pending"]]
+    ids = [p.id for p in payments]
+
+    with CaptureQueriesContext(connection) as ctx:
+        res = _client(admin).post("/api/v1/payments/bulk-void/", {"ids": ids, "void_reason": "Duplicate batch"}, format="json")
+    assert res.status_code == 200
+    assert res.json() == {"voided": 3, "ids": ids}
+    assert sum(1 for q in ctx.captured_queries if q["sql"].startswith('UPDATE "payments_payment"')) == 1
+
+    for p in Payment.objects.filter(id__in=ids):
+        assert p.status == "voided" and p.void_reason == "Duplicate batch"
+        assert p.voided_by == "Ada Admin" and p.voided_at is not None
+
+
+@pytest.mark.django_db
+def test_bulk_void_is_all_or_nothing():
+    school = SchoolFactory()
+    admin = UserFactory(username="bv_admin2", profile__role=Profile.Role.ADMIN, profile__school=school)
+    ok = PaymentFactory(school=school, status="posted")
+    already = PaymentFactory(school=school, status="voided", void_reason="x")
+    other_school = PaymentFactory(school=SchoolFactory(), status="posted")
+
+    res = _client(admin).post(
+        "/api/v1/payments/bulk-void/",
+        {"ids": [ok.id, already.id, other_school.id], "void_reason": "Close"},
+        format="json",
+    )
+    assert res.status_code == 400
+    errors = res.json()["errors"]
+    assert errors == {str(already.id): "Payment is already voided", str(other_school.id): "Payment not found"}
+    ok.refresh_from_db()
+    other_school.refresh_from_db()
+    assert ok.status == "posted" and other_school.status == "posted"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("body, field", [
+    ({"ids": [], "void_reason": "x"}, "ids"),
+    ({"ids": ["1"], "void_reason": "x"}, "ids"),
+    ({"ids": [1]}, "void_reason"),
+])
+def test_bulk_void_validates_body(body, field):
+    admin = UserFactory(username="bv_admin3", profile__role=Profile.Role.ADMIN)
+    res = _client(admin).post("/api/v1/payments/bulk-void/", body, format="json")
+    assert res.status_code == 400
+    assert field in res.json()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("action", ["bulk-void", "bulk-post"])
+def test_bulk_transitions_are_admin_only(action):
+    cashier = UserFactory(username="bv_cashier", profile__role=Profile.Role.CASHIER)
+    payment = PaymentFactory(status="pending", cashier=cashier)
+    res = _client(cashier).post(
+        f"/api/v1/payments/{action}/?cashier={cashier.id}", {"ids": [payment.id], "void_reason": "x"}, format="json"
+    )
+    assert res.status_code == 403
+    payment.refresh_from_db()
+    assert payment.status == "pending"
+
+
+@pytest.mark.django_db
+def test_bulk_post_posts_pending_payments_matching_filter():
+    school = SchoolFactory()
+    admin = UserFactory(username="bp_admin", profile__role=Profile.Role.ADMIN, profile__school=school)
+    cashier = UserFactory(username="bp_cashier", profile__school=school)
+    other = UserFactory(username="bp_other", profile__school=school)
+    today = date.today()
+    mine = [PaymentFactory(school=school, cashier=cashier, status="pending") for _ in range(3)]
+    voided = PaymentFactory(school=school, cashier=cashier, status="voided", void_reason="x")
+    theirs = PaymentFactory(school=school, cashier=other, status="pending")
+    elsewhere = PaymentFactory(school=SchoolFactory(), cashier=cashier, status="pending")
+
+    res = _client(admin).post(f"/api/v1/payments/bulk-post/?cashier={cashier.id}&date={today}", format="json")
+    assert res.status_code == 200
+    assert res.json() == {"posted": 3}
+    assert set(Payment.objects.filter(status="posted").values_list("id", flat=True)) == {p.id for p in mine}
+    for p, expected in [(voided, "voided"), (theirs, "pending"), (elsewhere, "pending")]:
+        p.refresh_from_db()
+        assert p.status == expected
+
+
+@pytest.mark.django_db
+def test_bulk_post_requires_a_filter():
+    admin = UserFactory(username="bp_admin2", profile__role=Profile.Role.ADMIN)
+    PaymentFactory(status="pending")
+    res = _client(admin).post("/api/v1/payments/bulk-post/", format="json")
+    assert res.status_code == 400
+    assert not Payment.objects.filter(status="posted").exists()
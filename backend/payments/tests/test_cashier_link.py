@@ -0,0 +1,85 @@
+import pytest
+from io import StringIO
+from datetime import date
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, StudentFactory, PaymentFactory, SchoolFactory
+from payments.models import Payment, Profile
+from payments.rollups import collection_drift
+
+
+@pytest.mark.django_db
+def test_create_links_cashier_and_survives_rename():
+    school = SchoolFactory()
+    cashier = UserFactory(username="link_cashier", first_name="Ann", last_name="Moyo", profile__school=school)
+    client = APIClient()
+    client.force_authenticate(user=cashier)
+    student = StudentFactory(school=school)
+    res = client.post("/api/v1/payments/", {"student": student.id, "amount": "30.00", "payment_method": "Cash"}, format="json")
+    assert res.status_code == 201
+    assert res.json()["cashier"] == cashier.id
+
+    # Renaming the user no longer orphans their payments
+    cashier.last_name = "Dube"
+    cashier.save()
+    pid = res.json()["id"]
+    assert client.patch(f"/api/v1/payments/{pid}/", {"amount": "31.00"}, format="json").status_code == 200
+    daily = client.get(f"/api/v1/reports/cashier-daily/?date={date.today()}&cashier_id={cashier.id}").json()
+    assert daily["count"] == 1 and daily["cashier_name"] == "Ann Dube"
+
+
+@pytest.mark.django_db
+def test_cashier_cannot_edit_payment_linked_to_someone_else_with_same_name():
+    school = SchoolFactory()
+    owner = UserFactory(username="twin_a", first_name="Sam", last_name="Ncube", profile__school=school)
+    twin = UserFactory(username="twin_b", first_name="Sam", last_name="Ncube", profile__school=school,
+                       profile__role=Profile.Role.CASHIER)
+    payment = PaymentFactory(school=school, cashier=owner, cashier_name="Sam Ncube")
+    client = APIClient()
+    client.force_authenticate(user=twin)
+    assert client.patch(f"/api/v1/payments/{payment.id}/", {"amount": "1.00"}, format="json").status_code == 403
+
+
+@pytest.mark.django_db
+def test_backfill_command_links_legacy_payments_in_chunks():
+    school = SchoolFactory()
+    ann = UserFactory(username="ann", first_name="Ann", last_name="Moyo", profile__school=school)
+    bob = UserFactory(username="bob", profile__school=school)
+    # Same display name in another school must not steal this school's rows
+    UserFactory(username="ann2", first_name="Ann", last_name="Moyo", profile__school=SchoolFactory())
+    rows = [PaymentFactory(school=school, cashier_name=name) for name in ["Ann Moyo", "bob", "Ann Moyo", "Ghost", "bob"]]
+
+    out = StringIO()
+    call_command("backfill_payment_cashiers", "--chunk-size", "2", "--dry-run", stdout=out)
+    assert not Payment.objects.filter(cashier__isnull=False).exists()
+
+    call_command("backfill_payment_cashiers", "--chunk-size", "2", stdout=out)
+    linked = dict(Payment.objects.values_list("id", "cashier_id"))
+    assert [linked[p.id] for p in rows] == [ann.id, bob.id, ann.id, None, bob.id]
+    assert "4 payment(s); 1 without a matching user" in out.getvalue()
+
+    # Resuming past the processed ids finds nothing new
+    out = StringIO()
+    call_command("backfill_payment_cashiers", "--start-id", str(rows[-1].id), stdout=out)
+    assert "Backfilled 0 payment(s)" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_backfilled_payments_reach_cashier_reports():
+    school = SchoolFactory()
+    ann = UserFactory(username="ann", first_name="Ann", last_name="Moyo", profile__school=school)
+    admin = UserFactory(username="backfill_admin", profile__role=Profile.Role.ADMIN, profile__school=school)
+    PaymentFactory(school=school, cashier=None, cashier_name="Ann Moyo", status="posted", amount="12.00")
+    PaymentFactory(school=school, cashier=None, cashier_name="Ann Moyo", status="posted", amount="8.00")
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    url = f"/api/v1/reports/cashier-daily/?date={date.today()}&cashier_id={ann.id}"
+    before = client.get(url)
+    assert before.json()["count"] == 0
+
+    call_command("backfill_payment_cashiers", stdout=StringIO())
+    assert collection_drift() == {}
+    # Neither the report cache nor the ETag may serve the pre-backfill totals
+    after = client.get(url, HTTP_IF_NONE_MATCH=before["ETag"])
+    assert after.status_code == 200
+    assert after.json()["count"] == 2 and after.json()["total"] == 20.0
@@ -0,0 +1,180 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, StudentFactory, PaymentFactory, SchoolFactory
+from payments.models import DailyCollection, Payment, Profile
+from payments.rollups import collection_drift
+
+
+def _client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def admin(school):
+    return UserFactory(username="dc_admin", profile__role=Profile.Role.ADMIN, profile__school=school)
+
+
+def _bucket_totals(**filters):
+    rows = DailyCollection.objects.filter(**filters)
+    return sum(r.payment_count for r in rows), sum((r.total_amount for r in rows), Decimal("0"))
+
+
+@pytest.mark.django_db
+def test_single_payment_lifecycle_keeps_rollup_in_step(school, admin):
+    client = _client(admin)
+    student = StudentFactory(school=school)
+    res = client.post("/api/v1/payments/", {"student": student.id, "amount": "40.00", "payment_method": "Cash"}, format="json")
+    pid = res.json()["id"]
+    assert _bucket_totals(status="pending") == (1, Decimal("40.00"))
+
+    client.patch(f"/api/v1/payments/{pid}/", {"amount": "45.00", "payment_method": "Card"}, format="json")
+    assert _bucket_totals(status="pending", payment_method="Card") == (1, Decimal("45.00"))
+    assert _bucket_totals(payment_method="Cash") == (0, Decimal("0"))
+
+    client.patch(f"/api/v1/payments/{pid}/", {"status": "posted"}, format="json")
+    assert _bucket_totals(status="posted") == (1, Decimal("45.00"))
+    client.post(f"/api/v1/payments/{pid}/void/", {"void_reason": "Wrong student"}, format="json")
+    assert _bucket_totals(status="voided") == (1, Decimal("45.00"))
+    assert _bucket_totals(status="posted") == (0, Decimal("0"))
+
+    other = client.post("/api/v1/payments/", {"student": student.id, "amount": "5.00", "payment_method": "Cash"}, format="json")
+    assert client.delete(f"/api/v1/payments/{other.json()['id']}/").status_code == 204
+    assert collection_drift() == {}
+
+
+@pytest.mark.django_db
+def test_bulk_paths_keep_rollup_in_step(school, admin):
+    client = _client(admin)
+    students = [StudentFactory(school=school) for _ in range(4)]
+    rows = [{"student": s.id, "amount": "10.00", "payment_method": "Cash"} for s in students]
+    ids = [r["id"] for r in client.post("/api/v1/payments/bulk/", rows, format="json").json()["results"]]
+    assert _bucket_totals(status="pending") == (4, Decimal("40.00"))
+
+    client.post("/api/v1/payments/bulk-void/", {"ids": ids[:1], "void_reason": "Duplicate"}, format="json")
+    client.post(f"/api/v1/payments/bulk-post/?cashier={admin.id}", format="json")
+    assert _bucket_totals(status="posted") == (3, Decimal("30.00"))
+    assert _bucket_totals(status="voided") == (1, Decimal("10.00"))
+    assert collection_drift() == {}
+
+
+@pytest.mark.django_db
+def test_cashier_daily_cost_does_not_grow_with_payments(school, admin):
+    client = _client(admin)
+    cashier = UserFactory(username="dc_cashier", profile__school=school)
+    url = f"/api/v1/reports/cashier-daily/?date={date.today()}&cashier_id={cashier.id}"
+
+    def run():
+        with CaptureQueriesContext(connection) as ctx:
+            data = client.get(url).json()
+        return data, len(ctx.captured_queries)
+
+    PaymentFactory.create_batch(2, school=school, cashier=cashier, status="posted", amount=Decimal("5.00"))
+    _, few = run()
+    PaymentFactory.create_batch(30, school=school, cashier=cashier, status="posted", amount=Decimal("5.00"))
+    data, many = run()
+    assert few == many
+    assert data["count"] == 32 and data["total"] == 160.0
+
+
+@pytest.mark.django_db
+def test_rebuild_command_repairs_drift(school):
+    payment = PaymentFactory(school=school, status="posted", amount=Decimal("20.00"))
+    PaymentFactory(school=school, status="posted", amount=Decimal("5.00"))
+    # Writes that bypass Payment.save() are invisible to the rollup
+    Payment.objects.filter(pk=payment.pk).update(amount=Decimal("25.00"))
+
+    with pytest.raises(CommandError, match="1 drifted bucket"):
+        call_command("rebuild_daily_collections", "--verify", stdout=StringIO())
+
+    call_command("rebuild_daily_collections", "--school", str(school.id), stdout=StringIO())
+    assert collection_drift() == {}
+    assert _bucket_totals(status="posted") == (2, Decimal("30.00"))
+    call_command("rebuild_daily_collections", "--verify", stdout=StringIO())
+
+
+@pytest.mark.django_db
+def test_cascade_deletes_keep_rollup_in_step(school, admin):
+    from students.models import Campus
+    kept = PaymentFactory(school=school, status="posted", amount=Decimal("3.00"))
+    student = StudentFactory(school=school)
+    PaymentFactory(school=school, student=student, status="posted", amount=Decimal("10.00"))
+    student.delete()
+    assert _bucket_totals(status="posted") == (1, Decimal("3.00"))
+    assert collection_drift() == {}
+
+    # Through the API, and two levels down from a campus
+    other = PaymentFactory(school=school, student=StudentFactory(school=school), status="pending", amount=Decimal("7.00"))
+    assert _client(admin).delete(f"/api/v1/students/{other.student_id}/").status_code == 204
+    Campus.objects.filter(id=kept.student.campus_id).delete()
+    assert _bucket_totals() == (0, Decimal("0"))
+    assert collection_drift() == {}
+
+
+@pytest.mark.django_db
+def test_deleted_cashier_buckets_move_to_no_cashier(school):
+    cashier = UserFactory(profile__school=school)
+    PaymentFactory(school=school, cashier=cashier, status="posted", amount=Decimal("10.00"))
+    PaymentFactory(school=school, cashier=None, status="posted", amount=Decimal("4.00"))
+    assert DailyCollection.objects.filter(cashier=None).count() == 1
+    cashier.delete()
+    assert collection_drift() == {}
+    assert DailyCollection.objects.filter(status="posted").count() == 1
+    assert _bucket_totals(cashier=None, status="posted") == (2, Decimal("14.00"))
+
+
+@pytest.mark.django_db
+def test_deleting_a_school_drops_its_rollup():
+    school = SchoolFactory()
+    PaymentFactory(school=school, status="posted", amount=Decimal("10.00"))
+    school.delete()
+    assert not DailyCollection.objects.exists()
+    assert collection_drift() == {}
+
+
+@pytest.mark.django_db
+def test_cashier_less_buckets_are_unique():
+    from django.db import IntegrityError, transaction
+    school = SchoolFactory()
+    key = dict(school=school, date=date(2026, 1, 5), cashier=None, term="1", academic_year=2026,
+               payment_method="Cash", fee_type="Tuition", status="posted")
+    DailyCollection.objects.create(**key, payment_count=1, total_amount=Decimal("1.00"))
+    with pytest.raises(IntegrityError), transaction.atomic():
+        DailyCollection.objects.create(**key, payment_count=1, total_amount=Decimal("1.00"))
+
+
+@pytest.mark.django_db
+def test_admins_find_and_repair_drift_over_the_api(school, admin):
+    client = _client(admin)
+    payment = PaymentFactory(school=school, cashier=admin, status="posted", amount=Decimal("20.00"))
+    PaymentFactory(school=SchoolFactory(), status="posted", amount=Decimal("1.00"))
+    Payment.objects.filter(pk=payment.pk).update(amount=Decimal("25.00"))
+    report = f"/api/v1/reports/cashier-daily/?date={date.today()}&cashier_id={admin.id}"
+    before = client.get(report)
+
+    url = "/api/v1/reports/collection-drift/"
+    cashier = UserFactory(username="dc_drift_cashier", profile__school=school)
+    assert _client(cashier).get(url).status_code == 403
+    assert client.get(url, {"date_from": "today"}).status_code == 400
+    data = client.get(url).json()
+    assert data["drifted"] == 1
+    assert data["buckets"][0]["stored_total"] == 20.0 and data["buckets"][0]["expected_total"] == 25.0
+
+    assert client.post(url).json()["drifted"] == 1
+    assert client.get(url).json() == {"drifted": 0, "buckets": []}
+    # The repair invalidates reports built from the drifted buckets
+    after = client.get(report, HTTP_IF_NONE_MATCH=before["ETag"])
+    assert after.status_code == 200 and after.json()["total"] == 25.0
@@ -0,0 +1,153 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, StudentFactory, PaymentFactory, SchoolFactory, CampusFactory
+from payments.models import DrawerSession, Payment, Profile
+from payments.bulk import post_payments, void_payments
+from reports.models import Reconciliation
+
+URL = "/api/v1/payments/drawer-sessions/"
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def cashier(school):
+    return UserFactory(username="drawer_cashier", first_name="Dee", last_name="Rawer", profile__school=school)
+
+
+@pytest.fixture
+def client(cashier):
+    client = APIClient()
+    client.force_authenticate(user=cashier)
+    return client
+
+
+@pytest.fixture
+def session(client, school):
+    campus = CampusFactory(school=school, name="Main")
+    res = client.post(URL, {"campus": campus.id}, format="json")
+    assert res.status_code == 201
+    return DrawerSession.objects.get(id=res.json()["id"])
+
+
+def _refresh(session):
+    session.refresh_from_db()
+    return session.expected_total, session.payment_count
+
+
+@pytest.mark.django_db
+def test_running_total_follows_post_void_edit_and_delete(school, cashier, session):
+    student = StudentFactory(school=school)
+    pending = PaymentFactory(school=school, student=student, cashier=cashier, amount=40, status="pending")
+    posted = PaymentFactory(school=school, student=student, cashier=cashier, amount=60, status="posted")
+    assert pending.drawer_session_id == session.id == posted.drawer_session_id
+    assert _refresh(session) == (Decimal("60.00"), 1)
+
+    pending.status = "posted"
+    pending.save()
+    assert _refresh(session) == (Decimal("100.00"), 2)
+
+    posted.amount = Decimal("65.00")
+    posted.save()
+    assert _refresh(session) == (Decimal("105.00"), 2)
+
+    posted.status = "voided"
+    posted.save()
+    assert _refresh(session) == (Decimal("40.00"), 1)
+
+    pending.delete()
+    assert _refresh(session) == (Decimal("0.00"), 0)
+
+
+@pytest.mark.django_db
+def test_bulk_post_and_void_update_sessions(school, cashier, session):
+    payments = [PaymentFactory(school=school, cashier=cashier, amount=10, status="pending") for _ in range(3)]
+    ids = [p.id for p in payments]
+    post_payments(Payment.objects.filter(id__in=ids))
+    assert _refresh(session) == (Decimal("30.00"), 3)
+    void_payments(Payment.objects.all(), ids[:2], "Duplicate", cashier)
+    assert _refresh(session) == (Decimal("10.00"), 1)
+
+
+@pytest.mark.django_db
+def test_bulk_ingest_joins_open_session(client, school, session):
+    student = StudentFactory(school=school)
+    item = {"student": student.id, "amount": "25.00", "payment_method": "Cash", "status": "posted", "term": "1", "academic_year": 2026}
+    assert client.post("/api/v1/payments/bulk/", [item, item], format="json").status_code == 201
+    assert _refresh(session) == (Decimal("50.00"), 2)
+    assert Payment.objects.filter(drawer_session=session).count() == 2
+
+
+@pytest.mark.django_db
+def test_live_positions_do_not_read_payments(client, school, cashier, session):
+    PaymentFactory(school=school, cashier=cashier, amount=15, status="posted")
+    with CaptureQueriesContext(connection) as ctx:
+        res = client.get(URL, {"status": "open"})
+    assert res.status_code == 200
+    assert not [q for q in ctx.captured_queries if "payments_payment" in q["sql"]]
+    [row] = res.json()
+    assert row["cashier_name"] == "Dee Rawer" and row["campus_name"] == "Main"
+    assert Decimal(row["expected_total"]) == Decimal("15.00") and row["payment_count"] == 1
+
+
+@pytest.mark.django_db
+def test_close_reconciles_against_running_total(client, school, cashier, session):
+    PaymentFactory(school=school, cashier=cashier, amount=50, status="posted")
+    assert client.post(URL, {}, format="json").status_code == 400  # already open
+    res = client.post(f"{URL}{session.id}/close/", {"counted_amount": "45.00", "notes": "Till short"}, format="json")
+    assert res.status_code == 200
+    data = res.json()
+    assert data["session"]["status"] == "closed"
+    assert data["reconciliation"]["status"] == "short"
+    rec = Reconciliation.objects.get(drawer_session=session)
+    assert rec.expected_total == Decimal("50.00") and rec.variance == Decimal("-5.00")
+    assert client.post(f"{URL}{session.id}/close/", {"counted_amount": "45.00"}, format="json").status_code == 400
+    # Payments taken after the close no longer join the session
+    assert PaymentFactory(school=school, cashier=cashier).drawer_session_id is None
+
+
+@pytest.mark.django_db
+def test_closed_session_totals_stay_as_reconciled(client, school, cashier, session):
+    posted = PaymentFactory(school=school, cashier=cashier, amount=50, status="posted")
+    pending = PaymentFactory(school=school, cashier=cashier, amount=30, status="pending")
+    client.post(f"{URL}{session.id}/close/", {"counted_amount": "50.00"}, format="json")
+
+    pending.status = "posted"
+    pending.save()
+    posted.amount = Decimal("55.00")
+    posted.save()
+    void_payments(Payment.objects.all(), [posted.id], "Wrong student", cashier)
+    pending.delete()
+    assert _refresh(session) == (Decimal("50.00"), 1)
+    assert Reconciliation.objects.get(drawer_session=session).expected_total == session.expected_total
+
+
+@pytest.mark.django_db
+def test_handover_opens_next_cashiers_session(client, school, cashier, session):
+    relief = UserFactory(username="relief", profile__school=school)
+    PaymentFactory(school=school, cashier=cashier, amount=20, status="posted")
+    res = client.post(f"{URL}{session.id}/handover/", {"to_cashier_id": relief.id, "counted_amount": "20.00"}, format="json")
+    assert res.status_code == 200
+    data = res.json()
+    assert data["session"]["status"] == "handed_over" and data["reconciliation"]["status"] == "balanced"
+    next_session = DrawerSession.objects.get(id=data["next_session"]["id"])
+    assert next_session.cashier == relief and next_session.previous_session == session
+    assert next_session.campus_id == session.campus_id
+    assert PaymentFactory(school=school, cashier=relief, amount=5, status="posted").drawer_session_id == next_session.id
+
+
+@pytest.mark.django_db
+def test_cashiers_cannot_close_another_cashiers_drawer(school, session):
+    other = UserFactory(username="other_drawer", profile__school=school)
+    client = APIClient()
+    client.force_authenticate(user=other)
+    assert client.post(f"{URL}{session.id}/close/", {"counted_amount": "0"}, format="json").status_code == 403
+    admin = UserFactory(username="drawer_admin", profile__school=school, profile__role=Profile.Role.ADMIN)
+    client.force_authenticate(user=admin)
+    assert client.post(f"{URL}{session.id}/close/", {"counted_amount": "0"}, format="json").status_code == 200
@@ -0,0 +1,80 @@
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, StudentFactory, SchoolFactory
+from payments.models import Payment, IdempotencyRecord
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def client(school):
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(username="idem_cashier", profile__school=school))
+    return client
+
+
+@pytest.fixture
+def payload(school):
+    student = StudentFactory(school=school)
+    return {"student": student.id, "amount": "40.00", "payment_method": "Cash", "term": "1", "academic_year": 2026}
+
+
+@pytest.mark.django_db
+def test_retry_with_same_key_replays_original_response(client, payload):
+    first = client.post("/api/v1/payments/", payload, format="json", HTTP_IDEMPOTENCY_KEY="pay-1")
+    retry = client.post("/api/v1/payments/", payload, format="json", HTTP_IDEMPOTENCY_KEY="pay-1")
+    assert first.status_code == 201 and retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry["Idempotent-Replayed"] == "true"
+    assert Payment.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_different_keys_create_separate_payments(client, payload):
+    client.post("/api/v1/payments/", payload, format="json", HTTP_IDEMPOTENCY_KEY="pay-1")
+    client.post("/api/v1/payments/", payload, format="json", HTTP_IDEMPOTENCY_KEY="pay-2")
+    assert Payment.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_key_reused_with_different_body_is_rejected(client, payload):
+    client.post("/api/v1/payments/", payload, format="json", HTTP_IDEMPOTENCY_KEY="pay-1")
+    res = client.post("/api/v1/payments/", {**payload, "amount": "41.00"}, format="json", HTTP_IDEMPOTENCY_KEY="pay-1")
+    assert res.status_code == 422
+    assert Payment.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_failed_requests_are_not_remembered(client, payload):
+    bad = client.post("/api/v1/payments/", {**payload, "amount": "oops"}, format="json", HTTP_IDEMPOTENCY_KEY="pay-1")
+    assert bad.status_code == 400
+    assert not IdempotencyRecord.objects.exists()
+
+
+@pytest.mark.django_db
+def test_expired_keys_are_not_replayed_and_get_purged(client, payload):
+    client.post("/api/v1/payments/", payload, format="json", HTTP_IDEMPOTENCY_KEY="pay-1")
+    IdempotencyRecord.objects.update(created_at=timezone.now() - timedelta(days=2))
+    res = client.post("/api/v1/payments/", payload, format="json", HTTP_IDEMPOTENCY_KEY="pay-1")
+    assert res.status_code == 201 and "Idempotent-Replayed" not in res
+    assert Payment.objects.count() == 2
+    assert IdempotencyRecord.objects.count() == 1
+
+    IdempotencyRecord.objects.update(created_at=timezone.now() - timedelta(days=2))
+    call_command("purge_idempotency_keys")
+    assert not IdempotencyRecord.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_upload_honours_idempotency_key(client, payload):
+    body = {"payments": [payload, payload]}
+    client.post("/api/v1/payments/bulk/", body, format="json", HTTP_IDEMPOTENCY_KEY="flush-1")
+    retry = client.post("/api/v1/payments/bulk/", body, format="json", HTTP_IDEMPOTENCY_KEY="flush-1")
+    assert retry.status_code == 201 and retry.json()["created"] == 2
+    assert Payment.objects.count() == 2
@@ -0,0 +1,115 @@
+import pytest
+from datetime import date, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, StudentFactory, PaymentFactory, SchoolFactory
+from payments.models import Payment
+from notifications.models import Notification
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def client(school):
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(username="keyset_user", profile__school=school))
+    return client
+
+
+@pytest.fixture
+def payments(school):
+    today = date.today()
+    created = [PaymentFactory(school=school) for _ in range(7)]
+    # Several payments share a date so the id tiebreak matters
+    for i, payment in enumerate(created):
+        Payment.objects.filter(pk=payment.pk).update(date=today - timedelta(days=i // 3))
+    return list(Payment.objects.filter(school=school).order_by("-date", "-id").values_list("id", flat=True))
+
+
+def _walk(client, url, link="next"):
+    ids, pages = [], 0
+    while url:
+        res = client.get(url)
+        assert res.status_code == 200, res.content
+        body = res.json()
+        ids.extend(p["id"] for p in body["results"])
+        url = body[link]
+        pages += 1
+    return ids, pages
+
+
+@pytest.mark.django_db
+def test_cursor_walk_returns_every_payment_once_in_order(client, payments):
+    ids, pages = _walk(client, "/api/v1/payments/?pagination=cursor&page_size=3")
+    assert ids == payments
+    assert pages == 3
+
+
+@pytest.mark.django_db
+def test_previous_links_walk_back(client, payments):
+    first = client.get("/api/v1/payments/?pagination=cursor&page_size=3").json()
+    second = client.get(first["next"]).json()
+    third = client.get(second["next"]).json()
+    assert third["next"] is None
+    back = client.get(third["previous"]).json()
+    assert [p["id"] for p in back["results"]] == [p["id"] for p in second["results"]]
+    back = client.get(back["previous"]).json()
+    assert [p["id"] for p in back["results"]] == payments[:3]
+    assert back["previous"] is None
+
+
+@pytest.mark.django_db
+def test_cursor_follows_requested_ordering_with_nulls(client, school):
+    now = timezone.now()
+    voided = [PaymentFactory(school=school, status="voided", voided_at=now - timedelta(hours=h)) for h in range(3)]
+    pending = [PaymentFactory(school=school) for _ in range(2)]
+    ids, _ = _walk(client, "/api/v1/payments/?pagination=cursor&page_size=2&ordering=-voided_at")
+    # NULL sorts as the largest value, so un-voided payments lead a descending walk
+    assert ids == [p.id for p in sorted(pending, key=lambda p: -p.id)] + [p.id for p in voided]
+
+
+@pytest.mark.django_db
+def test_count_only_on_request_and_no_offset_scans(client, payments):
+    with CaptureQueriesContext(connection) as ctx:
+        body = client.get("/api/v1/payments/?pagination=cursor&page_size=3").json()
+        client.get(body["next"])
+    sql = " ".join(q["sql"].upper() for q in ctx.captured_queries if "PAYMENTS_PAYMENT" in q["sql"].upper())
+    assert "count" not in body
+    assert "COUNT(" not in sql and "OFFSET" not in sql
+
+    assert client.get("/api/v1/payments/?pagination=cursor&count=exact").json()["count"] == 7
+    assert client.get("/api/v1/payments/?pagination=cursor&count=estimate").json()["count"] >= 0
+
+
+@pytest.mark.django_db
+def test_invalid_or_mismatched_cursor_is_rejected(client, payments):
+    assert client.get("/api/v1/payments/?cursor=not-a-cursor").status_code == 400
+    next_url = client.get("/api/v1/payments/?pagination=cursor&page_size=3").json()["next"]
+    assert client.get(next_url + "&ordering=amount").status_code == 400
+
+
+@pytest.mark.django_db
+def test_page_numbers_still_default_for_payments(client, payments):
+    body = client.get("/api/v1/payments/?page=2&page_size=3").json()
+    assert body["count"] == 7
+    assert [p["id"] for p in body["results"]] == payments[3:6]
+
+
+@pytest.mark.django_db
+def test_students_and_notifications_are_opt_in(client, school):
+    students = [StudentFactory(school=school) for _ in range(3)]
+    for student in students:
+        Notification.objects.create(school=school, recipient=student, type="sms", template="Hi")
+    assert isinstance(client.get("/api/v1/students/").json(), list)
+    ids, pages = _walk(client, "/api/v1/students/?pagination=cursor&page_size=2")
+    assert ids == [s.id for s in sorted(students, key=lambda s: s.student_number)]
+    assert pages == 2
+
+    assert isinstance(client.get("/api/v1/notifications/").json(), list)
+    ids, _ = _walk(client, "/api/v1/notifications/?pagination=cursor&page_size=2")
+    assert sorted(ids) == sorted(Notification.objects.values_list("id", flat=True))
@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.http import StreamingHttpResponse
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, PaymentFactory, SchoolFactory
+from payments.models import Profile
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def client(school):
+    client = APIClient()
+    user = UserFactory(username="export_accountant", profile__role=Profile.Role.ACCOUNTANT, profile__school=school)
+    client.force_authenticate(user=user)
+    return client
+
+
+def _body(res):
+    assert isinstance(res, StreamingHttpResponse)
+    return b"".join(res.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_export_csv_streams_filtered_school_payments(client, school):
+    posted = PaymentFactory(school=school, status="posted", amount=Decimal("12.50"), payment_method="Cash")
+    PaymentFactory(school=school, status="pending")
+    PaymentFactory(school=SchoolFactory(), status="posted")
+
+    res = client.get("/api/v1/payments/export/?format=csv&status=posted")
+    assert res.status_code == 200
+    assert res["Content-Type"].startswith("text/csv")
+    assert res["Content-Disposition"] == f'attachment; filename="payments-{date.today():%Y%m%d}.csv"'
+
+    rows = list(csv.DictReader(io.StringIO(_body(res))))
+    assert len(rows) == 1
+    row = rows[0]
+    assert row["id"] == str(posted.id)
+    assert row["student_number"] == posted.student.student_number
+    assert row["amount"] == "12.50"
+    assert row["date"] == str(date.today())
+    assert row["voided_at"] == ""
+
+
+@pytest.mark.django_db
+def test_export_ndjson_uses_list_ordering(client, school):
+    payments = PaymentFactory.create_batch(3, school=school)
+    res = client.get("/api/v1/payments/export/?format=ndjson&ordering=id")
+    assert res["Content-Type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in _body(res).splitlines()]
+    assert [line["id"] for line in lines] == [p.id for p in payments]
+    assert Decimal(lines[0]["amount"]) == payments[0].amount
+    assert lines[0]["cashier_name"] == payments[0].cashier_name
+
+
+@pytest.mark.django_db
+def test_export_query_count_is_flat(client, school):
+    PaymentFactory.create_batch(5, school=school)
+    with CaptureQueriesContext(connection) as few:
+        _body(client.get("/api/v1/payments/export/?format=csv"))
+    PaymentFactory.create_batch(40, school=school)
+    with CaptureQueriesContext(connection) as many:
+        body = _body(client.get("/api/v1/payments/export/?format=csv"))
+    assert len(many.captured_queries) == len(few.captured_queries)
+    assert len(body.splitlines()) == 46
+
+
+@pytest.mark.django_db
+def test_export_rejects_unknown_format_and_bad_filters(client):
+    assert client.get("/api/v1/payments/export/?format=xlsx").status_code == 404
+    assert client.get("/api/v1/payments/export/?format=csv&date=bad").status_code == 400
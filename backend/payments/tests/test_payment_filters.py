@@ -0,0 +1,107 @@
+import pytest
+from datetime import date, timedelta
+from django.db import connection
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from tests.factories import UserFactory, StudentFactory, PaymentFactory, SchoolFactory
+from payments.views import PaymentViewSet
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def user(school):
+    return UserFactory(username="filter_admin", profile__school=school)
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def _ids(res):
+    assert res.status_code == 200, res.content
+    return [p["id"] for p in res.json()["results"]]
+
+
+@pytest.mark.django_db
+def test_status_filter_and_void_ordering(client, school):
+    now = timezone.now()
+    older = PaymentFactory(school=school, status="voided", voided_at=now - timedelta(days=2))
+    newer = PaymentFactory(school=school, status="voided", voided_at=now)
+    PaymentFactory(school=school, status="posted")
+    PaymentFactory(school=SchoolFactory(), status="voided", voided_at=now)
+    assert _ids(client.get("/api/v1/payments/?status=voided&ordering=-voided_at")) == [newer.id, older.id]
+
+
+@pytest.mark.django_db
+def test_field_filters(client, school):
+    student = StudentFactory(school=school)
+    match = PaymentFactory(school=school, student=student, term="2", academic_year=2025, fee_type="Transport",
+                           payment_method="Card", cashier_name="Jane", status="posted")
+    PaymentFactory(school=school, term="2", academic_year=2025, fee_type="Tuition", payment_method="Card", cashier_name="Jane")
+    PaymentFactory(school=school, student=student, term="1", academic_year=2025, fee_type="Transport", payment_method="Cash")
+    query = f"term=2&academic_year=2025&fee_type=Transport&payment_method=Card&cashier_name=Jane&student={student.id}&status=posted,pending"
+    assert _ids(client.get(f"/api/v1/payments/?{query}")) == [match.id]
+
+
+@pytest.mark.django_db
+def test_term_filter_accepts_a_list(client, school):
+    first, second = PaymentFactory(school=school, term="1"), PaymentFactory(school=school, term="2")
+    PaymentFactory(school=school, term="3")
+    assert sorted(_ids(client.get("/api/v1/payments/?term=1,2"))) == sorted([first.id, second.id])
+
+
+@pytest.mark.django_db
+def test_date_range_and_default_ordering(client, school):
+    today = date.today()
+    payments = [PaymentFactory(school=school) for _ in range(3)]
+    for offset, payment in enumerate(payments):
+        type(payment).objects.filter(pk=payment.pk).update(date=today - timedelta(days=offset))
+    query = f"date_from={today - timedelta(days=1)}&date_to={today}"
+    assert _ids(client.get(f"/api/v1/payments/?{query}")) == [payments[0].id, payments[1].id]
+    assert _ids(client.get(f"/api/v1/payments/?date={today - timedelta(days=2)}")) == [payments[2].id]
+
+
+@pytest.mark.django_db
+def test_invalid_filters_and_orderings(client, school):
+    PaymentFactory(school=school)
+    assert client.get("/api/v1/payments/?status=lost").status_code == 400
+    assert client.get("/api/v1/payments/?date_from=yesterday").status_code == 400
+    assert client.get("/api/v1/payments/?student=abc").status_code == 400
+    assert client.get("/api/v1/payments/?term=,").status_code == 400
+    assert client.get("/api/v1/payments/?status=,").status_code == 400
+    # Orderings outside the whitelist are ignored rather than applied
+    assert len(_ids(client.get("/api/v1/payments/?ordering=cashier_name"))) == 1
+
+
+def _plan(user, query):
+    request = APIRequestFactory().get("/api/v1/payments/", query)
+    force_authenticate(request, user=user)
+    view = PaymentViewSet(action="list", format_kwarg=None)
+    view.request = Request(request)
+    view.request.user = user
+    qs = view.filter_queryset(view.get_queryset())
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+    return qs.explain()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query,index", [
+    ({"status": "voided", "ordering": "-voided_at"}, "payment_school_status_void_idx"),
+    ({"date_from": "2026-01-01", "date_to": "2026-01-31"}, "payment_school_date_idx"),
+    ({}, "payment_school_date_idx"),
+    ({"term": "1", "academic_year": "2026", "status": "posted"}, "payment_school_term_idx"),
+    ({"cashier": "1", "date": "2026-01-05"}, "payment_school_cashier_idx"),
+])
+def test_list_query_plans_use_composite_indexes(user, school, query, index):
+    PaymentFactory(school=school)
+    assert index in _plan(user, query)
@@ -0,0 +1,52 @@
+import pytest
+from decimal import Decimal
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, PaymentFactory, SchoolFactory
+from payments.models import Payment
+from payments.serializers import PaymentSerializer, PaymentReadSerializer
+
+
+def _render(data):
+    return JSONRenderer().render(data)
+
+
+@pytest.fixture
+def payments():
+    school = SchoolFactory()
+    cashier = UserFactory(username="read_cashier", profile__school=school)
+    rows = [
+        PaymentFactory(school=school, cashier=cashier, amount=Decimal("100.00")),
+        PaymentFactory(school=school, cashier=None, amount=7, status="posted", reference_id="TX-1",
+                       bank_name="CBZ", merchant_provider="EcoCash"),
+        PaymentFactory(school=school, cashier=cashier, amount=Decimal("0.5"), status="voided",
+                       void_reason="Wrong student", voided_at=timezone.now(), voided_by="Admin User"),
+        PaymentFactory(school=None, cashier=cashier, fee_type="Boarding"),
+    ]
+    return school, cashier, rows
+
+
+@pytest.mark.django_db
+def test_read_serializer_matches_model_serializer_bytes(payments):
+    queryset = Payment.objects.order_by("id")
+    expected = _render(PaymentSerializer(queryset, many=True).data)
+    assert _render(PaymentReadSerializer.many(queryset.values(*PaymentReadSerializer.columns()))) == expected
+    # Instances (retrieve) render the same way
+    assert _render([PaymentReadSerializer.to_representation(vars(p)) for p in queryset]) == expected
+
+
+@pytest.mark.django_db
+def test_list_and_retrieve_json_unchanged(payments):
+    school, cashier, rows = payments
+    client = APIClient()
+    client.force_authenticate(user=cashier)
+
+    res = client.get("/api/v1/payments/?ordering=id")
+    scoped = Payment.objects.filter(school=school).order_by("id")
+    expected = {"count": 3, "next": None, "previous": None, "results": PaymentSerializer(scoped, many=True).data}
+    assert res.content == _render(expected)
+
+    voided = rows[2]
+    res = client.get(f"/api/v1/payments/{voided.id}/")
+    assert res.content == _render(PaymentSerializer(Payment.objects.get(pk=voided.id)).data)
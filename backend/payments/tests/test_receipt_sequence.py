@@ -0,0 +1,69 @@
+import pytest
+from datetime import date
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, StudentFactory, PaymentFactory, SchoolFactory
+from payments.models import ReceiptSequence
+from payments.sequences import next_receipt_number, reserve_receipt_numbers
+
+
+@pytest.mark.django_db
+def test_receipt_numbers_are_sequential_per_school_and_year():
+    school_a = SchoolFactory()
+    school_b = SchoolFactory()
+    assert next_receipt_number(school_a, 2026) == "REC-2026-00001"
+    assert next_receipt_number(school_a, 2026) == "REC-2026-00002"
+    # Other schools and years keep their own counters
+    assert next_receipt_number(school_b, 2026) == "REC-2026-00001"
+    assert next_receipt_number(school_a, 2027) == "REC-2027-00001"
+    assert ReceiptSequence.objects.get(school=school_a, academic_year=2026).last_value == 2
+
+
+@pytest.mark.django_db
+def test_reserve_batch_returns_consecutive_block():
+    school = SchoolFactory()
+    next_receipt_number(school, 2026)
+    batch = reserve_receipt_numbers(school, 2026, 3)
+    assert batch == ["REC-2026-00002", "REC-2026-00003", "REC-2026-00004"]
+    assert next_receipt_number(school, 2026) == "REC-2026-00005"
+
+
+@pytest.mark.django_db
+def test_reserve_rejects_empty_batch():
+    with pytest.raises(ValueError):
+        reserve_receipt_numbers(SchoolFactory(), 2026, 0)
+
+
+@pytest.mark.django_db
+def test_sequence_continues_after_legacy_receipts():
+    school = SchoolFactory()
+    PaymentFactory(school=school, academic_year=2026, receipt_number="REC-2026-00041")
+    PaymentFactory(school=school, academic_year=2026, receipt_number="MANUAL-7")
+    assert next_receipt_number(school, 2026) == "REC-2026-00042"
+
+
+@pytest.mark.django_db
+def test_api_create_assigns_receipt_from_school_sequence():
+    school = SchoolFactory()
+    cashier = UserFactory(username="seq_cashier", profile__school=school)
+    client = APIClient()
+    client.force_authenticate(user=cashier)
+    student = StudentFactory(school=school)
+    year = date.today().year
+    payload = {"student": student.id, "amount": "10.00", "payment_method": "Cash", "term": "1", "academic_year": year}
+
+    first = client.post("/api/v1/payments/", payload, format="json")
+    second = client.post("/api/v1/payments/", payload, format="json")
+    assert first.status_code == 201 and second.status_code == 201
+    assert first.json()["receipt_number"] == f"REC-{year}-00001"
+    assert second.json()["receipt_number"] == f"REC-{year}-00002"
+
+
+@pytest.mark.django_db
+def test_school_less_counter_is_unique_per_year():
+    from django.db import IntegrityError, transaction
+    assert reserve_receipt_numbers(None, 2026, 2) == ["REC-2026-00001", "REC-2026-00002"]
+    assert next_receipt_number(None, 2026) == "REC-2026-00003"
+    # A racing first allocation cannot add a second NULL-school counter
+    with pytest.raises(IntegrityError), transaction.atomic():
+        ReceiptSequence.objects.create(school=None, academic_year=2026, last_value=1)
+    assert ReceiptSequence.objects.filter(school=None, academic_year=2026).count() == 1
@@ -1,8 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PaymentViewSet
+from .views import DrawerSessionViewSet, PaymentViewSet
 
 router = DefaultRouter()
+# Registered before the payments' own '' prefix so it is not read as a payment id
+router.register(r'drawer-sessions', DrawerSessionViewSet, basename='drawer-session')
 router.register(r'', PaymentViewSet)
 
 urlpatterns = [
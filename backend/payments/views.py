@@ -1,13 +1,20 @@
-from rest_framework import viewsets
-from rest_framework.pagination import PageNumberPagination
+from rest_framework import viewsets, filters, mixins
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import action
-from .models import Payment
-from .serializers import PaymentSerializer
-from core.permissions import PaymentWritePermission
+from .models import DrawerSession, Payment
+from .serializers import (
+    PaymentSerializer, PaymentReadSerializer, DrawerSessionSerializer, DrawerCountSerializer, DrawerHandoverSerializer,
+)
+from .drawers import DrawerError, open_session, close_session, hand_over_session
+from .bulk import ingest_payments, void_payments, post_payments, MAX_BULK_PAYMENTS
+from .idempotency import idempotent
+from .filters import PaymentFilterBackend
+from .export import CSVExportRenderer, NDJSONExportRenderer, STREAMERS
+from core.permissions import PaymentWritePermission, DrawerSessionPermission
+from core.pagination import HybridPagination
 
-class StandardPagination(PageNumberPagination):
+class StandardPagination(HybridPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
@@ -16,6 +23,11 @@ class PaymentViewSet(viewsets.ModelViewSet):
     serializer_class = PaymentSerializer
     pagination_class = StandardPagination
     permission_classes = [PaymentWritePermission]
+    filter_backends = [PaymentFilterBackend, filters.OrderingFilter]
+    # Whitelisted orderings; date, id and voided_at are served by composite indexes on Payment,
+    # amount and receipt_number sort the (school-scoped, filtered) rows
+    ordering_fields = ['date', 'id', 'amount', 'status', 'voided_at', 'receipt_number']
+    ordering = ['-date', '-id']
     
     def get_queryset(self):
         # Filter by current user's school for multi-tenant isolation
@@ -23,6 +35,18 @@ class PaymentViewSet(viewsets.ModelViewSet):
             return Payment.objects.filter(school=self.request.user.profile.school)
         return Payment.objects.none()
     
+    def list(self, request, *args, **kwargs):
+        # Read path: values() rows rendered by PaymentReadSerializer (same JSON as PaymentSerializer)
+        queryset = self.filter_queryset(self.get_queryset()).values(*PaymentReadSerializer.columns())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(PaymentReadSerializer.many(page))
+        return Response(PaymentReadSerializer.many(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return Response(PaymentReadSerializer.to_representation(vars(instance)))
+
     def perform_create(self, serializer):
         # Automatically assign school when creating new payment
         if self.request.user.is_authenticated and hasattr(self.request.user, 'profile'):
@@ -70,6 +94,109 @@ class PaymentViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(payment)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_ingest(self, request):
+        """
+        Create many payments in one request (offline-queue flush).
+        Accepts a list of payments or {"payments": [...]} and returns a result per item.
+        """
+        return idempotent(request, lambda: self._bulk_ingest(request))
+
+    def _bulk_ingest(self, request):
+        rows = request.data.get('payments') if isinstance(request.data, dict) else request.data
+        if not isinstance(rows, list) or not rows:
+            return Response({'detail': 'A non-empty list of payments is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > MAX_BULK_PAYMENTS:
+            return Response(
+                {'detail': f'At most {MAX_BULK_PAYMENTS} payments can be submitted at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        profile = getattr(request.user, 'profile', None)
+        school = profile.school if profile else None
+
+        from django.db import IntegrityError
+        try:
+            results = ingest_payments(rows, school, request.user)
+        except IntegrityError:
+            return Response({'detail': 'Duplicate receipt number.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        created = sum(1 for r in results if r['ok'])
+        return Response(
+            {'created': created, 'failed': len(results) - created, 'results': results},
+            status=status.HTTP_201_CREATED if created == len(results) else status.HTTP_207_MULTI_STATUS
+        )
+
+    @action(detail=False, methods=['get'], url_path='export', renderer_classes=[CSVExportRenderer, NDJSONExportRenderer])
+    def export(self, request):
+        """
+        Stream every payment matching the list filters as CSV (default) or
+        NDJSON (?format=ndjson), unpaginated.
+        """
+        from datetime import date
+        from django.http import StreamingHttpResponse
+
+        fmt = request.accepted_renderer.format
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(STREAMERS[fmt](queryset), content_type=request.accepted_renderer.media_type)
+        response['Content-Disposition'] = f'attachment; filename="payments-{date.today():%Y%m%d}.{fmt}"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='bulk-void')
+    def bulk_void(self, request):
+        """
+        Void a list of payments with one reason, in a single transaction.
+        Only admins can void payments; nothing is voided if any id is invalid.
+        """
+        from core.permissions import get_role
+
+        if get_role(request.user) != 'Admin':
+            return Response({'detail': 'Only admins can void payments'}, status=status.HTTP_403_FORBIDDEN)
+
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response({'ids': 'A non-empty list of payment ids is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            return Response({'ids': 'Payment ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > MAX_BULK_PAYMENTS:
+            return Response(
+                {'ids': f'At most {MAX_BULK_PAYMENTS} payments can be voided at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        void_reason = request.data.get('void_reason')
+        if not void_reason:
+            return Response({'void_reason': 'Void reason is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        voided, errors = void_payments(self.get_queryset(), ids, void_reason, request.user)
+        if errors:
+            return Response(
+                {'detail': 'No payments were voided', 'errors': {str(k): v for k, v in errors.items()}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({'voided': voided, 'ids': ids})
+
+    @action(detail=False, methods=['post'], url_path='bulk-post')
+    def bulk_post(self, request):
+        """
+        Post every pending payment matching the list filters (e.g.
+        ?cashier=7&date=2026-01-05 for a cashier's day) in one UPDATE.
+        Only admins can bulk post, and at least one filter is required.
+        """
+        from core.permissions import get_role
+
+        if get_role(request.user) != 'Admin':
+            return Response({'detail': 'Only admins can bulk post payments'}, status=status.HTTP_403_FORBIDDEN)
+        if not PaymentFilterBackend.is_filtered(request):
+            return Response(
+                {'detail': 'At least one filter is required to bulk post payments'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = PaymentFilterBackend().filter_queryset(request, self.get_queryset(), self)
+        return Response({'posted': post_payments(queryset)})
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         if instance.status == 'posted':
@@ -77,9 +204,107 @@ class PaymentViewSet(viewsets.ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
     def create(self, request, *args, **kwargs):
+        # Retries carrying the same Idempotency-Key replay the first 201
+        return idempotent(request, lambda: self._create(request, *args, **kwargs))
+
+    def _create(self, request, *args, **kwargs):
         from django.db import IntegrityError
         from rest_framework.exceptions import ValidationError
         try:
             return super().create(request, *args, **kwargs)
         except IntegrityError:
             raise ValidationError({"detail": "Duplicate receipt number."})
+
+
+class DrawerSessionViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Cashier drawer sessions. POST opens one for the caller (admins may pass
+    cashier_id); close/ and handover/ record the cash count. The list
+    (?status=open[&campus=][&cashier=]) is the live drawer position board,
+    read from the sessions' running totals.
+    """
+    serializer_class = DrawerSessionSerializer
+    permission_classes = [DrawerSessionPermission]
+
+    def get_queryset(self):
+        if not (self.request.user.is_authenticated and hasattr(self.request.user, 'profile')):
+            return DrawerSession.objects.none()
+        qs = DrawerSession.objects.filter(school=self.request.user.profile.school).select_related('cashier', 'campus')
+        params = self.request.query_params
+        if params.get('status'):
+            qs = qs.filter(status=params['status'])
+        if params.get('campus', '').isdigit():
+            qs = qs.filter(campus_id=int(params['campus']))
+        if params.get('cashier', '').isdigit():
+            qs = qs.filter(cashier_id=int(params['cashier']))
+        return qs.order_by('-opened_at', '-id')
+
+    def create(self, request, *args, **kwargs):
+        from django.contrib.auth.models import User
+        from core.permissions import get_role
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        school = request.user.profile.school if hasattr(request.user, 'profile') else None
+
+        cashier = request.user
+        cashier_id = request.data.get('cashier_id')
+        if cashier_id and str(cashier_id) != str(request.user.id):
+            if get_role(request.user) != 'Admin':
+                return Response({'detail': 'Only admins can open a drawer for another cashier'}, status=status.HTTP_403_FORBIDDEN)
+            cashier = User.objects.filter(id=cashier_id, profile__school=school).first()
+            if cashier is None:
+                return Response({'cashier_id': 'Invalid cashier'}, status=status.HTTP_400_BAD_REQUEST)
+
+        campus = serializer.validated_data.get('campus')
+        if campus is not None and campus.school_id != (school.id if school else None):
+            return Response({'campus': 'Invalid campus'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            session = open_session(school, cashier, campus)
+        except DrawerError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(session).data, status=status.HTTP_201_CREATED)
+
+    def _count_response(self, session, reconciliation, **extra):
+        return Response({
+            'session': self.get_serializer(session).data,
+            **extra,
+            'reconciliation': {
+                'id': reconciliation.id,
+                'expected_total': reconciliation.expected_total,
+                'actual_amount': reconciliation.actual_amount,
+                'variance': reconciliation.variance,
+                'status': reconciliation.status,
+            },
+        })
+
+    @action(detail=True, methods=['post'], url_path='close')
+    def close(self, request, pk=None):
+        """Close the session with the counted cash and reconcile it"""
+        session = self.get_object()
+        count = DrawerCountSerializer(data=request.data)
+        count.is_valid(raise_exception=True)
+        try:
+            session, reconciliation = close_session(session, count.validated_data['counted_amount'], count.validated_data['notes'])
+        except DrawerError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return self._count_response(session, reconciliation)
+
+    @action(detail=True, methods=['post'], url_path='handover')
+    def handover(self, request, pk=None):
+        """Count and close the session, then open the next cashier's session at the same campus"""
+        from django.contrib.auth.models import User
+
+        session = self.get_object()
+        handover = DrawerHandoverSerializer(data=request.data)
+        handover.is_valid(raise_exception=True)
+        to_cashier = User.objects.filter(id=handover.validated_data['to_cashier_id'], profile__school=session.school).first()
+        if to_cashier is None or to_cashier.id == session.cashier_id:
+            return Response({'to_cashier_id': 'Invalid cashier'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            session, next_session, reconciliation = hand_over_session(
+                session, to_cashier, handover.validated_data['counted_amount'], handover.validated_data['notes']
+            )
+        except DrawerError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return self._count_response(session, reconciliation, next_session=self.get_serializer(next_session).data)
@@ -0,0 +1,100 @@
+"""
+Cashier collections over a date range.
+
+One GROUP BY over the DailyCollection rollup returns every
+(cashier, day, payment method) cell for the range, so a supervisor's weekly
+review of all cashiers is one query instead of a cashier-daily request per
+cashier per day. The matrix is also available as CSV (`?format=csv`), one
+row per non-empty cell.
+"""
+import csv
+import io
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Sum
+from rest_framework.renderers import BaseRenderer
+
+from payments.models import DailyCollection
+
+# Longest range served in one response
+MAX_RANGE_DAYS = 92
+
+
+def cashier_matrix(school, date_from, date_to, cashier_ids=None):
+    """
+    {'days': [...], 'methods': [...], 'cashiers': [{'cashier_id', 'cashier_name',
+    'total', 'count', 'by_day': [{'total', 'count', 'by_method'}, ...]}]}
+    with `by_day` aligned to `days`. Voided payments are excluded.
+    """
+    qs = DailyCollection.objects.filter(
+        date__gte=date_from, date__lte=date_to, cashier__isnull=False, payment_count__gt=0
+    ).exclude(status='voided')
+    if school is not None:
+        qs = qs.filter(school=school)
+    if cashier_ids:
+        qs = qs.filter(cashier_id__in=cashier_ids)
+    rows = (
+        qs.values('cashier', 'cashier__first_name', 'cashier__last_name', 'cashier__username', 'date', 'payment_method')
+        .annotate(total=Sum('total_amount'), count=Sum('payment_count'))
+        .order_by('cashier', 'date', 'payment_method')
+    )
+
+    days = [date_from + timedelta(days=n) for n in range((date_to - date_from).days + 1)]
+    position = {day: n for n, day in enumerate(days)}
+    methods = set()
+    cashiers = {}
+    for row in rows:
+        entry = cashiers.get(row['cashier'])
+        if entry is None:
+            entry = cashiers[row['cashier']] = {
+                'cashier_id': row['cashier'],
+                'cashier_name': (
+                    f"{row['cashier__first_name']} {row['cashier__last_name']}".strip() or row['cashier__username']
+                ),
+                'total': Decimal('0'),
+                'count': 0,
+                'by_day': [{'total': Decimal('0'), 'count': 0, 'by_method': {}} for _ in days],
+            }
+        cell = entry['by_day'][position[row['date']]]
+        cell['total'] += row['total']
+        cell['count'] += row['count']
+        cell['by_method'][row['payment_method']] = {'total': float(row['total']), 'count': row['count']}
+        entry['total'] += row['total']
+        entry['count'] += row['count']
+        methods.add(row['payment_method'])
+
+    for entry in cashiers.values():
+        entry['total'] = float(entry['total'])
+        for cell in entry['by_day']:
+            cell['total'] = float(cell['total'])
+    return {'days': days, 'methods': sorted(methods), 'cashiers': list(cashiers.values())}
+
+
+class CashierMatrixCSVRenderer(BaseRenderer):
+    """`?format=csv`: one row per cashier, day and payment method with collections"""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+    header = ['cashier_id', 'cashier_name', 'date', 'payment_method', 'count', 'total']
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, dict) or 'cashiers' not in data:
+            # Errors keep their JSON body
+            return json.dumps(data, cls=DjangoJSONEncoder).encode() if data is not None else b''
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            response['Content-Disposition'] = f'attachment; filename="cashiers-{data["from"]}-{data["to"]}.csv"'
+
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(self.header)
+        for entry in data['cashiers']:
+            for day, cell in zip(data['days'], entry['by_day']):
+                for method, totals in sorted(cell['by_method'].items()):
+                    writer.writerow([
+                        entry['cashier_id'], entry['cashier_name'], day, method, totals['count'], f"{totals['total']:.2f}"
+                    ])
+        return out.getvalue().encode(self.charset)
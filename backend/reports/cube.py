@@ -0,0 +1,162 @@
+"""
+Term analytics cube.
+
+Totals for one term broken down by several dimensions (and combinations of
+them) in a single grouped query: GROUPING SETS on PostgreSQL, and an
+equivalent UNION ALL of GROUP BYs elsewhere (SQLite). The result is returned
+column-wise - one array per key column plus `total` and `count` arrays per
+breakdown - which is far smaller than a list of objects for wide breakdowns.
+"""
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+
+from payments.models import Payment
+from students.models import Campus, Student
+
+# dimension -> [(output column, SQL expression)]; the first column is the key
+DIMENSIONS = {
+    'payment_method': [('payment_method', 'p.payment_method')],
+    'fee_type': [('fee_type', 'p.fee_type')],
+    'campus': [('campus', 'c.name')],
+    'grade': [('grade', 's.current_grade')],
+    'cashier': [
+        ('cashier', 'p.cashier_id'),
+        ('_first_name', 'u.first_name'),
+        ('_last_name', 'u.last_name'),
+        ('_username', 'u.username'),
+    ],
+}
+DEFAULT_DIMENSIONS = ['payment_method', 'fee_type', 'campus', 'grade', 'cashier']
+COMBINE = '*'
+
+
+def parse_breakdowns(value):
+    """
+    'payment_method,fee_type*campus' -> [('payment_method',), ('fee_type', 'campus')]
+    Raises ValueError naming an unknown dimension.
+    """
+    if not value:
+        return [(name,) for name in DEFAULT_DIMENSIONS]
+    breakdowns = []
+    for spec in value.split(','):
+        dims = tuple(dict.fromkeys(d.strip() for d in spec.split(COMBINE) if d.strip()))
+        for dim in dims:
+            if dim not in DIMENSIONS:
+                raise ValueError(dim)
+        # 'a*b' and 'b*a' are the same grouping set
+        if dims and set(dims) not in [set(b) for b in breakdowns]:
+            breakdowns.append(dims)
+    return breakdowns
+
+
+def _from_clause():
+    return (
+        f"FROM {Payment._meta.db_table} p "
+        f"JOIN {Student._meta.db_table} s ON s.id = p.student_id "
+        f"JOIN {Campus._meta.db_table} c ON c.id = s.campus_id "
+        f"LEFT JOIN {User._meta.db_table} u ON u.id = p.cashier_id"
+    )
+
+
+def _where_clause(school, term, year, statuses):
+    conditions = ['p.term = %s', 'p.academic_year = %s', f"p.status IN ({', '.join(['%s'] * len(statuses))})"]
+    params = [term, year, *statuses]
+    if school is not None:
+        conditions.append('p.school_id = %s')
+        params.append(school.id)
+    return 'WHERE ' + ' AND '.join(conditions), params
+
+
+def _columns(dims):
+    return [column for dim in dims for column in DIMENSIONS[dim]]
+
+
+def _grouping_sets_sql(breakdowns, where, params):
+    """One scan with GROUPING SETS; GROUPING() tells the sets apart"""
+    all_columns = list(dict.fromkeys(column for dims in breakdowns for column in _columns(dims)))
+    expressions = [expr for _, expr in all_columns]
+    sets = ['()'] + ['(' + ', '.join(expr for _, expr in _columns(dims)) + ')' for dims in breakdowns]
+    sql = (
+        f"SELECT GROUPING({', '.join(expressions)}) AS gset, {', '.join(expressions)}, SUM(p.amount), COUNT(*) "
+        f"{_from_clause()} {where} GROUP BY GROUPING SETS ({', '.join(sets)})"
+    )
+    # GROUPING() sets bit (n-1-i) for each expression i that is NOT grouped in the row's set
+    masks = {}
+    for index, dims in enumerate([()] + breakdowns):
+        grouped = {expr for _, expr in _columns(dims)}
+        mask = 0
+        for i, expr in enumerate(expressions):
+            if expr not in grouped:
+                mask |= 1 << (len(expressions) - 1 - i)
+        masks[mask] = index
+    return sql, params, all_columns, masks
+
+
+def _union_sql(breakdowns, where, params):
+    """The same sets as a single UNION ALL query, for databases without GROUPING SETS"""
+    all_columns = list(dict.fromkeys(column for dims in breakdowns for column in _columns(dims)))
+    parts, all_params = [], []
+    for index, dims in enumerate([()] + breakdowns):
+        grouped = [expr for _, expr in _columns(dims)]
+        selected = [expr if expr in grouped else 'NULL' for _, expr in all_columns]
+        group_by = f" GROUP BY {', '.join(grouped)}" if grouped else ''
+        parts.append(
+            f"SELECT {index} AS gset{''.join(', ' + s for s in selected)}, SUM(p.amount), COUNT(*) "
+            f"{_from_clause()} {where}{group_by}"
+        )
+        all_params.extend(params)
+    return ' UNION ALL '.join(parts), all_params, all_columns, None
+
+
+def _cashier_label(first_name, last_name, username):
+    full = f"{first_name or ''} {last_name or ''}".strip()
+    return full or username
+
+
+def term_cube(school, term, year, breakdowns, statuses=('posted',)):
+    """
+    {'total': {...}, 'breakdowns': {'fee_type*campus': {'fee_type': [...], 'campus': [...],
+    'total': [...], 'count': [...]}, ...}} from one query.
+    """
+    where, params = _where_clause(school, term, year, list(statuses))
+    if connection.vendor == 'postgresql':
+        sql, params, all_columns, masks = _grouping_sets_sql(breakdowns, where, params)
+    else:
+        sql, params, all_columns, masks = _union_sql(breakdowns, where, params)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    sets = [()] + breakdowns
+    positions = {name: i + 1 for i, (name, _) in enumerate(all_columns)}
+    grand = {'total': 0.0, 'count': 0}
+    results = {}
+    for dims in breakdowns:
+        columns = {DIMENSIONS[dim][0][0]: [] for dim in dims}
+        if 'cashier' in dims:
+            columns['cashier_name'] = []
+        results[COMBINE.join(dims)] = {**columns, 'total': [], 'count': []}
+
+    for row in sorted(rows, key=lambda r: tuple((v is None, str(v)) for v in r[1:-2])):
+        index = masks[row[0]] if masks is not None else row[0]
+        total, count = round(float(row[-2] or Decimal('0')), 2), row[-1]
+        dims = sets[index]
+        if not dims:
+            grand = {'total': total, 'count': count}
+            continue
+        out = results[COMBINE.join(dims)]
+        for dim in dims:
+            key_column = DIMENSIONS[dim][0][0]
+            out[key_column].append(row[positions[key_column]])
+            if dim == 'cashier':
+                out['cashier_name'].append(
+                    _cashier_label(*(row[positions[name]] for name in ('_first_name', '_last_name', '_username')))
+                    if row[positions['cashier']] is not None else None
+                )
+        out['total'].append(total)
+        out['count'].append(count)
+
+    return {'total': grand, 'breakdowns': results}
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.26 on 2026-10-18 09:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0017_drawer_session'),
+        ('reports', '0003_reconciliation_school_statement_school'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reconciliation',
+            name='drawer_session',
+            field=models.OneToOneField(blank=True, help_text='Drawer session this count closed, if any', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reconciliation', to='payments.drawersession'),
+        ),
+    ]
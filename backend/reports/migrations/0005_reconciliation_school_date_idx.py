@@ -0,0 +1,17 @@
+# Generated by Django 4.2.26 on 2026-10-18 09:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_reconciliation_drawer_session'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reconciliation',
+            index=models.Index(fields=['school', 'date', 'cashier'], name='reconciliation_school_date_idx'),
+        ),
+    ]
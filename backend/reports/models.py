@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from students.models import Student
 from payments.models import Payment
 from django.contrib.auth.models import User
@@ -47,6 +47,14 @@ class Reconciliation(models.Model):
     )
     cashier = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateField()
+    drawer_session = models.OneToOneField(
+        'payments.DrawerSession',
+        on_delete=models.SET_NULL,
+        related_name='reconciliation',
+        null=True,
+        blank=True,
+        help_text="Drawer session this count closed, if any"
+    )
     expected_total = models.DecimalField(max_digits=10, decimal_places=2)
     actual_amount = models.DecimalField(max_digits=10, decimal_places=2)
     variance = models.DecimalField(max_digits=10, decimal_places=2)
@@ -55,3 +63,22 @@ class Reconciliation(models.Model):
 
     def __str__(self):
         return f"{self.cashier.username} {self.date} {self.status}"
+
+    class Meta:
+        indexes = [
+            # Reconciliation list and variance analytics over a date range
+            models.Index(fields=['school', 'date', 'cashier'], name='reconciliation_school_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        from core.versioning import bump_versions
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            bump_versions([self.school_id])
+
+    def delete(self, *args, **kwargs):
+        from core.versioning import bump_versions
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            bump_versions([self.school_id])
+        return result
@@ -0,0 +1,194 @@
+"""
+Cashier reconciliation.
+
+Expected totals are the posted collections in the DailyCollection rollup, so
+every cashier's expected total for a day comes from one grouped query. A
+day-end close reconciles all cashiers at once: their counts are validated
+together and the Reconciliation rows are written with one bulk_create.
+
+Variance analytics summarise a date range per cashier with window
+aggregates, so the per-cashier totals and each cashier's worst days come
+back from a single query over the (school, date, cashier) index.
+"""
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Sum, Value, When, Window
+from django.db.models.functions import Abs, RowNumber
+
+from core.versioning import bump_versions
+from payments.models import DailyCollection
+from .models import Reconciliation
+
+MAX_BATCH_RECONCILIATIONS = 200
+# Worst days listed per cashier in variance analytics (default / maximum)
+WORST_DAYS = 3
+MAX_WORST_DAYS = 10
+
+
+def expected_totals(school, day, cashier_ids=None):
+    """{cashier id: posted total} for the day, from one grouped query"""
+    qs = DailyCollection.objects.filter(date=day, status='posted', cashier__isnull=False)
+    if school is not None:
+        qs = qs.filter(school=school)
+    if cashier_ids is not None:
+        qs = qs.filter(cashier_id__in=cashier_ids)
+    return {
+        row['cashier']: row['total'] or Decimal('0')
+        for row in qs.values('cashier').annotate(total=Sum('total_amount')).order_by()
+    }
+
+
+def reconciliation_status(variance):
+    return 'balanced' if variance == 0 else ('short' if variance < 0 else 'over')
+
+
+def day_expectations(school, day):
+    """Every cashier with payments on the day, their name, and expected total"""
+    qs = DailyCollection.objects.filter(date=day, cashier__isnull=False, payment_count__gt=0).exclude(status='voided')
+    if school is not None:
+        qs = qs.filter(school=school)
+    rows = (
+        qs.values('cashier', 'cashier__first_name', 'cashier__last_name', 'cashier__username', 'status')
+        .annotate(total=Sum('total_amount'), count=Sum('payment_count'))
+        .order_by('cashier')
+    )
+    cashiers = {}
+    for row in rows:
+        entry = cashiers.setdefault(row['cashier'], {
+            'cashier_id': row['cashier'],
+            'cashier_name': (
+                f"{row['cashier__first_name']} {row['cashier__last_name']}".strip() or row['cashier__username']
+            ),
+            'expected_total': Decimal('0'),
+            'pending_total': Decimal('0'),
+            'count': 0,
+        })
+        if row['status'] == 'posted':
+            entry['expected_total'] += row['total']
+        else:
+            entry['pending_total'] += row['total']
+        entry['count'] += row['count']
+    return list(cashiers.values())
+
+
+def reconcile_cashiers(school, day, counts):
+    """
+    Reconcile several cashiers' cash counts for a day in one transaction.
+    `counts` are validated {'cashier_id', 'actual_amount', 'notes'} dicts with
+    distinct cashiers. Returns (reconciliations, errors by cashier id); nothing
+    is written when there are errors.
+    """
+    ids = [count['cashier_id'] for count in counts]
+    cashiers = User.objects.filter(id__in=ids)
+    if school is not None:
+        cashiers = cashiers.filter(profile__school=school)
+    known = set(cashiers.values_list('id', flat=True))
+    errors = {cashier_id: 'Invalid cashier' for cashier_id in ids if cashier_id not in known}
+    if errors:
+        return [], errors
+
+    expected = expected_totals(school, day, ids)
+    reconciliations = []
+    for count in counts:
+        expected_total = expected.get(count['cashier_id'], Decimal('0'))
+        variance = count['actual_amount'] - expected_total
+        reconciliations.append(Reconciliation(
+            school=school,
+            cashier_id=count['cashier_id'],
+            date=day,
+            expected_total=expected_total,
+            actual_amount=count['actual_amount'],
+            variance=variance,
+            status=reconciliation_status(variance),
+            notes=count.get('notes', ''),
+        ))
+    with transaction.atomic():
+        # bulk_create skips Reconciliation.save(), which bumps the school's data version
+        reconciliations = Reconciliation.objects.bulk_create(reconciliations)
+        bump_versions([school.id if school is not None else None])
+    return reconciliations, {}
+
+
+def _per_cashier(expression):
+    return Window(expression, partition_by=[F('cashier_id')])
+
+
+def _count_where(**condition):
+    return _per_cashier(Sum(Case(When(**condition, then=Value(1)), default=Value(0), output_field=IntegerField())))
+
+
+def _sum_where(field, **condition):
+    money = DecimalField(max_digits=14, decimal_places=2)
+    return _per_cashier(Sum(Case(When(**condition, then=F(field)), default=Value(Decimal('0')), output_field=money)))
+
+
+def variance_by_cashier(school, date_from, date_to, cashier_id=None, worst=WORST_DAYS):
+    """
+    Per-cashier reconciliation outcomes between two dates (inclusive):
+    short/over/balanced counts, cumulative variance, and the `worst` largest
+    variances. Cashiers are ordered by cumulative variance, most short first.
+    """
+    qs = Reconciliation.objects.filter(date__gte=date_from, date__lte=date_to)
+    if school is not None:
+        qs = qs.filter(school=school)
+    if cashier_id is not None:
+        qs = qs.filter(cashier_id=cashier_id)
+
+    rows = (
+        qs.annotate(
+            rank=Window(
+                RowNumber(),
+                partition_by=[F('cashier_id')],
+                order_by=[Abs('variance').desc(), F('date').desc(), F('id').desc()],
+            ),
+            reconciliation_count=_per_cashier(Count('id')),
+            short_count=_count_where(status='short'),
+            over_count=_count_where(status='over'),
+            balanced_count=_count_where(status='balanced'),
+            total_variance=_per_cashier(Sum('variance')),
+            total_short=_sum_where('variance', variance__lt=0),
+            total_over=_sum_where('variance', variance__gt=0),
+            total_expected=_per_cashier(Sum('expected_total')),
+            total_actual=_per_cashier(Sum('actual_amount')),
+        )
+        .filter(rank__lte=worst)
+        .order_by('cashier_id', 'rank')
+        .values(
+            'cashier_id', 'cashier__first_name', 'cashier__last_name', 'cashier__username',
+            'date', 'expected_total', 'actual_amount', 'variance', 'status', 'notes',
+            'reconciliation_count', 'short_count', 'over_count', 'balanced_count',
+            'total_variance', 'total_short', 'total_over', 'total_expected', 'total_actual',
+        )
+    )
+
+    cashiers = {}
+    for row in rows:
+        entry = cashiers.get(row['cashier_id'])
+        if entry is None:
+            entry = cashiers[row['cashier_id']] = {
+                'cashier_id': row['cashier_id'],
+                'cashier_name': (
+                    f"{row['cashier__first_name']} {row['cashier__last_name']}".strip() or row['cashier__username']
+                ),
+                'reconciliations': row['reconciliation_count'],
+                'short': row['short_count'],
+                'over': row['over_count'],
+                'balanced': row['balanced_count'],
+                'total_variance': row['total_variance'],
+                'total_short': row['total_short'],
+                'total_over': row['total_over'],
+                'total_expected': row['total_expected'],
+                'total_actual': row['total_actual'],
+                'worst_days': [],
+            }
+        entry['worst_days'].append({
+            'date': row['date'],
+            'expected_total': row['expected_total'],
+            'actual_amount': row['actual_amount'],
+            'variance': row['variance'],
+            'status': row['status'],
+            'notes': row['notes'],
+        })
+    return sorted(cashiers.values(), key=lambda entry: (entry['total_variance'], entry['cashier_id']))
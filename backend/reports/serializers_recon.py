@@ -3,8 +3,7 @@ from .models import Reconciliation
 from django.contrib.auth.models import User
 from datetime import date
 from decimal import Decimal
-from payments.models import Payment
-from django.db.models import Sum
+from .reconciliation import MAX_BATCH_RECONCILIATIONS, expected_totals, reconciliation_status
 
 class ReconciliationSerializer(serializers.ModelSerializer):
     cashier_id = serializers.IntegerField(write_only=True, required=False)
@@ -34,10 +33,11 @@ class ReconciliationSerializer(serializers.ModelSerializer):
             attrs['date'] = date.today()
 
         user = attrs.get('cashier')
-        cashier_name = (user.get_full_name() or user.username) if user else None
-        if cashier_name:
-            qs = Payment.objects.filter(date=attrs['date'], cashier_name=cashier_name, status='posted')
-            expected_total = qs.aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        if user:
+            school = None
+            if req and req.user.is_authenticated and hasattr(req.user, 'profile') and req.user.profile.school:
+                school = req.user.profile.school
+            expected_total = expected_totals(school, attrs['date'], [user.id]).get(user.id, Decimal('0'))
         else:
             expected_total = Decimal('0')
         attrs['expected_total'] = expected_total
@@ -48,6 +48,26 @@ class ReconciliationSerializer(serializers.ModelSerializer):
         actual = Decimal(str(actual or '0'))
         variance = actual - expected
         attrs['variance'] = variance
-        attrs['status'] = 'balanced' if variance == 0 else ('short' if variance < 0 else 'over')
+        attrs['status'] = reconciliation_status(variance)
 
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class ReconciliationCountSerializer(serializers.Serializer):
+    """One cashier's cash count in a batch reconciliation"""
+    cashier_id = serializers.IntegerField()
+    actual_amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    notes = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+
+
+class ReconciliationBatchSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    counts = ReconciliationCountSerializer(many=True, allow_empty=False)
+
+    def validate_counts(self, counts):
+        if len(counts) > MAX_BATCH_RECONCILIATIONS:
+            raise serializers.ValidationError(f'At most {MAX_BATCH_RECONCILIATIONS} cashiers can be reconciled at once')
+        ids = [count['cashier_id'] for count in counts]
+        if len(set(ids)) != len(ids):
+            raise serializers.ValidationError('Each cashier can only be counted once')
+        return counts
@@ -0,0 +1,90 @@
+import csv
+import io
+import pytest
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, PaymentFactory, SchoolFactory
+
+URL = "/api/v1/reports/cashier-range/"
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def client(school):
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(username="range_supervisor", profile__school=school))
+    return client
+
+
+def _pay(day, **kwargs):
+    # Payment.date is auto_now_add, so move the payment to its day with a second save
+    payment = PaymentFactory(**kwargs)
+    payment.date = day
+    payment.save()
+    return payment
+
+
+@pytest.fixture
+def cashiers(school):
+    ann = UserFactory(username="range_ann", first_name="Ann", last_name="Till", profile__school=school)
+    bob = UserFactory(username="range_bob", profile__school=school)
+    _pay(date(2026, 3, 2), school=school, cashier=ann, amount=10, payment_method="Cash", status="posted")
+    _pay(date(2026, 3, 2), school=school, cashier=ann, amount=15, payment_method="Cash", status="pending")
+    _pay(date(2026, 3, 2), school=school, cashier=ann, amount=30, payment_method="EcoCash", status="posted")
+    _pay(date(2026, 3, 4), school=school, cashier=ann, amount=5, payment_method="Cash", status="posted")
+    _pay(date(2026, 3, 3), school=school, cashier=bob, amount=20, payment_method="Cash", status="posted")
+    _pay(date(2026, 3, 3), school=school, cashier=bob, amount=99, payment_method="Cash", status="voided")
+    _pay(date(2026, 3, 3), school=SchoolFactory(), cashier=bob, amount=99, payment_method="Cash", status="posted")
+    return ann, bob
+
+
+@pytest.mark.django_db
+def test_matrix_of_cashiers_days_and_methods(client, cashiers):
+    ann, bob = cashiers
+    res = client.get(URL, {"from": "2026-03-02", "to": "2026-03-04"})
+    assert res.status_code == 200
+    data = res.json()
+    assert data["days"] == ["2026-03-02", "2026-03-03", "2026-03-04"]
+    assert data["methods"] == ["Cash", "EcoCash"]
+    first, second = data["cashiers"]
+    assert first["cashier_id"] == ann.id and first["cashier_name"] == "Ann Till"
+    assert first["total"] == 60.0 and first["count"] == 4
+    assert [cell["total"] for cell in first["by_day"]] == [55.0, 0.0, 5.0]
+    assert first["by_day"][0]["by_method"] == {"Cash": {"total": 25.0, "count": 2}, "EcoCash": {"total": 30.0, "count": 1}}
+    assert second["cashier_id"] == bob.id and [cell["total"] for cell in second["by_day"]] == [0.0, 20.0, 0.0]
+
+
+@pytest.mark.django_db
+def test_selected_cashiers_in_one_query(client, cashiers):
+    ann, bob = cashiers
+    with CaptureQueriesContext(connection) as ctx:
+        res = client.get(URL, {"from": "2026-03-01", "to": "2026-03-07", "cashiers": f"{bob.id}"})
+    assert [c["cashier_id"] for c in res.json()["cashiers"]] == [bob.id]
+    assert len([q for q in ctx.captured_queries if "payments_" in q["sql"]]) == 1
+
+
+@pytest.mark.django_db
+def test_csv_rendering(client, cashiers):
+    ann, _ = cashiers
+    res = client.get(URL, {"from": "2026-03-02", "to": "2026-03-04", "format": "csv"})
+    assert res.status_code == 200
+    assert res["Content-Type"].startswith("text/csv")
+    assert res["Content-Disposition"] == 'attachment; filename="cashiers-2026-03-02-2026-03-04.csv"'
+    rows = list(csv.reader(io.StringIO(res.content.decode())))
+    assert rows[0] == ["cashier_id", "cashier_name", "date", "payment_method", "count", "total"]
+    assert rows[1] == [str(ann.id), "Ann Till", "2026-03-02", "Cash", "2", "25.00"]
+    assert len(rows) == 5
+
+
+@pytest.mark.django_db
+def test_range_rejects_bad_parameters(client):
+    assert client.get(URL, {"from": "2026-03-02"}).status_code == 400
+    assert client.get(URL, {"from": "2026-03-05", "to": "2026-03-01"}).status_code == 400
+    assert client.get(URL, {"from": "2026-01-01", "to": "2026-12-31"}).status_code == 400
+    assert client.get(URL, {"from": "2026-03-01", "to": "2026-03-02", "cashiers": "ann"}).status_code == 400
@@ -0,0 +1,88 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, PaymentFactory, SchoolFactory
+from payments.models import Profile
+from reports.models import Reconciliation
+
+URL = "/api/v1/reports/reconciliation/batch/"
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def admin_client(school):
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(username="recon_admin", profile__school=school, profile__role=Profile.Role.ADMIN))
+    return client
+
+
+@pytest.fixture
+def cashiers(school):
+    cashiers = [UserFactory(username=f"till{i}", first_name=f"Till{i}", last_name="Op", profile__school=school) for i in range(3)]
+    for i, cashier in enumerate(cashiers):
+        PaymentFactory(school=school, cashier=cashier, amount=10 * (i + 1), status="posted")
+        PaymentFactory(school=school, cashier=cashier, amount=5, status="posted")
+    PaymentFactory(school=school, cashier=cashiers[0], amount=7, status="pending")
+    return cashiers
+
+
+@pytest.mark.django_db
+def test_day_expectations_for_every_cashier(admin_client, cashiers):
+    res = admin_client.get(URL, {"date": str(date.today())})
+    assert res.status_code == 200
+    rows = res.json()["cashiers"]
+    assert [r["cashier_id"] for r in rows] == [c.id for c in cashiers]
+    assert [r["expected_total"] for r in rows] == [15.0, 25.0, 35.0]
+    assert rows[0]["pending_total"] == 7.0 and rows[0]["count"] == 3
+    assert rows[0]["cashier_name"] == "Till0 Op"
+
+
+@pytest.mark.django_db
+def test_batch_reconciles_all_cashiers_in_constant_queries(admin_client, cashiers):
+    counts = [
+        {"cashier_id": cashiers[0].id, "actual_amount": "15.00"},
+        {"cashier_id": cashiers[1].id, "actual_amount": "20.00", "notes": "Short by a note"},
+        {"cashier_id": cashiers[2].id, "actual_amount": "40.00"},
+    ]
+    with CaptureQueriesContext(connection) as ctx:
+        res = admin_client.post(URL, {"date": str(date.today()), "counts": counts}, format="json")
+    assert res.status_code == 201
+    assert res.json()["reconciled"] == 3
+    recs = {r.cashier_id: r for r in Reconciliation.objects.all()}
+    assert [recs[c.id].status for c in cashiers] == ["balanced", "short", "over"]
+    assert recs[cashiers[1].id].variance == Decimal("-5.00")
+    assert recs[cashiers[1].id].notes == "Short by a note"
+    inserts = [q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "reports_reconciliation"')]
+    assert len(inserts) == 1
+    assert len([q for q in ctx.captured_queries if "payments_dailycollection" in q["sql"]]) == 1
+
+
+@pytest.mark.django_db
+def test_batch_is_all_or_nothing(admin_client, cashiers):
+    outsider = UserFactory(username="other_till", profile__school=SchoolFactory())
+    counts = [
+        {"cashier_id": cashiers[0].id, "actual_amount": "15.00"},
+        {"cashier_id": outsider.id, "actual_amount": "1.00"},
+    ]
+    res = admin_client.post(URL, {"date": str(date.today()), "counts": counts}, format="json")
+    assert res.status_code == 400
+    assert res.json()["errors"] == {str(outsider.id): "Invalid cashier"}
+    assert not Reconciliation.objects.exists()
+
+    duplicate = [counts[0], counts[0]]
+    assert admin_client.post(URL, {"date": str(date.today()), "counts": duplicate}, format="json").status_code == 400
+
+
+@pytest.mark.django_db
+def test_batch_is_admin_only(school, cashiers):
+    client = APIClient()
+    client.force_authenticate(user=cashiers[0])
+    counts = [{"cashier_id": cashiers[0].id, "actual_amount": "15.00"}]
+    assert client.post(URL, {"date": str(date.today()), "counts": counts}, format="json").status_code == 403
@@ -0,0 +1,80 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, SchoolFactory
+from payments.models import Profile
+from reports.models import Reconciliation
+from reports.reconciliation import reconciliation_status
+
+URL = "/api/v1/reports/reconciliation/variance/"
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def client(school):
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(username="variance_auditor", profile__school=school, profile__role=Profile.Role.AUDITOR))
+    return client
+
+
+def _rec(school, cashier, day, expected, actual):
+    variance = Decimal(actual) - Decimal(expected)
+    return Reconciliation.objects.create(
+        school=school, cashier=cashier, date=day, expected_total=Decimal(expected),
+        actual_amount=Decimal(actual), variance=variance, status=reconciliation_status(variance),
+    )
+
+
+@pytest.fixture
+def cashiers(school):
+    ann = UserFactory(username="ann", first_name="Ann", last_name="Till", profile__school=school)
+    bob = UserFactory(username="bob", profile__school=school)
+    _rec(school, ann, date(2026, 3, 2), "100", "90")
+    _rec(school, ann, date(2026, 3, 3), "100", "100")
+    _rec(school, ann, date(2026, 3, 4), "100", "70")
+    _rec(school, ann, date(2026, 3, 5), "100", "105")
+    _rec(school, ann, date(2026, 3, 6), "100", "99")
+    _rec(school, bob, date(2026, 3, 2), "50", "55")
+    _rec(school, bob, date(2026, 4, 1), "50", "0")  # outside the range
+    _rec(SchoolFactory(), bob, date(2026, 3, 3), "50", "0")  # other school
+    return ann, bob
+
+
+@pytest.mark.django_db
+def test_per_cashier_outcomes_and_worst_days(client, cashiers):
+    ann, bob = cashiers
+    res = client.get(URL, {"from": "2026-03-01", "to": "2026-03-31"})
+    assert res.status_code == 200
+    data = res.json()
+    first, second = data["cashiers"]
+    assert first["cashier_id"] == ann.id and first["cashier_name"] == "Ann Till"
+    assert (first["reconciliations"], first["short"], first["over"], first["balanced"]) == (5, 3, 1, 1)
+    assert first["total_variance"] == -36.0 and first["total_short"] == -41.0 and first["total_over"] == 5.0
+    assert [d["date"] for d in first["worst_days"]] == ["2026-03-04", "2026-03-02", "2026-03-05"]
+    assert second["cashier_id"] == bob.id and second["total_variance"] == 5.0 and len(second["worst_days"]) == 1
+    assert data["totals"]["reconciliations"] == 6 and data["totals"]["total_variance"] == -31.0
+
+
+@pytest.mark.django_db
+def test_variance_is_one_query(client, cashiers):
+    ann, _ = cashiers
+    with CaptureQueriesContext(connection) as ctx:
+        res = client.get(URL, {"from": "2026-03-01", "to": "2026-03-31", "cashier": ann.id, "worst": 1})
+    data = res.json()
+    assert [c["cashier_id"] for c in data["cashiers"]] == [ann.id]
+    assert len(data["cashiers"][0]["worst_days"]) == 1
+    assert len([q for q in ctx.captured_queries if "reports_reconciliation" in q["sql"]]) == 1
+
+
+@pytest.mark.django_db
+def test_variance_rejects_bad_parameters(client):
+    assert client.get(URL, {"from": "2026-03-01"}).status_code == 400
+    assert client.get(URL, {"from": "2026-03-01", "to": "March"}).status_code == 400
+    assert client.get(URL, {"from": "2026-03-01", "to": "2026-03-31", "worst": "50"}).status_code == 400
@@ -0,0 +1,105 @@
+import pytest
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, StudentFactory, PaymentFactory, SchoolFactory
+from core.cache import LRUBackend, RedisBackend, ReportCache, get_report_cache
+from payments.models import Profile
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def admin(school):
+    return UserFactory(username="cache_admin", profile__role=Profile.Role.ADMIN, profile__school=school)
+
+
+@pytest.fixture
+def client(admin):
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+@pytest.mark.django_db
+def test_second_request_is_served_from_cache_until_a_write(client, school, admin):
+    PaymentFactory(school=school, cashier=admin, status="posted", amount=12)
+    url = f"/api/v1/reports/cashier-daily/?date={date.today()}&cashier_id={admin.id}"
+
+    first = client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        second = client.get(url)
+    assert second.content == first.content
+    assert not any("dailycollection" in q["sql"] for q in ctx.captured_queries)
+
+    # A write bumps the school version, so the next read misses and recomputes
+    PaymentFactory(school=school, cashier=admin, status="posted", amount=8)
+    assert client.get(url).json()["total"] == 20.0
+
+    stats = client.get("/api/v1/reports/cache-stats/").json()
+    assert stats["reports"]["cashier-daily"] == {"hits": 1, "misses": 2, "coalesced": 0}
+    assert stats["backend"] == "LRUBackend"
+
+
+@pytest.mark.django_db
+def test_report_summary_cache_is_per_student_and_page(client, school):
+    student = StudentFactory(school=school)
+    PaymentFactory.create_batch(3, school=school, student=student)
+    first_page = client.get(f"/api/v1/reports/{student.id}/?page_size=2").json()
+    assert client.get(f"/api/v1/reports/{student.id}/?page_size=2").json() == first_page
+    second_page = client.get(first_page["next"]).json()
+    assert len(second_page["payments"]) == 1
+
+    PaymentFactory(school=school, student=student)
+    assert client.get(f"/api/v1/reports/{student.id}/?page_size=2").json()["payment_count"] == 4
+    assert get_report_cache().stats()["reports"]["report-summary"]["hits"] == 1
+
+
+@pytest.mark.django_db
+def test_cache_stats_are_admin_only(school):
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(username="cache_cashier", profile__school=school))
+    assert client.get("/api/v1/reports/cache-stats/").status_code == 403
+
+
+def test_lru_backend_evicts_least_recently_used():
+    backend = LRUBackend(max_entries=2)
+    backend.set("a", "1")
+    backend.set("b", "2")
+    assert backend.get("a") == "1"
+    backend.set("c", "3")
+    assert backend.get("b") is None
+    assert backend.get("a") == "1" and backend.get("c") == "3"
+    assert len(backend) == 2
+
+
+class FakeRedis:
+    def __init__(self, fail=False):
+        self.store, self.fail = {}, fail
+
+    def get(self, key):
+        if self.fail:
+            raise ConnectionError("down")
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        if self.fail:
+            raise ConnectionError("down")
+        self.store[key] = value.encode()
+
+
+def test_redis_backend_round_trips_and_fails_open():
+    cache = ReportCache(RedisBackend("redis://unused", ttl=60, client=FakeRedis()), "report")
+    key = cache.make_key("term-summary", 1, "[]", [("school:1", 3)])
+    assert cache.get("term-summary", key) is None
+    cache.set(key, {"total": 1.5, "count": 2})
+    assert cache.get("term-summary", key) == {"total": 1.5, "count": 2}
+    assert cache.stats()["reports"]["term-summary"] == {"hits": 1, "misses": 1, "coalesced": 0}
+
+    broken = ReportCache(RedisBackend("redis://unused", ttl=60, client=FakeRedis(fail=True)), "report")
+    broken.set(key, {"total": 1})
+    assert broken.get("term-summary", key) is None
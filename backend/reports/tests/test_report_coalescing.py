@@ -0,0 +1,118 @@
+import threading
+from rest_framework.response import Response
+from core.cache import LRUBackend, RedisBackend, ReportCache
+from core.singleflight import LocalSingleFlight, LockSingleFlight
+
+
+class SlowReport:
+    """Stands in for a report handler; blocks until released and counts runs"""
+
+    def __init__(self, status=200):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.runs = 0
+        self.status = status
+
+    def __call__(self):
+        self.runs += 1
+        self.started.set()
+        self.release.wait(5)
+        return Response({"total": 42.0}, status=self.status)
+
+
+def _herd(cache, report, size=8):
+    results = []
+
+    def request():
+        results.append(cache.compute("term-summary", "report:term-summary:1:[]:school:1=3", report))
+
+    threads = [threading.Thread(target=request) for _ in range(size)]
+    threads[0].start()
+    report.started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    # Give the followers time to queue behind the leader
+    threading.Event().wait(0.1)
+    report.release.set()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def test_local_single_flight_runs_one_computation_for_the_herd():
+    cache = ReportCache(LRUBackend(16), "report", LocalSingleFlight(wait_timeout=5))
+    report = SlowReport()
+    results = _herd(cache, report)
+    assert report.runs == 1
+    assert [r.data for r in results] == [{"total": 42.0}] * 8
+    assert cache.stats()["coalesced"] == 7
+    assert cache.peek("report:term-summary:1:[]:school:1=3") == {"total": 42.0}
+
+
+def test_waiters_compute_themselves_when_the_leader_fails():
+    cache = ReportCache(LRUBackend(16), "report", LocalSingleFlight(wait_timeout=5))
+    report = SlowReport(status=500)
+    results = _herd(cache, report, size=3)
+    assert report.runs == 3
+    assert cache.stats()["coalesced"] == 0
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None, nx=False, px=None):
+        with self.lock:
+            if nx and key in self.store:
+                return None
+            self.store[key] = value.encode() if isinstance(value, str) else value
+            return True
+
+    def exists(self, key):
+        return int(key in self.store)
+
+    def eval(self, script, numkeys, key, token):
+        with self.lock:
+            if self.store.get(key) == token.encode():
+                del self.store[key]
+                return 1
+            return 0
+
+
+def test_lock_single_flight_shares_result_across_workers():
+    redis = FakeRedis()
+    flight = LockSingleFlight(redis, lock_ttl=5, wait_timeout=5, poll_interval=0.01)
+    # Two "workers" sharing one Redis, each with its own ReportCache
+    workers = [ReportCache(RedisBackend("redis://unused", ttl=60, client=redis), "report", flight) for _ in range(6)]
+    report = SlowReport()
+    results = []
+
+    def request(cache):
+        results.append(cache.compute("term-summary", "report:k", report))
+
+    threads = [threading.Thread(target=request, args=(cache,)) for cache in workers]
+    threads[0].start()
+    report.started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    report.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert report.runs == 1
+    assert [r.data for r in results] == [{"total": 42.0}] * 6
+    assert sum(cache.stats()["coalesced"] for cache in workers) == 5
+    assert "report:k:lock" not in redis.store
+
+
+def test_lock_waiter_computes_when_lock_is_released_without_a_result():
+    redis = FakeRedis()
+    flight = LockSingleFlight(redis, wait_timeout=5, poll_interval=0.01)
+    redis.set("report:k:lock", "someone-else", nx=True)
+    threading.Timer(0.05, lambda: redis.store.pop("report:k:lock")).start()
+    response, coalesced = flight.run("report:k", lambda: Response({"total": 1.0}), lambda: None)
+    assert not coalesced and response.data == {"total": 1.0}
@@ -0,0 +1,96 @@
+import pytest
+from datetime import date
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, StudentFactory, PaymentFactory, SchoolFactory
+from core.models import DataVersion
+from core.versioning import school_key, student_key
+from reports.models import Reconciliation
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def user(school):
+    return UserFactory(username="etag_user", profile__school=school)
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def _version(key):
+    return DataVersion.objects.filter(key=key).values_list("version", flat=True).first() or 0
+
+
+@pytest.mark.django_db
+def test_unchanged_report_answers_304_without_aggregating(client, school):
+    PaymentFactory(school=school, status="posted", term="1", academic_year=2026)
+    url = "/api/v1/reports/term-summary/?term=1&year=2026"
+    first = client.get(url)
+    assert first.status_code == 200 and first.json()["count"] == 1
+    etag = first["ETag"]
+    assert etag.startswith('"') and first["Cache-Control"] == "private, no-cache"
+
+    with CaptureQueriesContext(connection) as ctx:
+        res = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 304 and res["ETag"] == etag
+    assert not any("dailycollection" in q["sql"] for q in ctx.captured_queries)
+    assert len(ctx.captured_queries) <= 2
+
+    # Weak validators and other parameters
+    assert client.get(url, HTTP_IF_NONE_MATCH=f"W/{etag}").status_code == 304
+    assert client.get("/api/v1/reports/term-summary/?term=2&year=2026", HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_writes_in_the_school_change_the_etag(client, school, user):
+    url = f"/api/v1/reports/cashier-daily/?date={date.today()}&cashier_id={user.id}"
+    etag = client.get(url)["ETag"]
+
+    PaymentFactory(school=SchoolFactory(), cashier=user, status="posted")
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    PaymentFactory(school=school, cashier=user, status="posted")
+    res = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200 and res["ETag"] != etag and res.json()["count"] == 1
+
+    etag = res["ETag"]
+    Reconciliation.objects.create(school=school, cashier=user, date=date.today(), expected_total=0,
+                                  actual_amount=0, variance=0, status="balanced")
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_student_balance_tracks_the_students_own_version(client, school):
+    student, other = StudentFactory(school=school), StudentFactory(school=school)
+    url = f"/api/v1/reports/student-balance/?student_id={student.id}"
+    etag = client.get(url)["ETag"]
+
+    PaymentFactory(school=school, student=other)
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    client.post("/api/v1/payments/bulk/", [{"student": student.id, "amount": "5.00", "payment_method": "Cash"}], format="json")
+    res = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200 and res.json()["total_paid"] == 5.0
+
+
+@pytest.mark.django_db
+def test_version_bumps_roll_back_with_the_write(school):
+    student = StudentFactory(school=school)
+    before = _version(school_key(school.id)), _version(student_key(student.id))
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            PaymentFactory(school=school, student=student)
+            raise RuntimeError
+    assert (_version(school_key(school.id)), _version(student_key(student.id))) == before
+    PaymentFactory(school=school, student=student)
+    assert _version(school_key(school.id)) == before[0] + 1
+    assert _version(student_key(student.id)) == before[1] + 1
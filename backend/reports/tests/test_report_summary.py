@@ -0,0 +1,61 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from students.campuses import get_campus_cache
+from tests.factories import UserFactory, StudentFactory, PaymentFactory, SchoolFactory
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def client(school):
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(username="summary_user", profile__school=school))
+    return client
+
+
+@pytest.mark.django_db
+def test_summary_totals_in_database_and_pages_history(client, school):
+    student = StudentFactory(school=school)
+    payments = [PaymentFactory(school=school, student=student, amount=Decimal("10.00")) for _ in range(5)]
+    PaymentFactory(school=school, student=student, amount=Decimal("99.00"), status="voided")
+
+    res = client.get(f"/api/v1/reports/{student.id}/?page_size=2")
+    assert res.status_code == 200
+    data = res.json()
+    assert data["student"]["campus"] == student.campus.name
+    assert data["total_paid"] == 50.0 and data["payment_count"] == 5
+    seen = [p["id"] for p in data["payments"]]
+    assert len(seen) == 2 and data["previous"] is None
+
+    while data["next"]:
+        data = client.get(data["next"]).json()
+        seen += [p["id"] for p in data["payments"]]
+    assert seen == [p.id for p in reversed(payments)]
+
+
+@pytest.mark.django_db
+def test_summary_query_count_does_not_grow_with_history(client, school):
+    student = StudentFactory(school=school)
+    PaymentFactory.create_batch(2, school=school, student=student)
+    get_campus_cache().warm([student.campus_id])
+    with CaptureQueriesContext(connection) as few:
+        client.get(f"/api/v1/reports/{student.id}/")
+    PaymentFactory.create_batch(60, school=school, student=student)
+    with CaptureQueriesContext(connection) as many:
+        data = client.get(f"/api/v1/reports/{student.id}/").json()
+    # Version lookup, student with totals, one page of history; the campus is cached
+    assert len(many.captured_queries) == len(few.captured_queries) == 3
+    assert data["payment_count"] == 62 and len(data["payments"]) == 50
+
+
+@pytest.mark.django_db
+def test_summary_is_limited_to_callers_school(client):
+    other = StudentFactory(school=SchoolFactory())
+    assert client.get(f"/api/v1/reports/{other.id}/").status_code == 404
+    assert APIClient().get(f"/api/v1/reports/{other.id}/").status_code == 404
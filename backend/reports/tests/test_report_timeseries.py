@@ -0,0 +1,88 @@
+import pytest
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, StudentFactory, PaymentFactory, SchoolFactory, CampusFactory
+
+URL = "/api/v1/reports/timeseries/"
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def client(school):
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(username="series_user", profile__school=school))
+    return client
+
+
+def _pay(day, **kwargs):
+    # Payment.date is auto_now_add, so move the payment to its day with a second save
+    payment = PaymentFactory(**kwargs)
+    payment.date = day
+    payment.save()
+    return payment
+
+
+@pytest.fixture
+def campus(school):
+    north = CampusFactory(name="North")
+    # 2026-03-02 is a Monday
+    a = StudentFactory(school=school, campus=north)
+    b = StudentFactory(school=school)
+    _pay(date(2026, 3, 2), school=school, student=a, amount=100, status="posted")
+    _pay(date(2026, 3, 2), school=school, student=b, amount=40, status="pending", fee_type="Transport")
+    _pay(date(2026, 3, 4), school=school, student=b, amount=10, status="posted")
+    _pay(date(2026, 4, 1), school=school, student=a, amount=25, status="posted")
+    _pay(date(2026, 3, 3), school=school, student=a, amount=999, status="voided")
+    _pay(date(2026, 3, 3), school=SchoolFactory(), amount=999, status="posted")
+    return north
+
+
+@pytest.mark.django_db
+def test_daily_series_fills_empty_days(client, campus):
+    res = client.get(URL, {"from": "2026-03-01", "to": "2026-03-05"})
+    assert res.status_code == 200
+    data = res.json()
+    assert [p["period"] for p in data["series"]] == ["2026-03-01", "2026-03-02", "2026-03-03", "2026-03-04", "2026-03-05"]
+    assert [p["total"] for p in data["series"]] == [0.0, 140.0, 0.0, 10.0, 0.0]
+    assert [p["count"] for p in data["series"]] == [0, 2, 0, 1, 0]
+    assert data["total"] == 150.0 and data["count"] == 3
+
+
+@pytest.mark.django_db
+def test_weekly_and_monthly_buckets(client, campus):
+    # Buckets are labelled by their start but only count days inside the range
+    weeks = client.get(URL, {"granularity": "week", "from": "2026-03-04", "to": "2026-03-20"}).json()["series"]
+    assert [(p["period"], p["total"]) for p in weeks] == [("2026-03-02", 10.0), ("2026-03-09", 0.0), ("2026-03-16", 0.0)]
+    months = client.get(URL, {"granularity": "month", "from": "2026-02-15", "to": "2026-04-30", "status": "posted"}).json()["series"]
+    assert [(p["period"], p["total"]) for p in months] == [("2026-02-01", 0.0), ("2026-03-01", 110.0), ("2026-04-01", 25.0)]
+
+
+@pytest.mark.django_db
+def test_filters_including_campus(client, campus):
+    series = client.get(URL, {"from": "2026-03-01", "to": "2026-04-30", "granularity": "month", "campus": campus.id}).json()["series"]
+    assert [p["total"] for p in series] == [100.0, 25.0]
+    data = client.get(URL, {"from": "2026-03-01", "to": "2026-03-31", "fee_type": "Transport"}).json()
+    assert data["total"] == 40.0 and data["count"] == 1
+
+
+@pytest.mark.django_db
+def test_full_year_of_days_is_one_query(client, campus):
+    with CaptureQueriesContext(connection) as ctx:
+        res = client.get(URL, {"from": "2026-01-01", "to": "2026-12-31"})
+    assert res.status_code == 200 and len(res.json()["series"]) == 365
+    assert len([q for q in ctx.captured_queries if "payments_" in q["sql"]]) == 1
+
+
+@pytest.mark.django_db
+def test_rejects_bad_parameters(client):
+    assert client.get(URL, {"from": "2026-01-01"}).status_code == 400
+    assert client.get(URL, {"from": "2026-02-01", "to": "2026-01-01"}).status_code == 400
+    assert client.get(URL, {"from": "2026-01-01", "to": "2026-01-31", "granularity": "hour"}).status_code == 400
+    assert client.get(URL, {"from": "2020-01-01", "to": "2026-01-31"}).status_code == 400
+    assert client.get(URL, {"from": "2026-01-01", "to": "2026-01-31", "status": "lost"}).status_code == 400
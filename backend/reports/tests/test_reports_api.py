@@ -12,8 +12,8 @@ def test_cashier_daily_report():
     student = Student.objects.create(student_number="S1", first_name="A", last_name="B", dob=date(2008,1,1), current_grade="G9", campus=campus)
     cashier = User.objects.create_user(username="cashierx", password="pass")
     cashier_name = cashier.get_full_name() or cashier.username
-    Payment.objects.create(student=student, amount=50, payment_method="Cash", receipt_number="RX1", status="posted", cashier_name=cashier_name, term="1", academic_year=date.today().year)
-    Payment.objects.create(student=student, amount=25, payment_method="Card", receipt_number="RX2", status="posted", cashier_name=cashier_name, term="1", academic_year=date.today().year)
+    Payment.objects.create(student=student, amount=50, payment_method="Cash", receipt_number="RX1", status="posted", cashier_name=cashier_name, cashier=cashier, term="1", academic_year=date.today().year)
+    Payment.objects.create(student=student, amount=25, payment_method="Card", receipt_number="RX2", status="posted", cashier_name=cashier_name, cashier=cashier, term="1", academic_year=date.today().year)
     res = client.get(f"/api/v1/reports/cashier-daily/?date={date.today()}&cashier_id={cashier.id}")
     assert res.status_code == 200
     data = res.json()
@@ -35,8 +35,8 @@ def test_reconciliation_expected_total_auto():
     client.force_authenticate(user=cashier)
     cashier_name = cashier.get_full_name() or cashier.username
     today = date.today()
-    Payment.objects.create(student=student, amount=10, payment_method="Cash", receipt_number="RX3", status="posted", cashier_name=cashier_name, term="1", academic_year=today.year)
-    Payment.objects.create(student=student, amount=5, payment_method="Cash", receipt_number="RX4", status="posted", cashier_name=cashier_name, term="1", academic_year=today.year)
+    Payment.objects.create(student=student, amount=10, payment_method="Cash", receipt_number="RX3", status="posted", cashier_name=cashier_name, cashier=cashier, term="1", academic_year=today.year)
+    Payment.objects.create(student=student, amount=5, payment_method="Cash", receipt_number="RX4", status="posted", cashier_name=cashier_name, cashier=cashier, term="1", academic_year=today.year)
     res = client.post("/api/v1/reports/reconciliation/", {"date": str(today), "actual_amount": "14.00"}, format="json")
     assert res.status_code == 201
     data = res.json()
@@ -53,7 +53,7 @@ def test_reconciliation_uses_request_user_when_missing_cashier_id():
     client.force_authenticate(user=user)
     cashier_name = user.get_full_name() or user.username
     today = date.today()
-    Payment.objects.create(student=student, amount=20, payment_method="Cash", receipt_number="RX5", status="posted", cashier_name=cashier_name, term="1", academic_year=today.year)
+    Payment.objects.create(student=student, amount=20, payment_method="Cash", receipt_number="RX5", status="posted", cashier_name=cashier_name, cashier=user, term="1", academic_year=today.year)
     res = client.post("/api/v1/reports/reconciliation/", {"date": str(today), "actual_amount": 19.00}, format="json")
     assert res.status_code == 201
     data = res.json()
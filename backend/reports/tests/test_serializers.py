@@ -29,8 +29,8 @@ def test_reconciliation_expected_total_multi_cashier():
     name_b = user_b.get_full_name() or user_b.username
     student = StudentFactory()
     today = date.today()
-    Payment.objects.create(student=student, amount=10, payment_method="Cash", receipt_number="B1", status="posted", cashier_name=name_a, term="1", academic_year=today.year)
-    Payment.objects.create(student=student, amount=7, payment_method="Cash", receipt_number="B2", status="posted", cashier_name=name_b, term="1", academic_year=today.year)
+    Payment.objects.create(student=student, amount=10, payment_method="Cash", receipt_number="B1", status="posted", cashier_name=name_a, cashier=user_a, term="1", academic_year=today.year)
+    Payment.objects.create(student=student, amount=7, payment_method="Cash", receipt_number="B2", status="posted", cashier_name=name_b, cashier=user_b, term="1", academic_year=today.year)
     factory = APIRequestFactory()
     req = factory.post("/api/v1/reports/reconciliation/")
     req.user = user_a
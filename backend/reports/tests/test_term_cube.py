@@ -0,0 +1,80 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, StudentFactory, PaymentFactory, SchoolFactory, CampusFactory
+
+URL = "/api/v1/reports/term-cube/"
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def client(school):
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(username="cube_user", profile__school=school))
+    return client
+
+
+@pytest.fixture
+def payments(school):
+    north, south = CampusFactory(name="North"), CampusFactory(name="South")
+    jane = UserFactory(username="jane", first_name="Jane", last_name="Moyo", profile__school=school)
+    a = StudentFactory(school=school, campus=north, current_grade="Grade 1")
+    b = StudentFactory(school=school, campus=south, current_grade="Grade 2")
+    common = dict(school=school, term="1", academic_year=2026, status="posted")
+    PaymentFactory(student=a, amount=100, payment_method="Cash", fee_type="Tuition", cashier=jane, **common)
+    PaymentFactory(student=a, amount=50, payment_method="EcoCash", fee_type="Transport", cashier=jane, **common)
+    PaymentFactory(student=b, amount=25, payment_method="Cash", fee_type="Tuition", **common)
+    # Excluded: pending, other term, other school
+    PaymentFactory(student=b, amount=999, school=school, term="1", academic_year=2026, status="pending")
+    PaymentFactory(student=b, amount=999, school=school, term="2", academic_year=2026, status="posted")
+    PaymentFactory(amount=999, school=SchoolFactory(), term="1", academic_year=2026, status="posted")
+
+
+@pytest.mark.django_db
+def test_cube_returns_every_breakdown_in_columns(client, payments):
+    res = client.get(URL, {"term": "1", "year": "2026"})
+    assert res.status_code == 200
+    data = res.json()
+    assert data["total"] == {"total": 175.0, "count": 3}
+    assert data["dimensions"] == ["payment_method", "fee_type", "campus", "grade", "cashier"]
+    breakdowns = data["breakdowns"]
+    assert breakdowns["payment_method"] == {"payment_method": ["Cash", "EcoCash"], "total": [125.0, 50.0], "count": [2, 1]}
+    assert breakdowns["campus"] == {"campus": ["North", "South"], "total": [150.0, 25.0], "count": [2, 1]}
+    assert breakdowns["grade"]["grade"] == ["Grade 1", "Grade 2"]
+    cashier = breakdowns["cashier"]
+    assert cashier["cashier_name"] == ["Jane Moyo", None]
+    assert cashier["total"] == [150.0, 25.0]
+
+
+@pytest.mark.django_db
+def test_cube_combined_breakdown_and_status_filter(client, payments):
+    res = client.get(URL, {"term": "1", "year": "2026", "dimensions": "fee_type*campus,campus*fee_type", "status": "pending,posted"})
+    data = res.json()
+    assert data["dimensions"] == ["fee_type*campus"]
+    combined = data["breakdowns"]["fee_type*campus"]
+    rows = set(zip(combined["fee_type"], combined["campus"], combined["total"], combined["count"]))
+    assert rows == {("Transport", "North", 50.0, 1), ("Tuition", "North", 100.0, 1), ("Tuition", "South", 1024.0, 2)}
+    assert data["total"]["count"] == 4
+
+
+@pytest.mark.django_db
+def test_cube_is_one_query(client, payments):
+    with CaptureQueriesContext(connection) as ctx:
+        res = client.get(URL, {"term": "1", "year": "2026"})
+    assert res.status_code == 200
+    cube_queries = [q for q in ctx.captured_queries if "payments_payment" in q["sql"]]
+    assert len(cube_queries) == 1
+
+
+@pytest.mark.django_db
+def test_cube_rejects_bad_parameters(client):
+    assert client.get(URL, {"term": "1"}).status_code == 400
+    assert client.get(URL, {"term": "4", "year": "2026"}).status_code == 400
+    res = client.get(URL, {"term": "1", "year": "2026", "dimensions": "fee_type*colour"})
+    assert res.status_code == 400 and "colour" in res.json()["dimensions"]
+    assert client.get(URL, {"term": "1", "year": "2026", "status": "voided"}).status_code == 400
@@ -1,10 +1,17 @@
 from django.urls import path
-from .views import ReportSummaryView, CashierDailyView, TermSummaryView, StudentBalanceView, ReconciliationView
+from .views import ReportSummaryView, CashierDailyView, CashierRangeView, TermSummaryView, StudentBalanceView, ReconciliationView, ReconciliationBatchView, ReconciliationVarianceView, ReportCacheStatsView, CollectionDriftView, TermCubeView, TimeSeriesView
 
 urlpatterns = [
     path('<int:id>/', ReportSummaryView.as_view(), name='report-summary'),
     path('cashier-daily/', CashierDailyView.as_view(), name='cashier-daily'),
+    path('cashier-range/', CashierRangeView.as_view(), name='cashier-range'),
     path('term-summary/', TermSummaryView.as_view(), name='term-summary'),
+    path('term-cube/', TermCubeView.as_view(), name='term-cube'),
+    path('timeseries/', TimeSeriesView.as_view(), name='timeseries'),
     path('student-balance/', StudentBalanceView.as_view(), name='student-balance'),
     path('reconciliation/', ReconciliationView.as_view(), name='reconciliation'),
+    path('reconciliation/batch/', ReconciliationBatchView.as_view(), name='reconciliation-batch'),
+    path('reconciliation/variance/', ReconciliationVarianceView.as_view(), name='reconciliation-variance'),
+    path('cache-stats/', ReportCacheStatsView.as_view(), name='report-cache-stats'),
+    path('collection-drift/', CollectionDriftView.as_view(), name='collection-drift'),
 ]
@@ -2,24 +2,102 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, viewsets
+from rest_framework.settings import api_settings
 from students.models import Student
-from payments.models import Payment
+from students.campuses import get_campus_cache
+from payments.models import Payment, DailyCollection, ROLLUP_KEY_FIELDS
+from payments.rollups import collection_drift, rebuild_collections
 from django.contrib.auth.models import User
-from django.db.models import Sum, Count
+from datetime import date
+from decimal import Decimal
+from django.db.models import Count, DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from .models import Reconciliation, Statement
-from .serializers_recon import ReconciliationSerializer
+from .serializers_recon import ReconciliationSerializer, ReconciliationBatchSerializer
+from .reconciliation import MAX_WORST_DAYS, WORST_DAYS, day_expectations, reconcile_cashiers, variance_by_cashier
 from .serializers import StatementSerializer
+from .cube import COMBINE, DIMENSIONS, parse_breakdowns, term_cube
+from .cashiers import MAX_RANGE_DAYS, CashierMatrixCSVRenderer, cashier_matrix
+from .timeseries import GRANULARITIES, MAX_BUCKETS, bucket_starts, collection_series
 from core.permissions import PaymentWritePermission
+from core.pagination import KeysetPagination
+from core.versioning import conditional_on_versions, school_key, student_key
+
+
+def _school_versions(request, *args, **kwargs):
+    """Version key of the caller's school; None when the report is not school-scoped"""
+    if request.user.is_authenticated and hasattr(request.user, 'profile') and request.user.profile.school:
+        return [school_key(request.user.profile.school_id)]
+    return None
+
+
+def _student_versions(request, *args, **kwargs):
+    student_id = request.GET.get('student_id')
+    if not student_id or not student_id.isdigit():
+        return None
+    return [student_key(int(student_id))]
+
+
+def _summary_versions(request, id=None):
+    if not (request.user.is_authenticated and hasattr(request.user, 'profile')):
+        return None
+    # The summary embeds the campus name; campus writes bump only the school
+    return [school_key(request.user.profile.school_id), student_key(id)]
+
+
+class SummaryPaymentPagination(KeysetPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None, page_size=None):
+        size = request.query_params.get(self.page_size_query_param)
+        if size and size.isdigit() and int(size) > 0:
+            page_size = min(int(size), self.max_page_size)
+        return super().paginate_queryset(queryset, request, view, page_size=page_size)
+
 
 class ReportSummaryView(APIView):
+    """
+    Student summary with total paid and a cursor-paginated payment history
+    (newest first). The student, total and count come from one query and the
+    campus from the campus reference cache; each history page is one
+    index-ordered query.
+    """
+    pagination_class = SummaryPaymentPagination
+
+    @conditional_on_versions(_summary_versions, cache_as='report-summary')
     def get(self, request, id=None):
-        try:
-            student = Student.objects.get(id=id)
-        except Student.DoesNotExist:
+        if not (request.user.is_authenticated and hasattr(request.user, 'profile')):
             return Response({"error": "Student not found"}, status=status.HTTP_404_NOT_FOUND)
+        school = request.user.profile.school
 
-        payments = Payment.objects.filter(student=student).exclude(status='voided')
-        total_paid = sum(p.amount for p in payments)
+        live_payments = Payment.objects.filter(student=OuterRef('pk')).exclude(status='voided')
+        student = (
+            Student.objects.filter(id=id, school=school)
+            .annotate(
+                total_paid=Coalesce(
+                    Subquery(live_payments.values('student').annotate(t=Sum('amount')).values('t')),
+                    Value(Decimal('0')),
+                    output_field=DecimalField(max_digits=14, decimal_places=2),
+                ),
+                payment_count=Coalesce(
+                    Subquery(live_payments.values('student').annotate(n=Count('id')).values('n')),
+                    Value(0),
+                ),
+            )
+            .first()
+        )
+        if student is None:
+            return Response({"error": "Student not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        history = (
+            Payment.objects.filter(student=student).exclude(status='voided')
+            .order_by('-date', '-id')
+            .values('id', 'amount', 'payment_method', 'receipt_number', 'status', 'date', 'cashier_name')
+        )
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(history, request, self)
 
         data = {
             "student": {
@@ -27,27 +105,31 @@ class ReportSummaryView(APIView):
                 "student_number": student.student_number,
                 "first_name": student.first_name,
                 "last_name": student.last_name,
-                "campus": student.campus.name,
+                "campus": (get_campus_cache().get(student.campus_id) or {}).get('name'),
                 "current_grade": student.current_grade,
             },
             "payments": [
                 {
-                    "id": p.id,
-                    "amount": float(p.amount),
-                    "payment_method": p.payment_method,
-                    "receipt_number": p.receipt_number,
-                    "status": p.status,
-                    "date": p.date,
-                    "cashier_name": p.cashier_name,
+                    "id": p['id'],
+                    "amount": float(p['amount']),
+                    "payment_method": p['payment_method'],
+                    "receipt_number": p['receipt_number'],
+                    "status": p['status'],
+                    "date": p['date'],
+                    "cashier_name": p['cashier_name'],
                 }
-                for p in payments
+                for p in page
             ],
-            "total_paid": float(total_paid),
+            "payment_count": student.payment_count,
+            "total_paid": float(student.total_paid),
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
         }
 
         return Response(data)
 
 class CashierDailyView(APIView):
+    @conditional_on_versions(_school_versions, cache_as='cashier-daily')
     def get(self, request):
         date_str = request.GET.get('date')
         cashier_id = request.GET.get('cashier_id')
@@ -59,25 +141,161 @@ class CashierDailyView(APIView):
         except User.DoesNotExist:
             return Response({'error': 'Cashier not found'}, status=status.HTTP_404_NOT_FOUND)
 
-        qs = Payment.objects.filter(date=date_str, cashier_name=cashier_name).exclude(status='voided')
-        total = qs.aggregate(total=Sum('amount'))['total'] or 0
-        count = qs.aggregate(count=Count('id'))['count'] or 0
-        methods = list(qs.values('payment_method').annotate(total=Sum('amount'), count=Count('id')))
+        # Read the day's rollup buckets (payments.rollups) instead of the payment rows
+        qs = DailyCollection.objects.filter(date=date_str, cashier=user, payment_count__gt=0).exclude(status='voided')
+        if request.user.is_authenticated and hasattr(request.user, 'profile') and request.user.profile.school:
+            qs = qs.filter(school=request.user.profile.school)
+        methods = list(
+            qs.values('payment_method')
+            .annotate(total=Sum('total_amount'), count=Sum('payment_count'))
+            .order_by('payment_method')
+        )
+        total = sum(m['total'] for m in methods)
+        count = sum(m['count'] for m in methods)
         return Response({'date': date_str, 'cashier_id': int(cashier_id), 'cashier_name': cashier_name, 'total': float(total), 'count': count, 'by_method': methods})
 
+class CashierRangeView(APIView):
+    """
+    Cashier x day x payment method collections between `from` and `to`
+    (inclusive) for all cashiers, or a comma list in `cashiers`.
+    `?format=csv` returns the same cells as CSV.
+    """
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, CashierMatrixCSVRenderer]
+
+    @conditional_on_versions(_school_versions, cache_as='cashier-range')
+    def get(self, request):
+        if not request.GET.get('from') or not request.GET.get('to'):
+            return Response({'error': 'from and to are required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            date_from = date.fromisoformat(request.GET['from'])
+            date_to = date.fromisoformat(request.GET['to'])
+        except ValueError:
+            return Response({'error': 'from and to must be dates (YYYY-MM-DD)'}, status=status.HTTP_400_BAD_REQUEST)
+        if date_from > date_to:
+            return Response({'error': 'from must not be after to'}, status=status.HTTP_400_BAD_REQUEST)
+        if (date_to - date_from).days >= MAX_RANGE_DAYS:
+            return Response({'error': f'At most {MAX_RANGE_DAYS} days per request'}, status=status.HTTP_400_BAD_REQUEST)
+        cashier_ids = [v for v in request.GET.get('cashiers', '').split(',') if v]
+        if not all(v.isdigit() for v in cashier_ids):
+            return Response({'error': 'cashiers must be a comma list of user ids'}, status=status.HTTP_400_BAD_REQUEST)
+
+        school = None
+        if request.user.is_authenticated and hasattr(request.user, 'profile') and request.user.profile.school:
+            school = request.user.profile.school
+        matrix = cashier_matrix(school, date_from, date_to, [int(v) for v in cashier_ids])
+        return Response({'from': date_from, 'to': date_to, **matrix})
+
 class TermSummaryView(APIView):
+    @conditional_on_versions(_school_versions, cache_as='term-summary')
     def get(self, request):
         term = request.GET.get('term')
         year = request.GET.get('year')
         if not term or not year:
             return Response({'error': 'term and year are required'}, status=status.HTTP_400_BAD_REQUEST)
-        qs = Payment.objects.filter(term=str(term), academic_year=int(year), status='posted')
-        total = qs.aggregate(total=Sum('amount'))['total'] or 0
-        count = qs.aggregate(count=Count('id'))['count'] or 0
-        methods = list(qs.values('payment_method').annotate(total=Sum('amount'), count=Count('id')))
+        qs = DailyCollection.objects.filter(term=str(term), academic_year=int(year), status='posted', payment_count__gt=0)
+        if request.user.is_authenticated and hasattr(request.user, 'profile') and request.user.profile.school:
+            qs = qs.filter(school=request.user.profile.school)
+        methods = list(
+            qs.values('payment_method')
+            .annotate(total=Sum('total_amount'), count=Sum('payment_count'))
+            .order_by('payment_method')
+        )
+        total = sum(m['total'] for m in methods)
+        count = sum(m['count'] for m in methods)
         return Response({'term': str(term), 'year': int(year), 'total': float(total), 'count': count, 'by_method': methods})
 
+class TermCubeView(APIView):
+    """
+    Term totals broken down by any of payment_method, fee_type, campus, grade
+    and cashier (`a*b` for a combined breakdown) from one grouped query.
+    """
+    STATUSES = {'pending', 'posted'}
+
+    @conditional_on_versions(_school_versions, cache_as='term-cube')
+    def get(self, request):
+        term = request.GET.get('term')
+        year = request.GET.get('year')
+        if not term or not year:
+            return Response({'error': 'term and year are required'}, status=status.HTTP_400_BAD_REQUEST)
+        if term not in {'1', '2', '3'} or not year.isdigit():
+            return Response({'error': 'term must be 1, 2 or 3 and year a number'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            breakdowns = parse_breakdowns(request.GET.get('dimensions'))
+        except ValueError as exc:
+            return Response(
+                {'dimensions': f"Unknown dimension '{exc}'. Choose from: {', '.join(DIMENSIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        statuses = [v for v in request.GET.get('status', 'posted').split(',') if v]
+        if not statuses or any(v not in self.STATUSES for v in statuses):
+            return Response({'status': 'status must be pending, posted or both'}, status=status.HTTP_400_BAD_REQUEST)
+
+        school = None
+        if request.user.is_authenticated and hasattr(request.user, 'profile') and request.user.profile.school:
+            school = request.user.profile.school
+        cube = term_cube(school, term, int(year), breakdowns, statuses)
+        return Response({
+            'term': term,
+            'year': int(year),
+            'status': statuses,
+            'dimensions': [COMBINE.join(dims) for dims in breakdowns],
+            **cube,
+        })
+
+class TimeSeriesView(APIView):
+    """
+    Collections per day, week or month between `from` and `to` (inclusive),
+    with empty buckets filled in. Filters: campus (id), fee_type,
+    payment_method, status (comma list, default pending,posted).
+    """
+    STATUSES = {'pending', 'posted', 'voided'}
+
+    @conditional_on_versions(_school_versions, cache_as='timeseries')
+    def get(self, request):
+        granularity = request.GET.get('granularity', 'day')
+        if granularity not in GRANULARITIES:
+            return Response({'error': 'granularity must be day, week or month'}, status=status.HTTP_400_BAD_REQUEST)
+        if not request.GET.get('from') or not request.GET.get('to'):
+            return Response({'error': 'from and to are required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            date_from = date.fromisoformat(request.GET['from'])
+            date_to = date.fromisoformat(request.GET['to'])
+        except ValueError:
+            return Response({'error': 'from and to must be dates (YYYY-MM-DD)'}, status=status.HTTP_400_BAD_REQUEST)
+        if date_from > date_to:
+            return Response({'error': 'from must not be after to'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(bucket_starts(date_from, date_to, granularity)) > MAX_BUCKETS:
+            return Response(
+                {'error': f'At most {MAX_BUCKETS} {granularity} buckets per request; narrow the range or use a coarser granularity'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        statuses = [v for v in request.GET.get('status', 'pending,posted').split(',') if v]
+        if not statuses or any(v not in self.STATUSES for v in statuses):
+            return Response({'error': 'status must be a comma list of pending, posted, voided'}, status=status.HTTP_400_BAD_REQUEST)
+        campus = request.GET.get('campus')
+        if campus and not campus.isdigit():
+            return Response({'error': 'campus must be a campus id'}, status=status.HTTP_400_BAD_REQUEST)
+
+        school = None
+        if request.user.is_authenticated and hasattr(request.user, 'profile') and request.user.profile.school:
+            school = request.user.profile.school
+        series = collection_series(
+            school, date_from, date_to, granularity, statuses,
+            campus=int(campus) if campus else None,
+            fee_type=request.GET.get('fee_type'),
+            payment_method=request.GET.get('payment_method'),
+        )
+        return Response({
+            'granularity': granularity,
+            'from': date_from,
+            'to': date_to,
+            'total': round(sum(point['total'] for point in series), 2),
+            'count': sum(point['count'] for point in series),
+            'series': series,
+        })
+
 class StudentBalanceView(APIView):
+    @conditional_on_versions(_student_versions, cache_as='student-balance')
     def get(self, request):
         student_id = request.GET.get('student_id')
         if not student_id:
@@ -93,6 +311,57 @@ class StudentBalanceView(APIView):
         balance = float(total_fees) - float(total_paid)
         return Response({'student_id': student.id, 'student_number': student.student_number, 'total_paid': float(total_paid), 'total_fees': float(total_fees), 'balance': float(balance)})
 
+class ReportCacheStatsView(APIView):
+    """Report cache hit/miss counters for this process (admins only)"""
+    def get(self, request):
+        from core.permissions import get_role
+        from core.cache import get_report_cache
+        if get_role(request.user) != 'Admin':
+            return Response({'detail': 'Only admins can view cache statistics'}, status=status.HTTP_403_FORBIDDEN)
+        return Response(get_report_cache().stats())
+
+class CollectionDriftView(APIView):
+    """
+    Daily collection buckets that no longer match the payments table, for the
+    caller's school and optional `date_from`/`date_to` (admins only). GET
+    reports them; POST rewrites them from the payments, like
+    `manage.py rebuild_daily_collections`.
+    """
+    def _scope(self, request):
+        scope = {'school_id': None, 'date_from': None, 'date_to': None}
+        if hasattr(request.user, 'profile') and request.user.profile.school_id:
+            scope['school_id'] = request.user.profile.school_id
+        for name in ('date_from', 'date_to'):
+            if request.GET.get(name):
+                scope[name] = date.fromisoformat(request.GET[name])
+        return scope
+
+    def _respond(self, request, find):
+        from core.permissions import get_role
+        if get_role(request.user) != 'Admin':
+            return Response({'detail': 'Only admins can check the daily collections'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            scope = self._scope(request)
+        except ValueError:
+            return Response({'error': 'date_from and date_to must be dates (YYYY-MM-DD)'}, status=status.HTTP_400_BAD_REQUEST)
+        drift = find(**scope)
+        buckets = []
+        for key, ((want_count, want_total), (have_count, have_total)) in sorted(drift.items(), key=str):
+            buckets.append({
+                **dict(zip(ROLLUP_KEY_FIELDS, key)),
+                'expected_count': want_count,
+                'expected_total': float(want_total),
+                'stored_count': have_count,
+                'stored_total': float(have_total),
+            })
+        return Response({'drifted': len(buckets), 'buckets': buckets})
+
+    def get(self, request):
+        return self._respond(request, collection_drift)
+
+    def post(self, request):
+        return self._respond(request, rebuild_collections)
+
 class ReconciliationView(APIView):
     permission_classes = [PaymentWritePermission]
     def get(self, request):
@@ -120,6 +389,91 @@ class ReconciliationView(APIView):
             rec = serializer.save()
         return Response(ReconciliationSerializer(rec).data, status=status.HTTP_201_CREATED)
 
+class ReconciliationBatchView(APIView):
+    """
+    Day-end close for every cashier at once.
+    GET ?date= lists each cashier with payments that day and their expected
+    total; POST {"date", "counts": [{"cashier_id", "actual_amount", "notes"}]}
+    records all their reconciliations (admins only, all or nothing).
+    """
+    permission_classes = [PaymentWritePermission]
+
+    def _school(self, request):
+        if request.user.is_authenticated and hasattr(request.user, 'profile') and request.user.profile.school:
+            return request.user.profile.school
+        return None
+
+    @conditional_on_versions(_school_versions, cache_as='reconciliation-batch')
+    def get(self, request):
+        try:
+            day = date.fromisoformat(request.GET.get('date') or '')
+        except ValueError:
+            return Response({'error': 'date is required (YYYY-MM-DD)'}, status=status.HTTP_400_BAD_REQUEST)
+        cashiers = day_expectations(self._school(request), day)
+        for entry in cashiers:
+            entry['expected_total'] = float(entry['expected_total'])
+            entry['pending_total'] = float(entry['pending_total'])
+        return Response({'date': day, 'cashiers': cashiers})
+
+    def post(self, request):
+        from core.permissions import get_role
+
+        if get_role(request.user) != 'Admin':
+            return Response({'detail': 'Only admins can reconcile all cashiers'}, status=status.HTTP_403_FORBIDDEN)
+        serializer = ReconciliationBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        reconciliations, errors = reconcile_cashiers(
+            self._school(request), serializer.validated_data['date'], serializer.validated_data['counts']
+        )
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {'reconciled': len(reconciliations), 'results': ReconciliationSerializer(reconciliations, many=True).data},
+            status=status.HTTP_201_CREATED
+        )
+
+class ReconciliationVarianceView(APIView):
+    """
+    Reconciliation outcomes per cashier between `from` and `to`: short, over
+    and balanced counts, cumulative variance and the worst days (`worst`,
+    default 3). Optional `cashier` narrows it to one cashier.
+    """
+    MONEY_FIELDS = ('total_variance', 'total_short', 'total_over', 'total_expected', 'total_actual')
+
+    @conditional_on_versions(_school_versions, cache_as='reconciliation-variance')
+    def get(self, request):
+        if not request.GET.get('from') or not request.GET.get('to'):
+            return Response({'error': 'from and to are required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            date_from = date.fromisoformat(request.GET['from'])
+            date_to = date.fromisoformat(request.GET['to'])
+        except ValueError:
+            return Response({'error': 'from and to must be dates (YYYY-MM-DD)'}, status=status.HTTP_400_BAD_REQUEST)
+        cashier = request.GET.get('cashier')
+        if cashier and not cashier.isdigit():
+            return Response({'error': 'cashier must be a user id'}, status=status.HTTP_400_BAD_REQUEST)
+        worst = request.GET.get('worst', str(WORST_DAYS))
+        if not worst.isdigit() or not 1 <= int(worst) <= MAX_WORST_DAYS:
+            return Response({'error': f'worst must be between 1 and {MAX_WORST_DAYS}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        school = None
+        if request.user.is_authenticated and hasattr(request.user, 'profile') and request.user.profile.school:
+            school = request.user.profile.school
+        cashiers = variance_by_cashier(school, date_from, date_to, int(cashier) if cashier else None, int(worst))
+
+        totals = {'reconciliations': 0, 'short': 0, 'over': 0, 'balanced': 0, **{name: Decimal('0') for name in self.MONEY_FIELDS}}
+        for entry in cashiers:
+            for name in totals:
+                totals[name] += entry[name]
+            for name in self.MONEY_FIELDS:
+                entry[name] = float(entry[name])
+            for day in entry['worst_days']:
+                for name in ('expected_total', 'actual_amount', 'variance'):
+                    day[name] = float(day[name])
+        for name in self.MONEY_FIELDS:
+            totals[name] = float(totals[name])
+        return Response({'from': date_from, 'to': date_to, 'totals': totals, 'cashiers': cashiers})
+
 class StatementViewSet(viewsets.ModelViewSet):
     serializer_class = StatementSerializer
     
@@ -0,0 +1,69 @@
+"""
+Benchmark payment list serialization: PaymentSerializer vs PaymentReadSerializer.
+
+Builds unsaved payments in memory (no database writes) and reports the time
+to serialize and render 1,000 rows with each path, checking the JSON is
+byte-identical.
+
+    cd backend && python scripts/bench_payment_serializers.py [--rows 1000] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+
+def run(rows=1000, repeat=20):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    import django
+    django.setup()
+
+    from django.utils import timezone
+    from rest_framework.renderers import JSONRenderer
+    from payments.models import Payment
+    from payments.serializers import PaymentSerializer, PaymentReadSerializer
+
+    today = date.today()
+    payments = []
+    for i in range(rows):
+        voided = i % 10 == 0
+        payments.append(Payment(
+            id=i + 1, school_id=1, student_id=i % 300 + 1, cashier_id=i % 7 + 1,
+            amount=Decimal(f"{(i % 90) + 10}.50"), payment_method='Cash', fee_type='Tuition',
+            status='voided' if voided else 'posted', date=today - timedelta(days=i % 60),
+            receipt_number=f"REC-{today.year}-{i + 1:05d}", cashier_name='Jane Smith',
+            term='1', academic_year=today.year, reference_id=None, bank_name=None, merchant_provider=None,
+            void_reason='Duplicate' if voided else None, voided_at=timezone.now() if voided else None,
+            voided_by='Admin' if voided else None,
+        ))
+    columns = PaymentReadSerializer.columns()
+    value_rows = [{column: vars(p)[column] for column in columns} for p in payments]
+    renderer = JSONRenderer()
+
+    def best(fn):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000 * 1000 / rows  # ms per 1,000 rows
+
+    before = best(lambda: renderer.render(PaymentSerializer(payments, many=True).data))
+    after = best(lambda: renderer.render(PaymentReadSerializer.many(value_rows)))
+    identical = renderer.render(PaymentSerializer(payments, many=True).data) == renderer.render(PaymentReadSerializer.many(value_rows))
+
+    print(f"rows={rows} repeat={repeat} (best run, serialize + render)")
+    print(f"PaymentSerializer      {before:8.2f} ms / 1,000 rows")
+    print(f"PaymentReadSerializer  {after:8.2f} ms / 1,000 rows  ({before / after:.1f}x faster)")
+    print(f"byte-identical JSON: {identical}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
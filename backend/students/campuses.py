@@ -0,0 +1,93 @@
+"""
+Per-school campus reference cache.
+
+A school has a handful of campuses that rarely change, yet every student row
+renders its campus. Campuses are kept in process as their serialized
+(CampusSerializer) form, a school at a time: the first lookup of a campus
+loads it together with the rest of its school in one query, so a list page
+costs at most one campus query, and none once warm. Campus saves and deletes
+drop their school (students.signals); entries older than MAX_AGE are
+reloaded so writes made by other processes show up.
+"""
+import threading
+import time
+
+from django.db.models import Q
+
+# Seconds a school's campuses are served before being reloaded
+MAX_AGE = 60
+
+
+class CampusCache:
+    def __init__(self, max_age=MAX_AGE, clock=time.monotonic):
+        self.max_age = max_age
+        self.clock = clock
+        self._campuses = {}  # campus id -> (school id, data, loaded at)
+        self._by_school = {}  # school id -> campus ids
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _fresh(self, campus_id, now):
+        entry = self._campuses.get(campus_id)
+        return entry is not None and now - entry[2] < self.max_age
+
+    def warm(self, campus_ids):
+        """Load every campus in `campus_ids` that is missing or stale, with one query"""
+        now = self.clock()
+        with self._lock:
+            missing = {campus_id for campus_id in campus_ids if campus_id is not None and not self._fresh(campus_id, now)}
+        if not missing:
+            return
+
+        from .models import Campus
+        from .serializers import CampusSerializer
+        schools = Campus.objects.filter(id__in=missing, school__isnull=False).values('school_id')
+        rows = Campus.objects.filter(Q(id__in=missing) | Q(school_id__in=schools))
+        loaded = [(campus.school_id, campus.id, dict(CampusSerializer(campus).data)) for campus in rows]
+
+        with self._lock:
+            self.loads += 1
+            for school_id, campus_id, data in loaded:
+                previous = self._campuses.get(campus_id)
+                if previous is not None and previous[0] != school_id:
+                    self._by_school.get(previous[0], set()).discard(campus_id)
+                self._campuses[campus_id] = (school_id, data, now)
+                self._by_school.setdefault(school_id, set()).add(campus_id)
+
+    def get(self, campus_id):
+        """The campus as CampusSerializer data (a fresh dict), or None if it does not exist"""
+        if campus_id is None:
+            return None
+        self.warm([campus_id])
+        entry = self._campuses.get(campus_id)
+        return None if entry is None else dict(entry[1])
+
+    def invalidate(self, school_id, campus_id=None):
+        """Forget a school's campuses (and `campus_id`, wherever it was cached)"""
+        with self._lock:
+            ids = self._by_school.pop(school_id, set())
+            if campus_id is not None:
+                ids.add(campus_id)
+            for cached_id in ids:
+                entry = self._campuses.pop(cached_id, None)
+                if entry is not None and entry[0] != school_id:
+                    self._by_school.get(entry[0], set()).discard(cached_id)
+
+    def clear(self):
+        with self._lock:
+            self._campuses.clear()
+            self._by_school.clear()
+            self.loads = 0
+
+
+_campus_cache = None
+_campus_cache_lock = threading.Lock()
+
+
+def get_campus_cache():
+    global _campus_cache
+    if _campus_cache is None:
+        with _campus_cache_lock:
+            if _campus_cache is None:
+                _campus_cache = CampusCache()
+    return _campus_cache
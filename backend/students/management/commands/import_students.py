@@ -0,0 +1,54 @@
+"""
+Import a student roster (CSV or XLSX) into a school.
+
+    python manage.py import_students roster.csv --school 3
+    python manage.py import_students roster.xlsx --school 3 --dry-run --no-update
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import School
+from students.roster import BATCH_SIZE, RosterError, import_roster, read_roster, roster_format
+
+
+class Command(BaseCommand):
+    help = 'Create or update students from a roster file, in batches, reporting per-row errors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Roster file with student_number, first_name, last_name, dob, current_grade, campus_code')
+        parser.add_argument('--school', type=int, required=True, help='School id')
+        parser.add_argument('--format', choices=['csv', 'xlsx'], help='File format (default: from the extension)')
+        parser.add_argument('--no-update', action='store_true', help='Report existing student numbers as errors')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; write nothing')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        school = School.objects.filter(id=options['school']).first()
+        if school is None:
+            raise CommandError(f"No school with id {options['school']}")
+
+        def progress(summary):
+            self.stdout.write(
+                f"{summary['rows']} row(s): {summary['created']} created, "
+                f"{summary['updated']} updated, {summary['failed']} failed"
+            )
+
+        try:
+            with open(options['path'], 'rb') as file:
+                summary = import_roster(
+                    school,
+                    read_roster(file, options['format'] or roster_format(options['path'])),
+                    update_existing=not options['no_update'],
+                    dry_run=options['dry_run'],
+                    batch_size=max(1, options['batch_size']),
+                    progress=progress,
+                )
+        except OSError as exc:
+            raise CommandError(str(exc))
+        except RosterError as exc:
+            raise CommandError(str(exc))
+
+        for error in summary['errors']:
+            self.stdout.write(f"row {error['row']} ({error['student_number'] or '-'}): {error['errors']}")
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        message = f"{verb} {summary['created'] + summary['updated']} student(s), {summary['failed']} failed"
+        self.stdout.write(self.style.WARNING(message) if summary['failed'] else self.style.SUCCESS(message))
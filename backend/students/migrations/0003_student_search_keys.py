@@ -0,0 +1,93 @@
+# Generated by Django 4.2.26 on 2026-10-18 09:38
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+KEY_FIELDS = ('number_key', 'name_key', 'surname_key')
+TRIGRAM_INDEX = 'student_search_trgm_idx'
+
+
+def normalize(text):
+    # Same folding as students.search.normalize at the time of this migration
+    folded = unicodedata.normalize('NFKD', text or '')
+    folded = ''.join(ch for ch in folded if not unicodedata.combining(ch)).lower()
+    return re.sub(r'[^a-z0-9]+', ' ', folded).strip()
+
+
+def search_keys(student_number, first_name, last_name):
+    first, last = normalize(first_name), normalize(last_name)
+    return {
+        'number_key': normalize(student_number).replace(' ', '')[:50],
+        'name_key': f'{first} {last}'.strip()[:255],
+        'surname_key': f'{last} {first}'.strip()[:255],
+    }
+
+
+def fill_search_keys(apps, schema_editor):
+    Student = apps.get_model('students', 'Student')
+    batch = []
+    for student in Student.objects.only('id', 'student_number', 'first_name', 'last_name').iterator(chunk_size=1000):
+        for name, value in search_keys(student.student_number, student.first_name, student.last_name).items():
+            setattr(student, name, value)
+        batch.append(student)
+        if len(batch) >= 1000:
+            Student.objects.bulk_update(batch, KEY_FIELDS)
+            batch = []
+    Student.objects.bulk_update(batch, KEY_FIELDS)
+
+
+def create_trigram_index(apps, schema_editor):
+    # Substring (and short prefix) typeahead matches; PostgreSQL only
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON students_student USING gin '
+        '(number_key gin_trgm_ops, name_key gin_trgm_ops, surname_key gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {TRIGRAM_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0002_alter_campus_options_alter_student_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='name_key',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='number_key',
+            field=models.CharField(default='', editable=False, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='surname_key',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['school', 'number_key'], name='student_number_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['school', 'name_key'], name='student_name_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['school', 'surname_key'], name='student_surname_key_idx'),
+        ),
+        migrations.RunPython(fill_search_keys, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
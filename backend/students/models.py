@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.db.models import UniqueConstraint
 
 class Campus(models.Model):
@@ -24,7 +24,24 @@ class Campus(models.Model):
         verbose_name_plural = 'Campuses'
 
     def __str__(self):
-        return f"{self.name} ({self.school.code})"
+        # Name the school only when it is already loaded, never a query per campus
+        if self.school_id is not None and Campus.school.is_cached(self):
+            return f"{self.name} ({self.school.code})"
+        return self.name
+
+    def save(self, *args, **kwargs):
+        from core.versioning import bump_versions
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Reports embed campus names
+            bump_versions([self.school_id])
+
+    def delete(self, *args, **kwargs):
+        from core.versioning import bump_versions
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            bump_versions([self.school_id])
+        return result
 
 class Student(models.Model):
     school = models.ForeignKey(
@@ -40,6 +57,10 @@ class Student(models.Model):
     dob = models.DateField()
     current_grade = models.CharField(max_length=50)
     campus = models.ForeignKey(Campus, on_delete=models.CASCADE)
+    # Normalized typeahead keys, kept in sync by save() (see students.search)
+    number_key = models.CharField(max_length=50, default='', editable=False)
+    name_key = models.CharField(max_length=255, default='', editable=False)
+    surname_key = models.CharField(max_length=255, default='', editable=False)
 
     class Meta:
         constraints = [
@@ -49,6 +70,35 @@ class Student(models.Model):
             )
         ]
         ordering = ['student_number']
+        # Typeahead prefix ranges; PostgreSQL also gets a trigram GIN index (migration 0003)
+        indexes = [
+            models.Index(fields=['school', 'number_key'], name='student_number_key_idx'),
+            models.Index(fields=['school', 'name_key'], name='student_name_key_idx'),
+            models.Index(fields=['school', 'surname_key'], name='student_surname_key_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student_number} - {self.first_name} {self.last_name}"
+
+    def refresh_search_keys(self):
+        from .search import search_keys
+        for name, value in search_keys(self.student_number, self.first_name, self.last_name).items():
+            setattr(self, name, value)
+
+    def save(self, *args, **kwargs):
+        from core.versioning import bump_versions
+        self.refresh_search_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'student_number', 'first_name', 'last_name'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'number_key', 'name_key', 'surname_key'}
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            bump_versions([self.school_id], [self.pk])
+
+    def delete(self, *args, **kwargs):
+        from core.versioning import bump_versions
+        with transaction.atomic():
+            pk = self.pk
+            result = super().delete(*args, **kwargs)
+            bump_versions([self.school_id], [pk])
+        return result
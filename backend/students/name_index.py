@@ -0,0 +1,228 @@
+"""
+In-process student name index for typeahead.
+
+Each school's roster is loaded once (one query) into a compact index: one
+`__slots__` entry per student, in (surname_key, id) order, plus sorted key
+arrays over the normalized student numbers and names with an array of entry
+positions alongside. A keystroke is then answered by bisecting the key
+arrays, with the same ranking as students.search.typeahead and without
+touching the database.
+
+Indexes are built lazily per school and kept in an LRU bounded by an
+approximate memory budget. Student saves and deletes invalidate their school
+(students.signals); writes that bypass signals (bulk_create, update()) must
+call invalidate() themselves. Other processes only learn of a write when
+their copy reaches MAX_AGE, so the index is opt-in.
+
+Configured with settings.STUDENT_NAME_INDEX:
+
+    'ENABLED': answer typeahead from the index (default off)
+    'MAX_BYTES': approximate memory budget across all schools
+    'MAX_AGE': seconds before a school's index is reloaded; bounds how long
+        another process's writes can go unseen (None: never)
+"""
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .search import DEFAULT_LIMIT, MATCHES, MIN_SUBSTRING_LENGTH, normalize
+
+DEFAULTS = {
+    'ENABLED': False,
+    'MAX_BYTES': 64 * 1024 * 1024,
+    'MAX_AGE': 5 * 60,
+}
+
+LOAD_FIELDS = (
+    'id', 'student_number', 'first_name', 'last_name', 'current_grade', 'campus_id',
+    'number_key', 'name_key', 'surname_key',
+)
+
+
+class StudentEntry:
+    __slots__ = LOAD_FIELDS
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def as_match(self, rank):
+        return {
+            'id': self.id,
+            'student_number': self.student_number,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'current_grade': self.current_grade,
+            'campus': self.campus_id,
+            'match': MATCHES[rank],
+        }
+
+
+def _upper(prefix):
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class SchoolNameIndex:
+    """One school's students with sorted number and name keys"""
+
+    def __init__(self, rows):
+        self.entries = [StudentEntry(*row) for row in sorted(rows, key=lambda row: (row[8], row[0]))]
+        self.number_keys, self.number_positions = self._sorted_keys(
+            (entry.number_key, n) for n, entry in enumerate(self.entries)
+        )
+        # Both name orders share one array, so a prefix is one bisect
+        self.name_keys, self.name_positions = self._sorted_keys(
+            pair
+            for n, entry in enumerate(self.entries)
+            for pair in ((entry.name_key, n), (entry.surname_key, n))
+        )
+        self.size = self._estimate_size()
+
+    @staticmethod
+    def _sorted_keys(pairs):
+        pairs = sorted(pairs)
+        return [key for key, _ in pairs], array('I', (n for _, n in pairs))
+
+    def _estimate_size(self):
+        size = sys.getsizeof(self.entries) + sys.getsizeof(self.number_keys) + sys.getsizeof(self.name_keys)
+        size += sys.getsizeof(self.number_positions) + sys.getsizeof(self.name_positions)
+        for entry in self.entries:
+            size += sys.getsizeof(entry) + sum(sys.getsizeof(getattr(entry, name)) for name in LOAD_FIELDS)
+        return size
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _range(self, keys, positions, low, high):
+        return positions[bisect_left(keys, low):bisect_left(keys, high)]
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Same results as students.search.typeahead over this school's students"""
+        text = normalize(query)
+        number = text.replace(' ', '')
+        if not text:
+            return []
+
+        ranks = {}
+        for n in self._range(self.name_keys, self.name_positions, text, _upper(text)):
+            ranks[n] = 2
+        for n in self._range(self.number_keys, self.number_positions, number, _upper(number)):
+            ranks[n] = 0 if self.entries[n].number_key == number else 1
+        # Entry positions are in (surname_key, id) order
+        matches = sorted(ranks.items(), key=lambda item: (item[1], item[0]))[:limit]
+
+        if len(matches) < limit and len(text) >= MIN_SUBSTRING_LENGTH:
+            for n, entry in enumerate(self.entries):
+                if n not in ranks and (number in entry.number_key or text in entry.name_key):
+                    matches.append((n, 3))
+                    if len(matches) == limit:
+                        break
+        return [self.entries[n].as_match(rank) for n, rank in matches]
+
+
+class StudentNameIndex:
+    """Per-school SchoolNameIndex instances, least recently used evicted past max_bytes"""
+
+    def __init__(self, max_bytes, max_age=None, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.clock = clock
+        self._indexes = OrderedDict()  # school id -> (index, loaded at)
+        self._generations = {}
+        self._epoch = 0
+        self._oversized = set()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def _load(self, school_id):
+        from .models import Student
+        rows = Student.objects.filter(school_id=school_id).order_by().values_list(*LOAD_FIELDS)
+        return SchoolNameIndex(rows)
+
+    def get(self, school_id):
+        """The school's index, loaded on first use; None if it cannot fit the budget"""
+        with self._lock:
+            cached = self._indexes.get(school_id)
+            if cached is not None and (self.max_age is None or self.clock() - cached[1] < self.max_age):
+                self._indexes.move_to_end(school_id)
+                return cached[0]
+            if school_id in self._oversized:
+                return None
+            generation = (self._epoch, self._generations.get(school_id, 0))
+
+        # Built outside the lock so a large roster does not hold up other schools
+        loaded_at = self.clock()
+        index = self._load(school_id)
+
+        with self._lock:
+            self.loads += 1
+            if (self._epoch, self._generations.get(school_id, 0)) != generation:
+                # Invalidated while loading: serve this result, but do not keep it
+                return index
+            if index.size > self.max_bytes:
+                self._indexes.pop(school_id, None)
+                self._oversized.add(school_id)
+                return None
+            self._indexes[school_id] = (index, loaded_at)
+            self._indexes.move_to_end(school_id)
+            while self._used() > self.max_bytes:
+                self._indexes.popitem(last=False)
+                self.evictions += 1
+        return index
+
+    def search(self, school_id, query, limit=DEFAULT_LIMIT):
+        """Typeahead results for the school, or None when the school is not indexable"""
+        index = self.get(school_id)
+        return None if index is None else index.search(query, limit)
+
+    def invalidate(self, school_id):
+        with self._lock:
+            self._indexes.pop(school_id, None)
+            self._oversized.discard(school_id)
+            self._generations[school_id] = self._generations.get(school_id, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._indexes.clear()
+            self._oversized.clear()
+            self.loads = self.evictions = 0
+
+    def _used(self):
+        return sum(index.size for index, _ in self._indexes.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'schools': len(self._indexes),
+                'students': sum(len(index) for index, _ in self._indexes.values()),
+                'bytes': self._used(),
+                'max_bytes': self.max_bytes,
+                'loads': self.loads,
+                'evictions': self.evictions,
+                'oversized': len(self._oversized),
+            }
+
+
+def name_index_enabled():
+    return {**DEFAULTS, **getattr(settings, 'STUDENT_NAME_INDEX', {})}['ENABLED']
+
+
+_name_index = None
+_name_index_lock = threading.Lock()
+
+
+def get_name_index():
+    global _name_index
+    if _name_index is None:
+        with _name_index_lock:
+            if _name_index is None:
+                config = {**DEFAULTS, **getattr(settings, 'STUDENT_NAME_INDEX', {})}
+                _name_index = StudentNameIndex(config['MAX_BYTES'], config['MAX_AGE'])
+    return _name_index
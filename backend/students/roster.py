@@ -0,0 +1,210 @@
+"""
+Bulk student roster import.
+
+A roster file (CSV, or XLSX when openpyxl is installed) is read as a stream
+of rows and handled in batches: each row is validated, its campus resolved by
+code from the school's campuses (one query per import), student numbers are
+checked against earlier rows of the file and against the school's students
+(one query per batch), and the batch is upserted on the
+(school, student_number) unique constraint with a single bulk_create.
+
+bulk_create skips Student.save() and its signals, so each batch refreshes the
+search keys, bumps the data versions and invalidates the school's name index
+itself.
+"""
+import csv
+import io
+from datetime import datetime
+
+from django.db import transaction
+
+from core.versioning import bump_versions
+from .models import Campus, Student
+from .name_index import get_name_index
+from .serializers import StudentImportRowSerializer
+
+BATCH_SIZE = 500
+# Rows accepted by one upload through the API; the management command has no limit
+MAX_IMPORT_ROWS = 10000
+COLUMNS = ['student_number', 'first_name', 'last_name', 'dob', 'current_grade', 'campus_code']
+COLUMN_ALIASES = {'campus': 'campus_code'}
+UPDATE_FIELDS = ['first_name', 'last_name', 'dob', 'current_grade', 'campus', 'number_key', 'name_key', 'surname_key']
+FORMATS = ('csv', 'xlsx')
+
+
+class RosterError(Exception):
+    """The file cannot be imported (unreadable, wrong columns), or read no further than `row`"""
+
+    def __init__(self, message, row=None):
+        super().__init__(message)
+        self.row = row
+
+
+def _column(header):
+    name = '_'.join(str(header or '').strip().lower().split())
+    return COLUMN_ALIASES.get(name, name)
+
+
+def _check_columns(columns):
+    missing = [name for name in COLUMNS if name not in columns]
+    if missing:
+        raise RosterError(f"Missing column(s): {', '.join(missing)}")
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, float) and value.is_integer():
+        # Spreadsheets store student numbers like 1001 as 1001.0
+        return str(int(value))
+    return value if hasattr(value, 'isoformat') else str(value).strip()
+
+
+def read_csv(file):
+    """(line number, row) for each data row of a binary CSV stream"""
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.reader(text)
+        columns = [_column(header) for header in next(reader, [])]
+        _check_columns(columns)
+        for values in reader:
+            if any(value.strip() for value in values):
+                yield reader.line_num, {name: _cell(value) for name, value in zip(columns, values)}
+    except UnicodeDecodeError:
+        raise RosterError('CSV rosters must be UTF-8 text', row=reader.line_num + 1)
+    except csv.Error as exc:
+        raise RosterError(f'Unreadable CSV: {exc}', row=reader.line_num)
+    finally:
+        text.detach()
+
+
+def read_xlsx(file):
+    """(row number, row) for each data row of the first sheet of an XLSX workbook"""
+    try:
+        import openpyxl
+    except ImportError:
+        raise RosterError('XLSX rosters need the openpyxl package; upload a CSV instead')
+    try:
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    except Exception:
+        raise RosterError('Not a readable XLSX workbook')
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        columns = [_column(header) for header in next(rows, ())]
+        _check_columns(columns)
+        for number, values in enumerate(rows, start=2):
+            if any(value not in (None, '') for value in values):
+                yield number, {name: _cell(value) for name, value in zip(columns, values)}
+    finally:
+        workbook.close()
+
+
+def read_roster(file, file_format):
+    if file_format not in FORMATS:
+        raise RosterError(f"Unsupported roster format '{file_format or ''}' (use {' or '.join(FORMATS)})")
+    return read_csv(file) if file_format == 'csv' else read_xlsx(file)
+
+
+def roster_format(filename):
+    """'csv' / 'xlsx' from a file name, or None"""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return extension if extension in FORMATS else None
+
+
+def import_roster(school, rows, update_existing=True, dry_run=False, batch_size=BATCH_SIZE,
+                  max_rows=None, progress=None):
+    """
+    Import (row number, row dict) pairs for a school in batches of `batch_size`.
+    Existing students (same student number) are updated, or reported as errors
+    when `update_existing` is off; nothing is written on a dry run. Each batch
+    commits on its own; `progress(summary)` is called after every batch. A
+    RosterError before the first row is raised; one further into the file
+    (the rest cannot be read) is reported as an error of the row it stopped at,
+    and the summary covers the rows before it.
+    Returns {'rows', 'created', 'updated', 'failed', 'errors': [{'row',
+    'student_number', 'errors'}], 'dry_run'}.
+    """
+    summary = {'rows': 0, 'created': 0, 'updated': 0, 'failed': 0, 'errors': [], 'dry_run': dry_run}
+    campuses = dict(Campus.objects.filter(school=school).values_list('code', 'id'))
+    seen = {}  # student number -> row number of its first occurrence
+    batch = []
+
+    def fail(number, student_number, errors):
+        summary['failed'] += 1
+        summary['errors'].append({
+            'row': number,
+            'student_number': student_number or None,
+            'errors': {field: [str(message) for message in messages] for field, messages in errors.items()},
+        })
+
+    def flush():
+        numbers = [attrs['student_number'] for _, attrs in batch]
+        existing = dict(
+            Student.objects.filter(school=school, student_number__in=numbers).values_list('student_number', 'id')
+        )
+        students = []
+        for number, attrs in batch:
+            if attrs['student_number'] in existing and not update_existing:
+                fail(number, attrs['student_number'], {'student_number': ['A student with this number already exists']})
+                continue
+            student = Student(school=school, **attrs)
+            student.refresh_search_keys()
+            students.append(student)
+        batch.clear()
+        if not students:
+            return
+
+        updated = [existing[s.student_number] for s in students if s.student_number in existing]
+        if not dry_run:
+            with transaction.atomic():
+                Student.objects.bulk_create(
+                    students,
+                    update_conflicts=True,
+                    unique_fields=['school', 'student_number'],
+                    update_fields=UPDATE_FIELDS,
+                )
+                bump_versions([school.id], updated)
+            get_name_index().invalidate(school.id)
+        summary['updated'] += len(updated)
+        summary['created'] += len(students) - len(updated)
+
+    try:
+        for number, row in rows:
+            if max_rows is not None and summary['rows'] >= max_rows:
+                fail(number, None, {'file': [f'At most {max_rows} students can be imported at once; later rows were skipped']})
+                break
+            summary['rows'] += 1
+
+            serializer = StudentImportRowSerializer(data=row)
+            if not serializer.is_valid():
+                fail(number, row.get('student_number'), serializer.errors)
+                continue
+            attrs = dict(serializer.validated_data)
+            campus_id = campuses.get(attrs.pop('campus_code'))
+            if campus_id is None:
+                fail(number, attrs['student_number'], {'campus_code': ['Unknown campus code']})
+                continue
+            if attrs['student_number'] in seen:
+                fail(number, attrs['student_number'], {
+                    'student_number': [f"Duplicate of row {seen[attrs['student_number']]}"]
+                })
+                continue
+            seen[attrs['student_number']] = number
+            batch.append((number, {**attrs, 'campus_id': campus_id}))
+
+            if len(batch) >= batch_size:
+                flush()
+                if progress is not None:
+                    progress(summary)
+    except RosterError as exc:
+        if not summary['rows']:
+            raise
+        # Earlier batches are committed; say how far the import got
+        fail(exc.row, None, {'file': [f'{exc}; this and later rows were not imported']})
+    if batch:
+        flush()
+    if progress is not None:
+        progress(summary)
+    return summary
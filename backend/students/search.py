@@ -0,0 +1,90 @@
+"""
+Student typeahead search.
+
+Each student carries normalized search keys (lowercase ASCII, accents and
+punctuation folded): `number_key` (student number, alphanumerics only),
+`name_key` ("first last") and `surname_key` ("last first"). A keystroke is
+answered in ranked tiers, each capped at the requested limit:
+
+1. exact student number, then student number prefix, then name prefix -
+   one query over the (school, key) btree indexes as key ranges, or LIKE
+   'q%' on PostgreSQL, where the trigram GIN index serves it;
+2. substring matches of 3+ characters, only when tier 1 left the page short -
+   trigram GIN on PostgreSQL, a scan of the school's rows elsewhere.
+"""
+import re
+import unicodedata
+
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 25
+# Shorter substrings match most of a roster (and have no trigrams to index)
+MIN_SUBSTRING_LENGTH = 3
+RESULT_FIELDS = ('id', 'student_number', 'first_name', 'last_name', 'current_grade', 'campus_id')
+MATCHES = {0: 'exact', 1: 'prefix', 2: 'prefix', 3: 'substring'}
+
+
+def normalize(text):
+    """'  Zoë  O'Brien ' -> 'zoe o brien'"""
+    folded = unicodedata.normalize('NFKD', text or '')
+    folded = ''.join(ch for ch in folded if not unicodedata.combining(ch)).lower()
+    return re.sub(r'[^a-z0-9]+', ' ', folded).strip()
+
+
+def number_key(student_number):
+    return normalize(student_number).replace(' ', '')
+
+
+def search_keys(student_number, first_name, last_name):
+    first, last = normalize(first_name), normalize(last_name)
+    return {
+        'number_key': number_key(student_number)[:50],
+        'name_key': f'{first} {last}'.strip()[:255],
+        'surname_key': f'{last} {first}'.strip()[:255],
+    }
+
+
+def _prefix(field, prefix, vendor):
+    if vendor == 'postgresql':
+        return Q(**{f'{field}__startswith': prefix})
+    # A key range uses the (school, key) btree on any database
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': upper})
+
+
+def typeahead(queryset, query, limit=DEFAULT_LIMIT):
+    """Top `limit` students in `queryset` for a typed query, best matches first"""
+    text = normalize(query)
+    number = text.replace(' ', '')
+    if not text:
+        return []
+    vendor = connections[queryset.db].vendor
+
+    number_prefix = _prefix('number_key', number, vendor)
+    name_prefix = _prefix('name_key', text, vendor) | _prefix('surname_key', text, vendor)
+    rows = list(
+        queryset.filter(Q(number_key=number) | number_prefix | name_prefix)
+        .annotate(rank=Case(
+            When(number_key=number, then=Value(0)),
+            When(number_prefix, then=Value(1)),
+            default=Value(2),
+            output_field=IntegerField(),
+        ))
+        .order_by('rank', 'surname_key', 'id')
+        .values(*RESULT_FIELDS, 'rank')[:limit]
+    )
+    if len(rows) < limit and len(text) >= MIN_SUBSTRING_LENGTH:
+        # Every prefix match is already in `rows`
+        rows += list(
+            queryset.filter(Q(number_key__contains=number) | Q(name_key__contains=text))
+            .exclude(id__in=[row['id'] for row in rows])
+            .annotate(rank=Value(3, output_field=IntegerField()))
+            .order_by('surname_key', 'id')
+            .values(*RESULT_FIELDS, 'rank')[:limit - len(rows)]
+        )
+    for row in rows:
+        row['campus'] = row.pop('campus_id')
+        row['match'] = MATCHES[row.pop('rank')]
+    return rows
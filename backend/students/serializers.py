@@ -1,4 +1,6 @@
+from django.db import models
 from rest_framework import serializers
+from .campuses import get_campus_cache
 from .models import Student, Campus
 
 class CampusSerializer(serializers.ModelSerializer):
@@ -6,10 +8,66 @@ class CampusSerializer(serializers.ModelSerializer):
         model = Campus
         fields = '__all__'
 
+class CachedCampusField(serializers.Field):
+    """The nested campus (CampusSerializer data), read from the campus reference cache"""
+
+    def __init__(self, **kwargs):
+        kwargs.update(read_only=True, source='campus_id')
+        super().__init__(**kwargs)
+
+    def to_representation(self, campus_id):
+        return get_campus_cache().get(campus_id)
+
+
+class StudentListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        students = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        # Every campus on the page in (at most) one query
+        get_campus_cache().warm({student.campus_id for student in students})
+        return super().to_representation(students)
+
+
 class StudentSerializer(serializers.ModelSerializer):
-    campus = CampusSerializer(read_only=True)
+    campus = CachedCampusField()
     campus_id = serializers.PrimaryKeyRelatedField(queryset=Campus.objects.all(), source='campus', write_only=True)
 
     class Meta:
         model = Student
         fields = ['id', 'student_number', 'first_name', 'last_name', 'dob', 'current_grade', 'campus', 'campus_id']
+        list_serializer_class = StudentListSerializer
+
+
+class StudentSlimSerializer(serializers.ModelSerializer):
+    """Read-only roster row without the nested campus; `fields` keeps a subset"""
+    name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Student
+        fields = ['id', 'student_number', 'first_name', 'last_name', 'name', 'current_grade', 'campus']
+        read_only_fields = fields
+
+    # Columns each field reads, so the queryset can load only those
+    columns = {'name': ['first_name', 'last_name'], 'campus': ['campus_id']}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def get_name(self, student):
+        return f"{student.first_name} {student.last_name}".strip()
+
+    @classmethod
+    def columns_for(cls, fields):
+        return sorted({column for name in fields for column in cls.columns.get(name, [name])})
+
+
+class StudentImportRowSerializer(serializers.Serializer):
+    """One roster import row (students.roster); the campus is given by its code"""
+    student_number = serializers.CharField(max_length=50)
+    first_name = serializers.CharField(max_length=100)
+    last_name = serializers.CharField(max_length=100)
+    dob = serializers.DateField()
+    current_grade = serializers.CharField(max_length=50)
+    campus_code = serializers.CharField(max_length=50)
@@ -0,0 +1,25 @@
+"""Drop a school's in-process student name index and campus references when they change"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .campuses import get_campus_cache
+from .models import Campus, Student
+from .name_index import get_name_index
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_name_index(sender, instance, **kwargs):
+    index = get_name_index()
+    index.invalidate(instance.school_id)
+    # Again once committed, in case another thread reloaded the old roster meanwhile
+    transaction.on_commit(lambda: index.invalidate(instance.school_id))
+
+
+@receiver(post_save, sender=Campus)
+@receiver(post_delete, sender=Campus)
+def invalidate_campus_cache(sender, instance, **kwargs):
+    cache = get_campus_cache()
+    cache.invalidate(instance.school_id, instance.pk)
+    transaction.on_commit(lambda: cache.invalidate(instance.school_id, instance.pk))
@@ -0,0 +1,107 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, StudentFactory, SchoolFactory, CampusFactory
+from students.campuses import CampusCache, get_campus_cache
+from students.models import Campus
+from students.serializers import CampusSerializer
+
+URL = "/api/v1/students/"
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def client(school):
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(username="campus_cache_user", profile__school=school))
+    return client
+
+
+def _students(school, count, campuses=3):
+    campuses = [CampusFactory(school=school) for _ in range(campuses)]
+    return [StudentFactory(school=school, campus=campuses[n % len(campuses)]) for n in range(count)]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("count", [3, 40])
+def test_student_list_queries_do_not_grow_with_students(client, school, count):
+    students = _students(school, count)
+    with CaptureQueriesContext(connection) as cold:
+        rows = client.get(URL).json()
+    # Students, then every campus of the school at once
+    assert len(cold) == 2
+    assert len(rows) == count
+    assert rows[0]["campus"] == CampusSerializer(students[0].campus).data
+
+    with CaptureQueriesContext(connection) as warm:
+        client.get(URL, {"page_size": 10})
+    # Count and page; campuses come from the cache
+    assert len(warm) == 2
+
+
+@pytest.mark.django_db
+def test_campus_writes_refresh_the_cache(client, school):
+    student = _students(school, 1, campuses=1)[0]
+    report = f"/api/v1/reports/{student.id}/"
+    assert client.get(f"{URL}{student.id}/").json()["campus"]["name"] == student.campus.name
+    first = client.get(report)
+    assert first.json()["student"]["campus"] == student.campus.name
+
+    campus = Campus.objects.get(id=student.campus_id)
+    campus.name = "Renamed"
+    campus.save()
+    assert client.get(f"{URL}{student.id}/").json()["campus"]["name"] == "Renamed"
+    # Neither the report cache nor the ETag may serve the old name
+    second = client.get(report, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert second.status_code == 200
+    assert second.json()["student"]["campus"] == "Renamed"
+
+
+@pytest.mark.django_db
+def test_one_lookup_loads_the_whole_school(school):
+    first, second = CampusFactory(school=school), CampusFactory(school=school)
+    other = CampusFactory(school=SchoolFactory())
+    cache = CampusCache()
+    assert cache.get(first.id)["code"] == first.code
+    with CaptureQueriesContext(connection) as queries:
+        assert cache.get(second.id)["id"] == second.id
+    assert len(queries) == 0
+    assert cache.get(other.id)["school"] == other.school_id
+    assert cache.loads == 2
+
+
+@pytest.mark.django_db
+def test_stale_entries_are_reloaded(school):
+    campus = CampusFactory(school=school, name="Before")
+    now = [0.0]
+    cache = CampusCache(max_age=60, clock=lambda: now[0])
+    cache.get(campus.id)
+    # Renamed by another process: no signal reaches this cache
+    Campus.objects.filter(id=campus.id).update(name="After")
+    assert cache.get(campus.id)["name"] == "Before"
+    now[0] = 61
+    assert cache.get(campus.id)["name"] == "After"
+
+
+@pytest.mark.django_db
+def test_deleted_campus_is_forgotten(school):
+    campus = CampusFactory(school=school)
+    campus_id = campus.id
+    assert get_campus_cache().get(campus_id) is not None
+    campus.delete()
+    assert get_campus_cache().get(campus_id) is None
+
+
+@pytest.mark.django_db
+def test_campus_str_does_not_load_school(school):
+    campus = CampusFactory(school=school, name="North")
+    loaded = Campus.objects.get(id=campus.id)
+    with CaptureQueriesContext(connection) as queries:
+        assert str(loaded) == "North"
+    assert len(queries) == 0
+    assert str(Campus.objects.select_related("school").get(id=campus.id)) == f"North ({school.code})"
@@ -0,0 +1,166 @@
+import pytest
+from io import BytesIO, StringIO
+from datetime import date
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, StudentFactory, SchoolFactory, CampusFactory
+from core.versioning import current_versions, school_key
+from students.models import Student
+from students.name_index import get_name_index
+from students.roster import import_roster, read_csv
+
+URL = "/api/v1/students/import/"
+HEADER = "Student Number,First Name,Last Name,DOB,Current Grade,Campus Code\n"
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def campuses(school):
+    return CampusFactory(school=school, code="N1"), CampusFactory(school=school, code="S1")
+
+
+@pytest.fixture
+def admin(school):
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(username="roster_admin", profile__school=school, profile__role="admin"))
+    return client
+
+
+def _csv(*lines, header=HEADER):
+    return SimpleUploadedFile("roster.csv", (header + "".join(f"{line}\n" for line in lines)).encode(), "text/csv")
+
+
+@pytest.mark.django_db
+def test_import_creates_and_updates_students(admin, school, campuses):
+    existing = StudentFactory(school=school, student_number="R-2", first_name="Old", last_name="Name", campus=campuses[0])
+    res = admin.post(URL, {"file": _csv(
+        "R-1,Rudo,Chari,2012-03-04,Grade 5,N1",
+        "R-2,Tendai,Moyo,2011-01-02,Grade 6,S1",
+    )}, format="multipart")
+    assert res.status_code == 201
+    assert res.json() == {"rows": 2, "created": 1, "updated": 1, "failed": 0, "errors": [], "dry_run": False}
+
+    created = Student.objects.get(school=school, student_number="R-1")
+    assert (created.dob, created.campus_id, created.name_key) == (date(2012, 3, 4), campuses[0].id, "rudo chari")
+    existing.refresh_from_db()
+    assert (existing.first_name, existing.campus_id, existing.surname_key) == ("Tendai", campuses[1].id, "moyo tendai")
+
+
+@pytest.mark.django_db
+def test_row_errors_are_reported_and_valid_rows_imported(admin, school, campuses):
+    res = admin.post(URL, {"file": _csv(
+        "R-1,Rudo,Chari,2012-03-04,Grade 5,N1",
+        "R-2,Tendai,Moyo,not a date,Grade 6,S1",
+        "R-3,Chipo,Banda,2012-03-04,Grade 5,XX",
+        "R-1,Again,Chari,2012-03-04,Grade 5,N1",
+        ",,,,,",
+        "R-4,Farai,Dube,2010-05-06,Grade 7,S1",
+    )}, format="multipart")
+    assert res.status_code == 207
+    body = res.json()
+    assert (body["created"], body["failed"]) == (2, 3)
+    assert [(e["row"], e["student_number"], list(e["errors"])) for e in body["errors"]] == [
+        (3, "R-2", ["dob"]), (4, "R-3", ["campus_code"]), (5, "R-1", ["student_number"]),
+    ]
+    assert body["errors"][2]["errors"]["student_number"] == ["Duplicate of row 2"]
+    assert set(Student.objects.filter(school=school).values_list("student_number", flat=True)) == {"R-1", "R-4"}
+
+
+@pytest.mark.django_db
+def test_dry_run_and_no_update_write_nothing(admin, school, campuses):
+    StudentFactory(school=school, student_number="R-2", first_name="Old", campus=campuses[0])
+    rows = ("R-1,Rudo,Chari,2012-03-04,Grade 5,N1", "R-2,Tendai,Moyo,2011-01-02,Grade 6,S1")
+    res = admin.post(URL, {"file": _csv(*rows), "dry_run": "true"}, format="multipart")
+    assert res.status_code == 200
+    assert (res.json()["created"], res.json()["updated"], res.json()["dry_run"]) == (1, 1, True)
+    assert Student.objects.filter(school=school).count() == 1
+
+    res = admin.post(URL, {"file": _csv(*rows), "update_existing": "false"}, format="multipart")
+    assert res.status_code == 207
+    assert res.json()["errors"][0]["errors"] == {"student_number": ["A student with this number already exists"]}
+    assert Student.objects.get(school=school, student_number="R-2").first_name == "Old"
+
+
+@pytest.mark.django_db
+def test_bad_files_and_callers_are_rejected(admin, school, campuses):
+    bad_header = _csv("R-1,Rudo,2012-03-04", header="student_number,first_name,dob\n")
+    res = admin.post(URL, {"file": bad_header}, format="multipart")
+    assert res.status_code == 400 and "last_name" in res.json()["detail"]
+    assert admin.post(URL, {}, format="multipart").status_code == 400
+    res = admin.post(URL, {"file": SimpleUploadedFile("roster.txt", b"x")}, format="multipart")
+    assert res.status_code == 400
+
+    cashier = APIClient()
+    cashier.force_authenticate(user=UserFactory(username="roster_cashier", profile__school=school))
+    assert cashier.post(URL, {"file": _csv("R-1,Rudo,Chari,2012-03-04,Grade 5,N1")}, format="multipart").status_code == 403
+    assert not Student.objects.filter(school=school).exists()
+
+
+@pytest.mark.django_db
+def test_unreadable_rows_stop_the_import_with_a_partial_summary(admin, school, campuses):
+    huge = "x" * 200000
+    lines = ["R-1,Rudo,Chari,2012-03-04,Grade 5,N1", "R-2,Tendai,Moyo,2011-01-02,Grade 6,S1",
+             f"R-3,{huge},Banda,2012-03-04,Grade 5,N1", "R-4,Farai,Dube,2010-05-06,Grade 7,S1"]
+    res = admin.post(URL, {"file": _csv(*lines)}, format="multipart")
+    assert res.status_code == 207
+    body = res.json()
+    assert (body["rows"], body["created"], body["failed"]) == (2, 2, 1)
+    [error] = body["errors"]
+    assert error["row"] == 4 and "field larger than field limit" in error["errors"]["file"][0]
+    assert set(Student.objects.filter(school=school).values_list("student_number", flat=True)) == {"R-1", "R-2"}
+
+    # Batches committed before the unreadable row are counted too
+    rows = read_csv(BytesIO((HEADER + "\n".join(line.replace("R-", "S-") for line in lines)).encode()))
+    summary = import_roster(school, rows, batch_size=1)
+    assert (summary["created"], summary["failed"]) == (2, 1)
+
+
+@pytest.mark.django_db
+def test_batches_cost_a_fixed_number_of_queries(school, campuses):
+    lines = [f"R-{n},First{n},Last{n},2012-01-01,Grade 1,{'N1' if n % 2 else 'S1'}" for n in range(300)]
+    rows = read_csv(BytesIO((HEADER + "\n".join(lines)).encode()))
+    batches = []
+    with CaptureQueriesContext(connection) as queries:
+        summary = import_roster(school, rows, batch_size=100, progress=lambda s: batches.append(s["created"]))
+    assert summary["created"] == 300 and summary["failed"] == 0
+    assert batches == [100, 200, 300, 300]
+    statements = [q["sql"] for q in queries if not q["sql"].startswith(("SAVEPOINT", "RELEASE"))]
+    # Campuses once; per batch the existing numbers, the upsert (chunked on SQLite) and the version bump
+    assert sum(sql.startswith('SELECT "students_student"') for sql in statements) == 3
+    assert len(statements) < 30
+    assert Student.objects.filter(school=school, number_key="r299").exists()
+
+
+@pytest.mark.django_db
+def test_import_refreshes_versions_and_name_index(school, campuses):
+    index = get_name_index()
+    assert index.search(school.id, "rudo") == []
+    before = current_versions([school_key(school.id)])
+    rows = read_csv(BytesIO((HEADER + "R-1,Rudo,Chari,2012-03-04,Grade 5,N1\n").encode()))
+    import_roster(school, rows)
+    assert current_versions([school_key(school.id)]) != before
+    assert [r["student_number"] for r in index.search(school.id, "rudo")] == ["R-1"]
+
+
+@pytest.mark.django_db
+def test_management_command(tmp_path, school, campuses):
+    path = tmp_path / "roster.csv"
+    path.write_text(HEADER + "R-1,Rudo,Chari,2012-03-04,Grade 5,N1\nR-2,Bad,Row,2012-03-04,Grade 5,ZZ\n")
+    out = StringIO()
+    call_command("import_students", str(path), "--school", str(school.id), stdout=out)
+    assert "Imported 1 student(s), 1 failed" in out.getvalue()
+    assert "row 3 (R-2)" in out.getvalue()
+    assert Student.objects.filter(school=school, student_number="R-1").exists()
+
+    with pytest.raises(CommandError, match="No school"):
+        call_command("import_students", str(path), "--school", "999999", stdout=StringIO())
+    with pytest.raises(CommandError, match="openpyxl|XLSX"):
+        call_command("import_students", str(path), "--school", str(school.id), "--format", "xlsx", stdout=StringIO())
@@ -0,0 +1,139 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, StudentFactory, SchoolFactory
+from students.models import Student
+from students.name_index import SchoolNameIndex, StudentNameIndex, get_name_index
+from students.search import typeahead
+
+URL = "/api/v1/students/typeahead/"
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def client(school, settings):
+    settings.STUDENT_NAME_INDEX = {"ENABLED": True}
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(username="name_index_user", profile__school=school))
+    return client
+
+
+def _roster(school):
+    return [
+        StudentFactory(school=school, student_number="A12", first_name="Zed", last_name="Last"),
+        StudentFactory(school=school, student_number="A123", first_name="Yan", last_name="Last"),
+        StudentFactory(school=school, student_number="B1", first_name="A12son", last_name="Zulu"),
+        StudentFactory(school=school, student_number="XA12", first_name="Xi", last_name="Last"),
+        StudentFactory(school=school, student_number="C-9", first_name="Tendai", last_name="Moyo"),
+        StudentFactory(school=school, student_number="C-10", first_name="Tariro", last_name="Moyo"),
+        StudentFactory(school=school, student_number="D1", first_name="Zoë", last_name="O'Brien"),
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", ["a12", "A1", "moyo", "moyo t", "Tendai M", "ndai", "obrien", "o b", "c", "zz", " "])
+@pytest.mark.parametrize("limit", [2, 10])
+def test_matches_database_typeahead(school, query, limit):
+    _roster(school)
+    StudentFactory(school=SchoolFactory(), student_number="A12", first_name="Other", last_name="School")
+    index = StudentNameIndex(max_bytes=10 ** 7).get(school.id)
+    assert index.search(query, limit) == typeahead(Student.objects.filter(school=school), query, limit)
+
+
+@pytest.mark.django_db
+def test_warm_index_answers_without_queries(client, school):
+    students = _roster(school)
+    first = client.get(URL, {"q": "a12"})
+    assert [r["id"] for r in first.json()] == [s.id for s in students[:4]]
+    # Authentication is forced, so a warm keystroke touches no table at all
+    with CaptureQueriesContext(connection) as queries:
+        res = client.get(URL, {"q": "moyo"})
+    assert res.status_code == 200
+    assert len(queries) == 0
+    assert [r["match"] for r in res.json()] == ["prefix", "prefix"]
+
+
+@pytest.mark.django_db
+def test_saves_and_deletes_invalidate_the_school(client, school):
+    student = StudentFactory(school=school, student_number="E1", first_name="Rudo", last_name="Chari")
+    assert [r["id"] for r in client.get(URL, {"q": "rudo"}).json()] == [student.id]
+
+    student.first_name = "Rufaro"
+    student.save()
+    assert client.get(URL, {"q": "rudo"}).json() == []
+    added = StudentFactory(school=school, student_number="E2", first_name="Rudo", last_name="Banda")
+    assert [r["id"] for r in client.get(URL, {"q": "ru"}).json()] == [added.id, student.id]
+
+    added.delete()
+    assert [r["id"] for r in client.get(URL, {"q": "ru"}).json()] == [student.id]
+
+
+@pytest.mark.django_db
+def test_other_schools_stay_cached(school):
+    other = SchoolFactory()
+    StudentFactory(school=school)
+    StudentFactory(school=other)
+    index = get_name_index()
+    index.get(school.id), index.get(other.id)
+    StudentFactory(school=other)
+    assert index.stats()["schools"] == 1
+    with CaptureQueriesContext(connection) as queries:
+        index.get(school.id)
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_least_recently_used_school_is_evicted_past_budget():
+    schools = [SchoolFactory() for _ in range(3)]
+    for school in schools:
+        StudentFactory.create_batch(5, school=school)
+    size = StudentNameIndex(max_bytes=10 ** 7).get(schools[0].id).size
+    index = StudentNameIndex(max_bytes=size * 2 + size // 2)
+
+    index.get(schools[0].id), index.get(schools[1].id)
+    index.get(schools[0].id)  # now most recently used
+    index.get(schools[2].id)
+    stats = index.stats()
+    assert stats["schools"] == 2 and stats["evictions"] == 1 and stats["bytes"] <= index.max_bytes
+    with CaptureQueriesContext(connection) as queries:
+        index.get(schools[0].id), index.get(schools[2].id)
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_school_larger_than_budget_falls_back_to_database(client, school, settings):
+    student = StudentFactory(school=school, first_name="Nyasha")
+    settings.STUDENT_NAME_INDEX = {"ENABLED": True}
+    get_name_index().max_bytes = 1
+    assert get_name_index().search(school.id, "nyasha") is None
+    assert [r["id"] for r in client.get(URL, {"q": "nyasha"}).json()] == [student.id]
+
+
+@pytest.mark.django_db
+def test_index_is_reloaded_after_max_age(school):
+    now = [0.0]
+    index = StudentNameIndex(max_bytes=10 ** 7, max_age=60, clock=lambda: now[0])
+    index.get(school.id)
+    # A write in another process: no signal reaches this one
+    Student.objects.bulk_create([Student(
+        school=school, student_number="F1", first_name="Farai", last_name="Dube",
+        dob="2012-01-01", current_grade="5", campus=StudentFactory(school=school).campus,
+        number_key="f1", name_key="farai dube", surname_key="dube farai",
+    )])
+    assert index.get(school.id).search("farai") == []
+    now[0] = 61
+    assert [r["student_number"] for r in index.get(school.id).search("farai")] == ["F1"]
+
+
+def test_entries_are_slotted():
+    index = SchoolNameIndex([(1, "A1", "Ann", "Banda", "1", 1, "a1", "ann banda", "banda ann")])
+    assert not hasattr(index.entries[0], "__dict__")
+    assert index.search("ban") == [{
+        "id": 1, "student_number": "A1", "first_name": "Ann", "last_name": "Banda",
+        "current_grade": "1", "campus": 1, "match": "prefix",
+    }]
@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, StudentFactory, SchoolFactory
+
+URL = "/api/v1/students/"
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def client(school):
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(username="roster_user", profile__school=school))
+    return client
+
+
+@pytest.mark.django_db
+def test_slim_fields_drop_nested_campus(client, school):
+    student = StudentFactory(school=school, student_number="R1", first_name="Rudo", last_name="Chari")
+    rows = client.get(URL, {"fields": "id,student_number,name"}).json()
+    assert rows == [{"id": student.id, "student_number": "R1", "name": "Rudo Chari"}]
+    row = client.get(f"{URL}{student.id}/", {"fields": "campus,current_grade"}).json()
+    assert row == {"campus": student.campus_id, "current_grade": student.current_grade}
+
+
+@pytest.mark.django_db
+def test_slim_list_is_one_query_and_pages(client, school):
+    StudentFactory.create_batch(5, school=school)
+    with CaptureQueriesContext(connection) as queries:
+        rows = client.get(URL, {"fields": "id,student_number,name,campus"}).json()
+    assert len(rows) == 5
+    assert len(queries) == 1
+    assert "dob" not in queries[0]["sql"]
+
+    page = client.get(URL, {"fields": "id,name", "page_size": 2}).json()
+    assert page["count"] == 5 and len(page["results"]) == 2 and set(page["results"][0]) == {"id", "name"}
+    ids, url = [], f"{URL}?fields=name&pagination=cursor&page_size=2"
+    while url:
+        body = client.get(url).json()
+        ids += [row["name"] for row in body["results"]]
+        url = body["next"]
+    assert len(ids) == 5
+
+
+@pytest.mark.django_db
+def test_unknown_fields_are_rejected(client):
+    res = client.get(URL, {"fields": "id,dob"})
+    assert res.status_code == 400
+    assert "unknown: dob" in res.json()["fields"]
+
+
+@pytest.mark.django_db
+def test_by_number_is_scoped_to_school(client, school):
+    student = StudentFactory(school=school, student_number="SSC-1001")
+    StudentFactory(school=SchoolFactory(), student_number="OTHER-1")
+    res = client.get(f"{URL}by-number/SSC-1001/")
+    assert res.status_code == 200
+    assert res.json()["id"] == student.id and res.json()["campus"]["id"] == student.campus_id
+    assert client.get(f"{URL}by-number/SSC-1001/", {"fields": "id,name"}).json() == {
+        "id": student.id, "name": f"{student.first_name} {student.last_name}",
+    }
+    assert client.get(f"{URL}by-number/OTHER-1/").status_code == 404
+    assert client.get(f"{URL}by-number/ssc-1001/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_ids_resolve_one_page_of_students(client, school):
+    first, _, third = StudentFactory.create_batch(3, school=school)
+    foreign = StudentFactory(school=SchoolFactory())
+    with CaptureQueriesContext(connection) as queries:
+        rows = client.get(URL, {"ids": f"{first.id},{third.id},{foreign.id}", "fields": "id,student_number"}).json()
+    assert len(queries) == 1
+    assert sorted(row["id"] for row in rows) == [first.id, third.id]
+    assert client.get(URL, {"ids": "1,x"}).status_code == 400
+    assert client.get(URL, {"ids": ","}).status_code == 400
+    assert client.get(URL, {"ids": ",".join(str(n) for n in range(1, 102))}).status_code == 400
@@ -0,0 +1,70 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from tests.factories import UserFactory, StudentFactory, SchoolFactory
+from students.models import Student
+from students.search import normalize
+
+URL = "/api/v1/students/typeahead/"
+
+
+@pytest.fixture
+def school():
+    return SchoolFactory()
+
+
+@pytest.fixture
+def client(school):
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(username="typeahead_user", profile__school=school))
+    return client
+
+
+def test_normalize_folds_case_accents_and_punctuation():
+    assert normalize("  Zoë  O'Brien ") == "zoe o brien"
+    assert normalize("SSC-1001") == "ssc 1001"
+
+
+@pytest.mark.django_db
+def test_keys_follow_saves(school):
+    student = StudentFactory(school=school, student_number="SSC-77", first_name="Chipo", last_name="Moyo")
+    assert (student.number_key, student.name_key, student.surname_key) == ("ssc77", "chipo moyo", "moyo chipo")
+    student.last_name = "Banda"
+    student.save(update_fields=["last_name"])
+    assert Student.objects.get(id=student.id).surname_key == "banda chipo"
+
+
+@pytest.mark.django_db
+def test_ranks_exact_number_then_prefix_then_substring(client, school):
+    exact = StudentFactory(school=school, student_number="A12", first_name="Zed", last_name="Last")
+    number_prefix = StudentFactory(school=school, student_number="A123", first_name="Yan", last_name="Last")
+    name_prefix = StudentFactory(school=school, student_number="B1", first_name="A12son", last_name="Zulu")
+    substring = StudentFactory(school=school, student_number="XA12", first_name="Xi", last_name="Last")
+    StudentFactory(school=SchoolFactory(), student_number="A12", first_name="Other", last_name="School")
+    res = client.get(URL, {"q": "a12"})
+    assert res.status_code == 200
+    rows = res.json()
+    assert [r["id"] for r in rows] == [exact.id, number_prefix.id, name_prefix.id, substring.id]
+    assert [r["match"] for r in rows] == ["exact", "prefix", "prefix", "substring"]
+    assert set(rows[0]) == {"id", "student_number", "first_name", "last_name", "current_grade", "campus", "match"}
+
+
+@pytest.mark.django_db
+def test_matches_surname_and_full_name(client, school):
+    tendai = StudentFactory(school=school, first_name="Tendai", last_name="Moyo")
+    StudentFactory(school=school, first_name="Tariro", last_name="Ncube")
+    assert [r["id"] for r in client.get(URL, {"q": "moyo t"}).json()] == [tendai.id]
+    assert [r["id"] for r in client.get(URL, {"q": "Tendai M"}).json()] == [tendai.id]
+    assert [r["id"] for r in client.get(URL, {"q": "ndai"}).json()] == [tendai.id]
+    assert client.get(URL, {"q": "  "}).json() == []
+
+
+@pytest.mark.django_db
+def test_full_page_of_prefix_matches_skips_substring_query(client, school):
+    for n in range(12):
+        StudentFactory(school=school, first_name=f"Rudo{n}", last_name="Dube")
+    with CaptureQueriesContext(connection) as ctx:
+        rows = client.get(URL, {"q": "rudo", "limit": 5}).json()
+    assert len(rows) == 5 and all(r["match"] == "prefix" for r in rows)
+    assert len([q for q in ctx.captured_queries if "students_student" in q["sql"]]) == 1
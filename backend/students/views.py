@@ -1,22 +1,74 @@
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from django.db.models import Q
+from django.shortcuts import get_object_or_404
 from .models import Student, Campus
-from .serializers import StudentSerializer, CampusSerializer
+from .name_index import get_name_index, name_index_enabled
+from .roster import MAX_IMPORT_ROWS, RosterError, import_roster, read_roster, roster_format
+from .search import DEFAULT_LIMIT, MAX_LIMIT, typeahead
+from .serializers import StudentSerializer, StudentSlimSerializer, CampusSerializer
+from core.pagination import OptInPagination
+
+# Students one ?ids= lookup may resolve (a page of payments is at most 100)
+MAX_IDS = 100
+
 
 class StudentViewSet(viewsets.ModelViewSet):
     serializer_class = StudentSerializer
+    pagination_class = OptInPagination
     filter_backends = [filters.SearchFilter]
     search_fields = ['student_number', 'first_name', 'last_name']
 
-    def get_queryset(self):
+    def school_students(self):
         # Filter by current user's school for multi-tenant isolation
         if self.request.user.is_authenticated and hasattr(self.request.user, 'profile'):
-            school = self.request.user.profile.school
-            qs = Student.objects.filter(school=school)
+            qs = Student.objects.filter(school=self.request.user.profile.school)
         else:
             # No school context - return empty queryset
             qs = Student.objects.none()
-        
+        fields = self.requested_fields()
+        if fields is not None:
+            # The ordering columns stay loaded for keyset cursors
+            qs = qs.only('id', 'student_number', *StudentSlimSerializer.columns_for(fields))
+        return qs
+
+    def requested_fields(self):
+        """
+        `?fields=id,student_number,name` on reads selects the slim representation
+        (StudentSlimSerializer) with just those fields; None when not requested.
+        """
+        value = self.request.query_params.get('fields')
+        if not value or self.request.method != 'GET':
+            return None
+        fields = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in fields if name not in StudentSlimSerializer.Meta.fields]
+        if unknown or not fields:
+            raise ValidationError({
+                'fields': f"Choose from {', '.join(StudentSlimSerializer.Meta.fields)}"
+                          + (f"; unknown: {', '.join(unknown)}" if unknown else '')
+            })
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.requested_fields()
+        if fields is None:
+            return super().get_serializer(*args, **kwargs)
+        kwargs.setdefault('context', self.get_serializer_context())
+        return StudentSlimSerializer(*args, fields=fields, **kwargs)
+
+    def get_queryset(self):
+        qs = self.school_students()
+
+        # ?ids=1,2,3 resolves the students of a visible page in one request
+        ids = self.request.query_params.get('ids')
+        if ids is not None:
+            values = [v for v in ids.split(',') if v]
+            if not values or not all(v.isdigit() for v in values) or len(values) > MAX_IDS:
+                raise ValidationError({'ids': f'Enter a comma list of at most {MAX_IDS} student ids'})
+            qs = qs.filter(id__in=values)
+
         # Custom search for typeahead - combines multiple fields
         search = self.request.query_params.get('search', None)
         if search:
@@ -32,6 +84,66 @@ class StudentViewSet(viewsets.ModelViewSet):
         if self.request.user.is_authenticated and hasattr(self.request.user, 'profile'):
             serializer.save(school=self.request.user.profile.school)
 
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
+        """
+        Create or update students from an uploaded roster (multipart `file`, CSV
+        or XLSX) with columns student_number, first_name, last_name, dob,
+        current_grade and campus_code. Options: update_existing (default true),
+        dry_run (validate only). Returns counts and per-row errors. Admins only.
+        """
+        from core.permissions import get_role
+        if get_role(request.user) != 'Admin':
+            return Response({'detail': 'Only admins can import rosters'}, status=status.HTTP_403_FORBIDDEN)
+        school = request.user.profile.school if hasattr(request.user, 'profile') else None
+        if school is None:
+            return Response({'detail': 'A school is required to import a roster'}, status=status.HTTP_400_BAD_REQUEST)
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'detail': 'Upload the roster as `file`'}, status=status.HTTP_400_BAD_REQUEST)
+
+        def flag(name, default):
+            return str(request.data.get(name, default)).lower() in ('1', 'true', 'yes')
+
+        dry_run = flag('dry_run', False)
+        try:
+            rows = read_roster(upload, request.data.get('format') or roster_format(upload.name))
+            summary = import_roster(
+                school, rows, update_existing=flag('update_existing', True), dry_run=dry_run, max_rows=MAX_IMPORT_ROWS
+            )
+        except RosterError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if summary['failed']:
+            code = status.HTTP_207_MULTI_STATUS
+        else:
+            code = status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED
+        return Response(summary, status=code)
+
+    @action(detail=False, methods=['get'], url_path=r'by-number/(?P<student_number>[^/]+)')
+    def by_number(self, request, student_number=None):
+        """One student by exact student number (unique per school); honours ?fields="""
+        student = get_object_or_404(self.school_students(), student_number=student_number)
+        return Response(self.get_serializer(student).data)
+
+    @action(detail=False, methods=['get'], url_path='typeahead')
+    def typeahead(self, request):
+        """
+        Ranked student lookup for search-as-you-type: ?q=<text>[&limit=10].
+        Exact student number first, then number and name prefixes, then substrings.
+        Served from the in-process name index when STUDENT_NAME_INDEX is enabled.
+        """
+        limit = request.query_params.get('limit', str(DEFAULT_LIMIT))
+        limit = min(int(limit), MAX_LIMIT) if limit.isdigit() and int(limit) > 0 else DEFAULT_LIMIT
+        if not (request.user.is_authenticated and hasattr(request.user, 'profile')):
+            return Response([])
+        school = request.user.profile.school
+        query = request.query_params.get('q', '')
+        if name_index_enabled():
+            rows = get_name_index().search(school.id if school else None, query, limit)
+            if rows is not None:
+                return Response(rows)
+        return Response(typeahead(Student.objects.filter(school=school), query, limit))
+
 class CampusViewSet(viewsets.ModelViewSet):
     serializer_class = CampusSerializer
     
@@ -14,7 +14,7 @@ def test_auditor_can_read_reports_but_cannot_post_reconciliation():
     student = StudentFactory()
     today = date.today()
     name = auditor.get_full_name() or auditor.username
-    Payment.objects.create(student=student, amount=10, payment_method="Cash", receipt_number="AR1", status="posted", cashier_name=name, term="1", academic_year=today.year)
+    Payment.objects.create(student=student, amount=10, payment_method="Cash", receipt_number="AR1", status="posted", cashier_name=name, cashier=auditor, term="1", academic_year=today.year)
 
     res = client.get(f"/api/v1/reports/cashier-daily/?date={today}&cashier_id={auditor.id}")
     assert res.status_code == 200
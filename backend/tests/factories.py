@@ -1,9 +1,19 @@
 import factory
 from django.contrib.auth.models import User
+from core.models import School
 from students.models import Campus, Student
 from payments.models import Payment, Profile
 from datetime import date as dt_date
 
+class SchoolFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = School
+    name = factory.Sequence(lambda n: f"School{n}")
+    code = factory.Sequence(lambda n: f"SCH{n:03d}")
+    email = factory.LazyAttribute(lambda o: f"{o.code.lower()}@example.com")
+    phone = "+263000000"
+    address = "Test Address"
+
 class UserFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = User
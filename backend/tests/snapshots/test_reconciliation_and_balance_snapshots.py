@@ -17,8 +17,8 @@ def test_reconciliation_list_snapshot(snapshot):
     client.force_authenticate(user=user)
     name = user.get_full_name() or user.username
     today = date.today()
-    Payment.objects.create(student=student, amount=9, payment_method="Cash", receipt_number="RC1", status="posted", cashier_name=name, term="1", academic_year=today.year)
-    Payment.objects.create(student=student, amount=6, payment_method="Cash", receipt_number="RC2", status="posted", cashier_name=name, term="1", academic_year=today.year)
+    Payment.objects.create(student=student, amount=9, payment_method="Cash", receipt_number="RC1", status="posted", cashier_name=name, cashier=user, term="1", academic_year=today.year)
+    Payment.objects.create(student=student, amount=6, payment_method="Cash", receipt_number="RC2", status="posted", cashier_name=name, cashier=user, term="1", academic_year=today.year)
     res = client.post("/api/v1/reports/reconciliation/", {"date": str(today), "actual_amount": "15.00"}, format="json")
     assert res.status_code == 201
     res = client.get("/api/v1/reports/reconciliation/")
@@ -20,8 +20,8 @@ def test_cashier_daily_snapshot(snapshot):
     user = User.objects.create_user(username="snap_cashier", password="x")
     name = user.get_full_name() or user.username
     today = date.today()
-    Payment.objects.create(student=student, amount=12, payment_method="Cash", receipt_number="SP1", status="posted", cashier_name=name, term="1", academic_year=today.year)
-    Payment.objects.create(student=student, amount=8, payment_method="Card", receipt_number="SP2", status="posted", cashier_name=name, term="1", academic_year=today.year)
+    Payment.objects.create(student=student, amount=12, payment_method="Cash", receipt_number="SP1", status="posted", cashier_name=name, cashier=user, term="1", academic_year=today.year)
+    Payment.objects.create(student=student, amount=8, payment_method="Card", receipt_number="SP2", status="posted", cashier_name=name, cashier=user, term="1", academic_year=today.year)
     res = client.get(f"/api/v1/reports/cashier-daily/?date={today}&cashier_id={user.id}")
     assert res.status_code == 200
     snapshot.assert_match(json.dumps(normalize_daily(res.json()), indent=2, sort_keys=True), "cashier_daily.json")
@@ -56,7 +56,7 @@ export function AddPaymentDialog({ open, onOpenChange, onPaymentAdded }: AddPaym
     merchantProvider: "",
   })
 
-  // Debounced search (unchanged)
+  // Debounced typeahead search
   useEffect(() => {
     if (searchQuery.length < 2) {
       setSearchResults([])
@@ -66,8 +66,15 @@ export function AddPaymentDialog({ open, onOpenChange, onPaymentAdded }: AddPaym
     const timer = setTimeout(async () => {
       setIsSearching(true)
       try {
-        const response = await apiClient.students.search(searchQuery)
-        setSearchResults(response.data || [])
+        // Ranked top matches rather than every icontains hit in the school
+        const response = await apiClient.students.typeahead(searchQuery)
+        setSearchResults((response.data || []).map((s) => ({
+          id: s.id,
+          student_number: s.student_number,
+          first_name: s.first_name,
+          last_name: s.last_name,
+          current_grade: s.current_grade,
+        })))
         setShowResults(true)
       } catch (err) {
         console.error("Student search failed:", err)
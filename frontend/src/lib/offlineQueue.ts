@@ -24,9 +24,13 @@ export interface Payment {
   referenceId?: string;
   merchantProvider?: string;
   notes?: string;
+
+  // Stable id assigned when queued; used to build the Idempotency-Key on flush
+  clientId?: string;
 }
 
 const QUEUE_KEY = 'offlinePayments';
+const BULK_CHUNK_SIZE = 500;  // Matches the server's bulk upload limit
 
 // Get queue from localStorage
 export const getQueue = (): Payment[] => {
@@ -40,7 +44,7 @@ export const addToQueue = (payment: Payment) => {
   if (typeof window === 'undefined') return;
 
   const queue = getQueue();
-  queue.push(payment);
+  queue.push({ ...payment, clientId: payment.clientId || `${Date.now()}-${Math.random().toString(36).slice(2, 11)}` });
   localStorage.setItem(QUEUE_KEY, JSON.stringify(queue));
 };
 
@@ -58,7 +62,17 @@ export const clearQueue = () => {
   localStorage.removeItem(QUEUE_KEY);
 };
 
-// Flush queue to backend
+// Same chunk of queued payments => same key, so a retried flush whose first
+// response was lost is replayed by the server instead of creating duplicates.
+const chunkIdempotencyKey = async (chunk: Payment[]): Promise<string | undefined> => {
+  if (chunk.some((p) => !p.clientId) || typeof crypto === 'undefined' || !crypto.subtle) return undefined;
+  const bytes = new TextEncoder().encode(chunk.map((p) => p.clientId).join(','));
+  const digest = await crypto.subtle.digest('SHA-256', bytes);
+  return 'flush-' + Array.from(new Uint8Array(digest)).map((b) => b.toString(16).padStart(2, '0')).join('');
+};
+
+// Flush queue to backend through the bulk endpoint (one request per 500 items).
+// Student numbers are resolved and receipt numbers assigned server-side.
 export const flushQueue = async () => {
   if (typeof window === 'undefined') return [] as { item: Payment; ok: boolean; error?: string }[];
 
@@ -66,57 +80,59 @@ export const flushQueue = async () => {
   if (!queue.length) return [] as { item: Payment; ok: boolean; error?: string }[];
 
   const api = getApi();
+  const localCashierId = Number(localStorage.getItem('userId') || '') || undefined;
+
+  const payloads = queue.map((payment) => {
+    // Handle backward compatibility: old queue items used 'feeType' for payment method
+    const paymentMethod = payment.paymentMethod || payment.feeType || 'Cash';
+    const feeCategory = payment.feeCategory || 'Tuition';  // Default if not specified
+
+    return {
+      student: payment.studentId || null,
+      student_number: payment.studentNumber || null,
+      amount: payment.amount,
+      payment_method: paymentMethod,  // How it was paid (Cash, Card, etc.)
+      fee_type: feeCategory,          // What it pays for (Tuition, Transport, etc.)
+      status: 'pending',
+      term: payment.term,
+      academic_year: payment.academicYear,
+      cashier_id: payment.cashierId ?? localCashierId,
+
+      // Map extra fields based on payment method
+      reference_id: payment.referenceId || null,
+      bank_name: payment.bankName || null,
+      merchant_provider: payment.merchantProvider || null,
+    };
+  });
+
   const results: { item: Payment; ok: boolean; error?: string }[] = [];
   const remaining: Payment[] = [];
 
-  for (const payment of queue) {
+  for (let start = 0; start < queue.length; start += BULK_CHUNK_SIZE) {
+    const chunk = queue.slice(start, start + BULK_CHUNK_SIZE);
     try {
-      let studentId = payment.studentId;
-      if ((!studentId || studentId === 0) && payment.studentNumber) {
-        try {
-          const studentsRes = await api.get('students/');
-          const match = (studentsRes.data || []).find((s: any) => s.student_number === payment.studentNumber);
-          if (match) studentId = match.id;
-        } catch { }
-      }
-      if (!studentId || studentId === 0) throw new Error('Missing student identifier');
-      const localCashierId = (typeof window !== 'undefined') ? Number(localStorage.getItem('userId') || '') || undefined : undefined;
-
-      // Handle backward compatibility: old queue items used 'feeType' for payment method
-      const paymentMethod = payment.paymentMethod || payment.feeType || 'Cash';
-      const feeCategory = payment.feeCategory || 'Tuition';  // Default if not specified
-
-
-      const payload: any = {
-        student: studentId,
-        amount: payment.amount,
-        payment_method: paymentMethod,  // Correctly map payment method (Cash, Card, etc.)
-        fee_type: feeCategory,          // Correctly map fee category (Tuition, Transport, etc.)
-        // in offline.tsx: feeType stores 'Cash','Card' etc. So it is payment_method.
-        // AND 'fee_type' (Tuition etc) is missing in the old offline form??
-        // Let me check offline.tsx again.
-        // Old offline.tsx: <select value={feeType} ...> Option: Cash, Card... So 'feeType' state variable HELD the payment method.
-        // BUT Online form has BOTH 'Payment Method' AND 'Fee Type' (Tuition etc).
-        // I need to fix this ambiguity in offline.tsx too.
-
-        receipt_number: `${payment.studentId}-${Date.now()}`,
-        status: 'pending',
-        term: payment.term,
-        academic_year: payment.academicYear,
-        cashier_id: payment.cashierId ?? localCashierId,
-        cashier_name: payment.cashierName || (typeof window !== 'undefined' ? (localStorage.getItem('userName') || localStorage.getItem('cashierName') || 'Unknown') : 'Unknown'),
-
-        // Map extra fields based on payment method
-        reference_id: payment.referenceId || null,
-        bank_name: payment.bankName || null,
-        merchant_provider: payment.merchantProvider || null,
-      };
-
-      await api.post('payments/', payload);
-      results.push({ item: payment, ok: true });
+      const key = await chunkIdempotencyKey(chunk);
+      const res = await api.post(
+        'payments/bulk/',
+        { payments: payloads.slice(start, start + BULK_CHUNK_SIZE) },
+        key ? { headers: { 'Idempotency-Key': key } } : undefined,
+      );
+      res.data.results.forEach((result: { index: number; ok: boolean; errors?: any }) => {
+        const item = chunk[result.index];
+        if (result.ok) {
+          results.push({ item, ok: true });
+        } else {
+          results.push({ item, ok: false, error: JSON.stringify(result.errors) });
+          remaining.push(item);
+        }
+      });
     } catch (err: any) {
-      results.push({ item: payment, ok: false, error: err?.response?.data ? JSON.stringify(err.response.data) : 'Failed' });
-      remaining.push(payment);
+      // Whole chunk rejected (network, auth or duplicate receipt) - keep it queued
+      const error = err?.response?.data ? JSON.stringify(err.response.data) : 'Failed';
+      chunk.forEach((item) => {
+        results.push({ item, ok: false, error });
+        remaining.push(item);
+      });
     }
   }
 
@@ -14,8 +14,7 @@ import { Dialog, DialogContent, DialogDescription, DialogFooter, DialogHeader, D
 import { Search, Plus, Download, FileText, MoreHorizontal, Loader2, ArrowUpDown } from 'lucide-react';
 import { DropdownMenu, DropdownMenuContent, DropdownMenuItem, DropdownMenuTrigger } from '@/components/ui/dropdown-menu';
 
-type Campus = { id: number; name: string };
-type Student = { id: number; student_number: string; first_name: string; last_name: string; campus: Campus };
+type Student = { id: number; student_number: string; first_name: string; last_name: string };
 type Payment = {
   id: number;
   student: number | {
@@ -39,9 +38,25 @@ type Payment = {
   voided_by?: string;
 };
 
+const studentIdOf = (p: Payment) => (typeof p.student === 'number' ? p.student : p.student.id);
+const studentLabel = (s: Student) => `${s.student_number} – ${s.first_name} ${s.last_name}`;
+const STUDENT_FIELDS = 'id,student_number,first_name,last_name';
+// Students kept in localStorage for the offline queue's picker
+const MAX_CACHED_STUDENTS = 500;
+
+const rememberStudents = (rows: Student[]) => {
+  if (typeof window === 'undefined' || rows.length === 0) return;
+  let cached: Student[] = [];
+  try { cached = JSON.parse(localStorage.getItem('cachedStudents') || '[]'); } catch { cached = []; }
+  const ids = new Set(rows.map(s => s.id));
+  const merged = [...rows, ...cached.filter(s => !ids.has(s.id))].slice(0, MAX_CACHED_STUDENTS);
+  localStorage.setItem('cachedStudents', JSON.stringify(merged));
+};
+
 const PaymentsPage: NextPage = () => {
   const [payments, setPayments] = useState<Payment[]>([]);
-  const [students, setStudents] = useState<Student[]>([]);
+  // Students of the visible page (and picked ones), by id
+  const [studentById, setStudentById] = useState<Record<number, Student>>({});
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [notif, setNotif] = useState<{ type: 'success' | 'error'; message: string } | null>(null);
@@ -68,6 +83,8 @@ const PaymentsPage: NextPage = () => {
   const [formMethod, setFormMethod] = useState('Cash');
   const [formReceipt, setFormReceipt] = useState('');
   const [formStatus, setFormStatus] = useState<'pending' | 'posted' | 'voided'>('pending');
+  const [studentQuery, setStudentQuery] = useState('');
+  const [studentMatches, setStudentMatches] = useState<Student[]>([]);
 
   const showMessage = (type: 'success' | 'error', message: string) => {
     setNotif({ type, message });
@@ -107,19 +124,24 @@ const PaymentsPage: NextPage = () => {
       const orderPrefix = sortDir === 'desc' ? '-' : '';
       const ordering = `${orderPrefix}${orderField},${orderPrefix}id`; // Use ID as tiebreaker
 
-      const [pRes, sRes] = await Promise.all([
-        api.get(`payments/?page=${page}&page_size=${pageSize}&ordering=${ordering}`),
-        api.get('students/'),
-      ]);
+      const pRes = await api.get(`payments/?page=${page}&page_size=${pageSize}&ordering=${ordering}`);
       const pData = pRes.data;
-      if (pData && Array.isArray(pData.results)) {
-        setPayments(pData.results);
-        setTotalCount(pData.count || 0);
-      } else {
-        setPayments(pData);
-        setTotalCount(Array.isArray(pData) ? pData.length : 0);
+      const rows: Payment[] = pData && Array.isArray(pData.results) ? pData.results : (Array.isArray(pData) ? pData : []);
+      setPayments(rows);
+      setTotalCount(pData && Array.isArray(pData.results) ? (pData.count || 0) : rows.length);
+
+      // Names for this page's students only, in one slim request
+      const ids = Array.from(new Set(rows.map(studentIdOf)));
+      if (ids.length > 0) {
+        const sRes = await api.get(`students/?ids=${ids.join(',')}&fields=${STUDENT_FIELDS}`);
+        const pageStudents: Student[] = sRes.data;
+        setStudentById(prev => {
+          const next = { ...prev };
+          pageStudents.forEach(s => { next[s.id] = s; });
+          return next;
+        });
+        rememberStudents(pageStudents);
       }
-      setStudents(sRes.data); if (typeof window !== 'undefined') localStorage.setItem('cachedStudents', JSON.stringify(sRes.data));
       setError(null);
     } catch (e: any) {
       setError('Failed to load payments');
@@ -138,15 +160,47 @@ const PaymentsPage: NextPage = () => {
     fetchData();
   }, [fetchData]);
 
-  const studentById = useMemo(() => {
-    const map: Record<number, Student> = {};
-    students.forEach(s => { map[s.id] = s; });
-    return map;
-  }, [students]);
+  // Edit dialog picker: ranked typeahead while typing, exact student number on Enter
+  useEffect(() => {
+    if (!showEdit) return;
+    const q = studentQuery.trim();
+    const selected = studentById[Number(formStudentId)];
+    if (q.length < 2 || (selected && q === studentLabel(selected))) {
+      setStudentMatches([]);
+      return;
+    }
+    const timer = setTimeout(async () => {
+      try {
+        const res = await getApi().get(`students/typeahead/?q=${encodeURIComponent(q)}&limit=10`);
+        setStudentMatches(res.data);
+      } catch {
+        setStudentMatches([]);
+      }
+    }, 250);
+    return () => clearTimeout(timer);
+  }, [studentQuery, showEdit, formStudentId, studentById]);
+
+  const pickStudent = (s: Student) => {
+    setStudentById(prev => ({ ...prev, [s.id]: s }));
+    setFormStudentId(String(s.id));
+    setStudentQuery(studentLabel(s));
+    setStudentMatches([]);
+  };
+
+  const pickStudentByNumber = async () => {
+    const number = studentQuery.trim();
+    if (!number) return;
+    try {
+      const res = await getApi().get(`students/by-number/${encodeURIComponent(number)}/?fields=${STUDENT_FIELDS}`);
+      pickStudent(res.data);
+    } catch {
+      showMessage('error', `No student with number ${number}`);
+    }
+  };
 
   const enriched = useMemo(() => {
     return payments.map(p => {
-      const studentId = typeof p.student === 'number' ? p.student : p.student.id;
+      const studentId = studentIdOf(p);
       const s = studentById[studentId];
       const name = s ? `${s.first_name} ${s.last_name}` : `#${studentId}`;
       const number = s ? s.student_number : `#${studentId}`;
@@ -184,9 +238,12 @@ const PaymentsPage: NextPage = () => {
 
   const openEdit = (p: Payment) => {
     setCurrent(p);
-    const studentId = typeof p.student === 'number' ? p.student : p.student.id;
+    const studentId = studentIdOf(p);
+    const s = studentById[studentId];
 
     setFormStudentId(String(studentId));
+    setStudentQuery(s ? studentLabel(s) : '');
+    setStudentMatches([]);
     setFormAmount(String(p.amount));
     setFormMethod(p.payment_method);
     setFormReceipt(p.receipt_number);
@@ -536,16 +593,27 @@ const PaymentsPage: NextPage = () => {
           <div className="grid gap-4 py-4">
             <div className="grid gap-2">
               <label htmlFor="student" className="text-sm font-medium">Student</label>
-              <Select value={formStudentId} onValueChange={setFormStudentId}>
-                <SelectTrigger>
-                  <SelectValue placeholder="Select Student" />
-                </SelectTrigger>
-                <SelectContent>
-                  {students.map(s => (
-                    <SelectItem key={s.id} value={String(s.id)}>{s.student_number} – {s.first_name} {s.last_name}</SelectItem>
+              <Input
+                id="student"
+                placeholder="Type a name or student number"
+                value={studentQuery}
+                onChange={(e) => setStudentQuery(e.target.value)}
+                onKeyDown={(e) => { if (e.key === 'Enter') { e.preventDefault(); pickStudentByNumber(); } }}
+              />
+              {studentMatches.length > 0 && (
+                <div className="rounded-md border max-h-48 overflow-y-auto">
+                  {studentMatches.map(s => (
+                    <button
+                      key={s.id}
+                      type="button"
+                      className="block w-full px-3 py-2 text-left text-sm hover:bg-muted"
+                      onClick={() => pickStudent(s)}
+                    >
+                      {studentLabel(s)}
+                    </button>
                   ))}
-                </SelectContent>
-              </Select>
+                </div>
+              )}
             </div>
             <div className="grid gap-2">
               <label htmlFor="amount" className="text-sm font-medium">Amount</label>
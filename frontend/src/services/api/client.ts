@@ -1,5 +1,5 @@
 import axios, { AxiosInstance, AxiosResponse } from 'axios';
-import { Campus, Notification, Payment, ReportSummary, Student, User } from './types';
+import { Campus, Notification, Payment, ReportSummary, RosterImportResult, Student, StudentMatch, StudentRow, User } from './types';
 
 // --- Base Axios Setup ---
 export const createAxiosInstance = (): AxiosInstance => {
@@ -53,6 +53,23 @@ export const apiClient = {
         list: () => get<Student[]>('students/'),
         get: (id: number) => get<Student>(`students/${id}/`),
         search: (query: string) => get<Student[]>(`students/?search=${encodeURIComponent(query)}`),
+        // Slim roster rows with only the requested fields, e.g. ['id', 'student_number', 'name']
+        roster: (fields: (keyof StudentRow)[] = ['id', 'student_number', 'name']) =>
+            get<Partial<StudentRow>[]>(`students/?fields=${fields.join(',')}`),
+        byNumber: (studentNumber: string) => get<Student>(`students/by-number/${encodeURIComponent(studentNumber)}/`),
+        // Bulk roster upload (CSV or XLSX); admins only
+        importRoster: (file: File, options: { dryRun?: boolean; updateExisting?: boolean } = {}) => {
+            const form = new FormData();
+            form.append('file', file);
+            form.append('dry_run', String(options.dryRun ?? false));
+            form.append('update_existing', String(options.updateExisting ?? true));
+            return createAxiosInstance().post<RosterImportResult>('students/import/', form, {
+                headers: { 'Content-Type': 'multipart/form-data' },
+            });
+        },
+        // Ranked, indexed search-as-you-type (top `limit` matches, slim rows)
+        typeahead: (query: string, limit = 10) =>
+            get<StudentMatch[]>(`students/typeahead/?q=${encodeURIComponent(query)}&limit=${limit}`),
         create: (data: Partial<Student>) => post<Student>('students/', data),
         update: (id: number, data: Partial<Student>) => patch<Student>(`students/${id}/`, data),
         delete: (id: number) => del(`students/${id}/`),
@@ -91,7 +108,17 @@ export const apiClient = {
             if (params?.cashier_id) query.append('cashier_id', params.cashier_id.toString());
             return get(`reports/cashier-daily/?${query.toString()}`);
         },
+        // Cashier x day x method matrix for a date range (add format=csv for a download)
+        cashierRange: (params: { from: string; to: string; cashiers?: number[] }) => {
+            const query = new URLSearchParams({ from: params.from, to: params.to });
+            if (params.cashiers?.length) query.append('cashiers', params.cashiers.join(','));
+            return get(`reports/cashier-range/?${query.toString()}`);
+        },
         studentBalance: () => get('reports/student-balance/'),
+        // Day-end close: every cashier's expected total, then all cash counts in one request
+        reconciliationDay: (date: string) => get(`reports/reconciliation/batch/?date=${date}`),
+        reconcileAll: (date: string, counts: { cashier_id: number; actual_amount: number; notes?: string }[]) =>
+            post('reports/reconciliation/batch/', { date, counts }),
     },
 
     notifications: {
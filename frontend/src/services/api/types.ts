@@ -22,6 +22,36 @@ export interface Student {
     campus_id?: number; // For creation/update
 }
 
+// `students/?fields=...` rows: campus is an id, `name` is "first last"
+export interface StudentRow {
+    id: number;
+    student_number: string;
+    first_name: string;
+    last_name: string;
+    name: string;
+    current_grade: string;
+    campus: number;
+}
+
+export interface StudentMatch {
+    id: number;
+    student_number: string;
+    first_name: string;
+    last_name: string;
+    current_grade: string;
+    campus: number;
+    match: 'exact' | 'prefix' | 'substring';
+}
+
+export interface RosterImportResult {
+    rows: number;
+    created: number;
+    updated: number;
+    failed: number;
+    errors: { row: number; student_number: string | null; errors: Record<string, string[]> }[];
+    dry_run: boolean;
+}
+
 export interface Payment {
     id: number;
     student: number; // Student ID
@@ -57,6 +87,9 @@ export interface ReportSummary {
         campus: string;
         current_grade: string;
     };
-    payments: Payment[];
+    payments: Payment[]; // newest first, one page
+    payment_count: number;
     total_paid: number;
+    next: string | null; // cursor link to older payments
+    previous: string | null;
 }